@@ -7,7 +7,9 @@
 
 import { NextApiRequest, NextApiResponse } from 'next';
 import { createClient } from '@supabase/supabase-js';
+import zlib from 'zlib';
 import { IoTDataProcessor } from '../../src/services/iot-events-hub';
+import { decodeMsgpack } from '../../src/lib/utils/msgpack';
 
 // Initialize Supabase client
 const supabase = createClient(
@@ -59,6 +61,92 @@ interface DeviceBatchData {
   };
 }
 
+const MAX_BODY_BYTES = 10 * 1024 * 1024;
+
+// A claim this old without processed_at is from an attempt that died; it can be taken over
+const BATCH_CLAIM_TIMEOUT_MS = 5 * 60 * 1000;
+
+type BatchClaim = 'claimed' | 'duplicate' | 'in_progress';
+
+/**
+ * Claim a batch_id in device_upload_batches before processing it, so a
+ * batch retried by the edge uploader is only stored once.
+ */
+async function claimBatch(batchId: string, batchData: DeviceBatchData): Promise<BatchClaim> {
+  const { error } = await supabase
+    .from('device_upload_batches')
+    .insert({
+      batch_id: batchId,
+      device_id: batchData.device_id,
+      transaction_count: batchData.transactions.length
+    });
+
+  if (!error) return 'claimed';
+  if (error.code !== '23505') throw error;
+
+  const { data: existing } = await supabase
+    .from('device_upload_batches')
+    .select('claimed_at, processed_at')
+    .eq('batch_id', batchId)
+    .single();
+
+  if (!existing) return 'in_progress';
+  if (existing.processed_at) return 'duplicate';
+  if (Date.now() - new Date(existing.claimed_at).getTime() < BATCH_CLAIM_TIMEOUT_MS) {
+    return 'in_progress';
+  }
+
+  // Take over a stale claim; only one retry can match the old claimed_at
+  const { data: taken } = await supabase
+    .from('device_upload_batches')
+    .update({ claimed_at: new Date().toISOString() })
+    .eq('batch_id', batchId)
+    .eq('claimed_at', existing.claimed_at)
+    .is('processed_at', null)
+    .select('batch_id');
+
+  return taken && taken.length ? 'claimed' : 'in_progress';
+}
+
+/**
+ * Read the request body, inflating gzip or zstd batches from edge devices.
+ * Bodies sent as application/msgpack are decoded from MessagePack, anything
+ * else as JSON. Returns null when the Content-Encoding is not supported.
+ */
+async function readBatchBody(req: NextApiRequest): Promise<DeviceBatchData | null> {
+  const chunks: Buffer[] = [];
+  let size = 0;
+  for await (const chunk of req) {
+    size += chunk.length;
+    if (size > MAX_BODY_BYTES) {
+      throw new Error('Request body too large');
+    }
+    chunks.push(chunk as Buffer);
+  }
+
+  let body = Buffer.concat(chunks);
+  const encoding = (req.headers['content-encoding'] || 'identity').toLowerCase();
+
+  if (encoding === 'gzip') {
+    body = zlib.gunzipSync(body, { maxOutputLength: MAX_BODY_BYTES * 10 });
+  } else if (encoding === 'zstd') {
+    // zstd support landed in Node's zlib in v22.15
+    const zstdDecompressSync = (zlib as any).zstdDecompressSync;
+    if (!zstdDecompressSync) {
+      return null;
+    }
+    body = zstdDecompressSync(body);
+  } else if (encoding !== 'identity') {
+    return null;
+  }
+
+  const contentType = (req.headers['content-type'] || '').toLowerCase();
+  if (contentType.startsWith('application/msgpack')) {
+    return decodeMsgpack(body) as DeviceBatchData;
+  }
+  return JSON.parse(body.toString('utf8'));
+}
+
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse
@@ -96,8 +184,23 @@ export default async function handler(
       });
     }
 
-    // Validate request body
-    const batchData: DeviceBatchData = req.body;
+    // Validate request body (edge devices send gzip or zstd compressed JSON or MessagePack batches)
+    let batchData: DeviceBatchData | null;
+    try {
+      batchData = await readBatchBody(req);
+    } catch (error) {
+      return res.status(400).json({
+        error: 'Invalid request body',
+        message: 'Request body could not be decoded'
+      });
+    }
+
+    if (!batchData) {
+      return res.status(415).json({
+        error: 'Unsupported content encoding',
+        message: 'Supported encodings are gzip, zstd and identity'
+      });
+    }
     
     if (!batchData.device_id || !batchData.store_id || !batchData.transactions) {
       return res.status(400).json({
@@ -134,16 +237,57 @@ export default async function handler(
       });
     }
 
+    // Retries carry the same batch_id (and Idempotency-Key); store each batch once
+    const idempotencyKey = req.headers['idempotency-key'];
+    const batchId = (typeof idempotencyKey === 'string' && idempotencyKey) || batchData.batch_metadata?.batch_id;
+
+    if (batchId) {
+      const claim = await claimBatch(batchId, batchData);
+
+      if (claim === 'duplicate') {
+        return res.status(200).json({
+          success: true,
+          duplicate: true,
+          message: 'Batch was already processed',
+          processed: {
+            device_id: batchData.device_id,
+            store_id: batchData.store_id,
+            batch_id: batchId,
+            transactions_count: batchData.transactions.length
+          }
+        });
+      }
+
+      if (claim === 'in_progress') {
+        res.setHeader('Retry-After', '30');
+        return res.status(503).json({
+          error: 'Batch in progress',
+          message: `Batch ${batchId} is being processed by another request`
+        });
+      }
+    }
+
     // Process the batch data
     const success = await IoTDataProcessor.processBatchUpload(batchData);
 
     if (!success) {
+      if (batchId) {
+        // Release the claim so the device's retry can process the batch
+        await supabase.from('device_upload_batches').delete().eq('batch_id', batchId);
+      }
       return res.status(500).json({
         error: 'Processing failed',
         message: 'Failed to process batch data'
       });
     }
 
+    if (batchId) {
+      await supabase
+        .from('device_upload_batches')
+        .update({ processed_at: new Date().toISOString() })
+        .eq('batch_id', batchId);
+    }
+
     // Update device heartbeat
     await supabase
       .from('device_master')
@@ -190,8 +334,7 @@ export default async function handler(
 // Configure API route
 export const config = {
   api: {
-    bodyParser: {
-      sizeLimit: '10mb', // Allow larger uploads for batch data
-    },
+    // Body is read in readBatchBody so compressed batches can be inflated (10mb limit)
+    bodyParser: false,
   },
 }
\ No newline at end of file
@@ -5,7 +5,9 @@ Updates server endpoints and credentials to use Project Scout Supabase database
 """
 
 import os
+import glob
 import json
+import shutil
 import logging
 from datetime import datetime
 from typing import Dict, Any
@@ -71,6 +73,7 @@ SUPABASE_AUTH_URL=https://alxbucsacdxxwaibdxcf.supabase.co/auth/v1
 # === API Keys (Set these manually) ===
 SUPABASE_ANON_KEY=your_supabase_anon_key_here
 SUPABASE_SERVICE_ROLE_KEY=your_supabase_service_role_key_here
+IOT_DEVICE_API_KEY=your_iot_device_api_key_here
 
 # === Dashboard API Configuration ===
 DASHBOARD_API_URL=https://retail-insights-dashboard-ph-jakes-projects-e9f46c30.vercel.app/api
@@ -98,6 +101,7 @@ NETWORK_CHECK_INTERVAL=60
 LOCAL_CACHE_SIZE_MB=500
 SYNC_INTERVAL_MINUTES=5
 OFFLINE_BUFFER_HOURS=24
+EDGE_DATA_DIR=edge_data
 
 # === Security ===
 ENABLE_TLS=true
@@ -156,9 +160,42 @@ ENABLE_HEALTH_MONITORING=true
                 "firmware_version": "2.1.0",
                 "collection_interval_seconds": 30,
                 "sync_interval_minutes": 5,
+                "sync_min_interval_seconds": 5,
+                "sync_max_interval_minutes": 30,
+                "health_report_interval_seconds": 300,
+                "registration_interval_minutes": 60,
+                "startup_jitter_seconds": 30,
+                "sync_batch_size": 500,
+                "replay_order": "oldest_first",
+                "replay_max_rejections": 3,
+                "replay_parallel_chunks": 4,
+                "rollup_mode": "alongside",
+                "rollup_upload_interval_minutes": 5,
+                "rollup_retention_hours": 48,
+                "batch_max_size": 100,
+                "batch_linger_ms": 200,
+                "detection_dedup_window_seconds": 30,
+                "detection_dedup_gap_seconds": 5,
+                "detection_dedup_max_keys": 256,
+                "upload_batch_size": 200,
+                "upload_compression": "gzip",
+                "upload_codec": "json",
                 "retry_attempts": 3,
                 "timeout_seconds": 10,
-                "max_offline_hours": 24
+                "max_concurrent_requests": 4,
+                "circuit_failure_threshold": 3,
+                "circuit_max_backoff_seconds": 300,
+                "health_sample_interval_seconds": 5,
+                "health_series_interval_seconds": 60,
+                "metrics_bind_host": "127.0.0.1",
+                "metrics_port": 9109,
+                "max_offline_hours": 24,
+                "journal_durability_ms": 200,
+                "journal_group_commit_kb": 64,
+                "journal_size_limit_mb": 4,
+                "queue_codec": "record",
+                "nlp_workers": 2,
+                "pipeline_queue_size": 1000
             },
             
             "data_tables": {
@@ -168,13 +205,15 @@ ENABLE_HEALTH_MONITORING=true
                 "brands": "brands",
                 "stores": "stores",
                 "device_health": "device_health",
-                "edge_logs": "edge_logs"
+                "edge_logs": "edge_logs",
+                "edge_hourly_rollups": "edge_hourly_rollups"
             },
             
             "security": {
                 "enable_tls": True,
                 "certificate_validation": True,
                 "api_rate_limit": 60,
+                "api_rate_burst": 10,
                 "auth_required": True
             },
             
@@ -182,7 +221,14 @@ ENABLE_HEALTH_MONITORING=true
                 "auto_registration": True,
                 "real_time_sync": True,
                 "batch_upload": True,
+                "device_batch_upload": False,
+                "metrics_endpoint": True,
+                "adaptive_sync": True,
+                "idempotent_sync": False,
+                "detection_dedup": False,
+                "edge_rollups": False,
                 "health_monitoring": True,
+                "health_series": False,
                 "wifi_fallback": True,
                 "cellular_backup": False
             },
@@ -191,6 +237,14 @@ ENABLE_HEALTH_MONITORING=true
                 "level": "INFO",
                 "retention_days": 7,
                 "telemetry_enabled": True,
+                "ship_level": "INFO",
+                "ship_buffer_records": 1000,
+                "ship_batch_size": 100,
+                "ship_interval_seconds": 30,
+                "ship_sample_per_minute": {
+                    "DEBUG": 10,
+                    "INFO": 60
+                },
                 "local_storage_mb": 100
             }
         }
@@ -202,349 +256,24 @@ ENABLE_HEALTH_MONITORING=true
         return output_path
     
     def generate_python_client(self, output_path: str = "edge_client.py"):
-        """Generate Python client for edge devices"""
+        """Copy the Python edge client and its support modules for edge devices"""
         
         logger.info("Generating Python edge client...")
         
-        client_code = '''#!/usr/bin/env python3
-"""
-Project Scout Edge Device Client
-Connects edge devices to Project Scout Supabase backend
-"""
-
-import os
-import json
-import time
-import logging
-import requests
-import hashlib
-import uuid
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import subprocess
-
-# Third-party imports (install with pip)
-try:
-    from supabase import create_client, Client
-    import psutil
-except ImportError as e:
-    print(f"Missing dependencies: {e}")
-    print("Install with: pip install supabase psutil requests")
-    exit(1)
-
-class ProjectScoutEdgeClient:
-    """Edge device client for Project Scout system"""
-    
-    def __init__(self, config_file: str = "edge_device_config.json"):
-        """Initialize edge client with configuration"""
-        
-        # Load configuration
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
-        
-        # Setup logging
-        log_level = self.config.get('logging', {}).get('level', 'INFO')
-        logging.basicConfig(
-            level=getattr(logging, log_level),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        self.logger = logging.getLogger(__name__)
-        
-        # Initialize Supabase client
-        self.supabase_url = self.config['endpoints']['supabase']['base_url']
-        self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        
-        if not self.supabase_key:
-            raise ValueError("SUPABASE_ANON_KEY environment variable required")
-        
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-        
-        # Device identification
-        self.device_id = self.generate_device_id()
-        self.store_id = os.getenv('DEFAULT_STORE_ID', 'store_001')
-        
-        # Data cache for offline operation
-        self.offline_cache = []
-        self.last_sync = None
-        
-        self.logger.info(f"Edge client initialized for device: {self.device_id}")
-    
-    def generate_device_id(self) -> str:
-        """Generate unique device ID based on hardware"""
-        try:
-            # Get MAC address and CPU serial
-            mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff) 
-                           for elements in range(0,8*6,8)][::-1])
-            
-            # Get CPU serial (Raspberry Pi specific)
-            cpu_serial = "unknown"
-            try:
-                with open('/proc/cpuinfo', 'r') as f:
-                    for line in f:
-                        if line.startswith('Serial'):
-                            cpu_serial = line.split(':')[1].strip()
-                            break
-            except:
-                pass
-            
-            # Create device fingerprint
-            fingerprint = f"{mac}-{cpu_serial}-RaspberryPi5"
-            device_hash = hashlib.sha256(fingerprint.encode()).hexdigest()[:12]
-            return f"Pi5_Edge_{device_hash}"
-            
-        except Exception as e:
-            self.logger.warning(f"Could not generate hardware-based ID: {e}")
-            return f"Pi5_Edge_{uuid.uuid4().hex[:12]}"
-    
-    def register_device(self) -> bool:
-        """Register device with Project Scout backend"""
-        try:
-            device_info = {
-                'device_id': self.device_id,
-                'device_type': self.config['device_settings']['device_type'],
-                'firmware_version': self.config['device_settings']['firmware_version'],
-                'store_id': self.store_id,
-                'registration_time': datetime.utcnow().isoformat(),
-                'status': 'active',
-                'last_seen': datetime.utcnow().isoformat()
-            }
-            
-            # Check if device already exists
-            existing = self.supabase.table('devices').select('*').eq('device_id', self.device_id).execute()
-            
-            if existing.data:
-                # Update existing device
-                result = self.supabase.table('devices').update({
-                    'last_seen': datetime.utcnow().isoformat(),
-                    'status': 'active'
-                }).eq('device_id', self.device_id).execute()
-                
-                self.logger.info(f"Updated existing device registration: {self.device_id}")
-            else:
-                # Register new device
-                result = self.supabase.table('devices').insert(device_info).execute()
-                self.logger.info(f"Registered new device: {self.device_id}")
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Device registration failed: {e}")
-            return False
-    
-    def send_transaction_data(self, transaction_data: Dict[str, Any]) -> bool:
-        """Send transaction data to Project Scout backend"""
-        try:
-            # Add device metadata
-            transaction_data.update({
-                'device_id': self.device_id,
-                'store_id': self.store_id,
-                'created_at': datetime.utcnow().isoformat()
-            })
-            
-            # Send to Supabase
-            result = self.supabase.table('transactions').insert(transaction_data).execute()
-            
-            if result.data:
-                self.logger.info(f"Transaction sent successfully: {result.data[0]['id']}")
-                return True
-            else:
-                raise Exception("No data returned from insert")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to send transaction: {e}")
-            
-            # Cache for offline sync
-            self.cache_offline_data('transaction', transaction_data)
-            return False
-    
-    def send_product_detection(self, product_data: Dict[str, Any]) -> bool:
-        """Send product detection data"""
-        try:
-            detection_data = {
-                'device_id': self.device_id,
-                'store_id': self.store_id,
-                'detected_at': datetime.utcnow().isoformat(),
-                **product_data
-            }
-            
-            result = self.supabase.table('product_detections').insert(detection_data).execute()
-            
-            if result.data:
-                self.logger.info(f"Product detection sent: {product_data.get('brand', 'unknown')}")
-                return True
-            else:
-                raise Exception("No data returned from insert")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to send product detection: {e}")
-            self.cache_offline_data('product_detection', detection_data)
-            return False
-    
-    def send_health_metrics(self) -> bool:
-        """Send device health metrics"""
-        try:
-            # Collect system metrics
-            health_data = {
-                'device_id': self.device_id,
-                'timestamp': datetime.utcnow().isoformat(),
-                'cpu_usage': psutil.cpu_percent(interval=1),
-                'memory_usage': psutil.virtual_memory().percent,
-                'disk_usage': psutil.disk_usage('/').percent,
-                'temperature': self.get_cpu_temperature(),
-                'uptime_seconds': time.time() - psutil.boot_time(),
-                'network_connected': self.check_network_connection()
-            }
-            
-            result = self.supabase.table('device_health').insert(health_data).execute()
-            
-            if result.data:
-                self.logger.debug("Health metrics sent successfully")
-                return True
-            else:
-                raise Exception("No data returned from insert")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to send health metrics: {e}")
-            return False
-    
-    def get_cpu_temperature(self) -> Optional[float]:
-        """Get CPU temperature (Raspberry Pi specific)"""
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read()) / 1000.0
-                return round(temp, 2)
-        except:
-            return None
-    
-    def check_network_connection(self) -> bool:
-        """Check if device has network connectivity"""
-        try:
-            response = requests.get(self.supabase_url, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
-    
-    def cache_offline_data(self, data_type: str, data: Dict[str, Any]):
-        """Cache data for offline sync"""
-        cache_entry = {
-            'type': data_type,
-            'data': data,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self.offline_cache.append(cache_entry)
-        
-        # Limit cache size
-        max_cache_size = 1000
-        if len(self.offline_cache) > max_cache_size:
-            self.offline_cache = self.offline_cache[-max_cache_size:]
-        
-        self.logger.debug(f"Cached {data_type} data for offline sync")
-    
-    def sync_offline_data(self) -> bool:
-        """Sync cached offline data"""
-        if not self.offline_cache:
-            return True
-        
-        synced_count = 0
-        failed_items = []
-        
-        for item in self.offline_cache:
-            try:
-                data_type = item['type']
-                data = item['data']
-                
-                if data_type == 'transaction':
-                    result = self.supabase.table('transactions').insert(data).execute()
-                elif data_type == 'product_detection':
-                    result = self.supabase.table('product_detections').insert(data).execute()
-                else:
-                    continue
-                
-                if result.data:
-                    synced_count += 1
-                else:
-                    failed_items.append(item)
-                    
-            except Exception as e:
-                self.logger.error(f"Failed to sync cached item: {e}")
-                failed_items.append(item)
+        # The client is split across edge_*.py modules, so ship the maintained
+        # sources instead of an embedded copy that drifts out of date
+        source_dir = os.path.dirname(os.path.abspath(__file__))
+        target_dir = os.path.dirname(os.path.abspath(output_path))
+        client_source = os.path.join(source_dir, "edge_client.py")
         
-        # Update cache with failed items
-        self.offline_cache = failed_items
+        if not os.path.exists(output_path) or not os.path.samefile(client_source, output_path):
+            shutil.copyfile(client_source, output_path)
         
-        if synced_count > 0:
-            self.logger.info(f"Synced {synced_count} cached items")
-        
-        return len(failed_items) == 0
-    
-    def run_continuous_monitoring(self):
-        """Run continuous monitoring and data collection"""
-        self.logger.info("Starting continuous monitoring...")
-        
-        # Register device on startup
-        self.register_device()
-        
-        health_interval = 300  # 5 minutes
-        sync_interval = self.config['device_settings']['sync_interval_minutes'] * 60
-        
-        last_health_check = 0
-        last_sync = 0
-        
-        try:
-            while True:
-                current_time = time.time()
-                
-                # Send health metrics periodically
-                if current_time - last_health_check >= health_interval:
-                    self.send_health_metrics()
-                    last_health_check = current_time
-                
-                # Sync offline data periodically
-                if current_time - last_sync >= sync_interval:
-                    if self.check_network_connection():
-                        self.sync_offline_data()
-                    last_sync = current_time
-                
-                # Sleep for collection interval
-                time.sleep(self.config['device_settings']['collection_interval_seconds'])
-                
-        except KeyboardInterrupt:
-            self.logger.info("Monitoring stopped by user")
-        except Exception as e:
-            self.logger.error(f"Monitoring error: {e}")
-
-
-def main():
-    """Main entry point for edge client"""
-    
-    # Check for configuration file
-    config_file = "edge_device_config.json"
-    if not os.path.exists(config_file):
-        print(f"Configuration file {config_file} not found!")
-        print("Please run the configuration generator first.")
-        return
-    
-    # Check for environment variables
-    if not os.getenv('SUPABASE_ANON_KEY'):
-        print("SUPABASE_ANON_KEY environment variable required!")
-        print("Please set this in your .env.edge file or system environment.")
-        return
-    
-    # Initialize and run edge client
-    try:
-        client = ProjectScoutEdgeClient(config_file)
-        client.run_continuous_monitoring()
-    except Exception as e:
-        print(f"Edge client error: {e}")
-
-
-if __name__ == "__main__":
-    main()
-'''
-        
-        with open(output_path, 'w') as f:
-            f.write(client_code)
+        for module_path in glob.glob(os.path.join(source_dir, "edge_*.py")):
+            target_path = os.path.join(target_dir, os.path.basename(module_path))
+            if module_path == client_source or os.path.abspath(module_path) == target_path:
+                continue
+            shutil.copyfile(module_path, target_path)
         
         os.chmod(output_path, 0o755)  # Make executable
         
@@ -584,7 +313,7 @@ source project_scout_env/bin/activate
 # Install Python packages
 echo "📚 Installing Python packages..."
 pip install --upgrade pip
-pip install supabase psutil requests
+pip install supabase psutil requests httpx msgpack
 
 # Create project directory
 echo "📁 Setting up project directory..."
@@ -601,7 +330,8 @@ if [ -f "../.env.edge" ]; then
 fi
 
 if [ -f "../edge_client.py" ]; then
-    cp ../edge_client.py .
+    # edge_client.py imports its support modules (edge_*.py) from this directory
+    cp ../edge_*.py .
     chmod +x edge_client.py
 fi
 
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Project Scout Asyncio Edge Device Client
+Runs sends, health reporting and offline sync concurrently over one pooled connection
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Set
+
+# Third-party imports (install with pip)
+try:
+    import httpx
+    from postgrest.exceptions import APIError
+except ImportError as e:
+    print(f"Missing dependencies: {e}")
+    print("Install with: pip install supabase psutil requests httpx")
+    exit(1)
+
+from edge_client import ProjectScoutEdgeClient, is_transient_status
+from edge_records import DetectionRecord
+from edge_circuit_breaker import CircuitBreaker, CircuitOpenError
+from edge_scheduler import device_jitter
+from edge_rate_limiter import RateLimitExceeded, TABLE_LANES
+from edge_rollups import ROLLUP_TABLE, ROLLUP_CONFLICT_COLUMNS
+
+
+class AsyncProjectScoutEdgeClient(ProjectScoutEdgeClient):
+    """Asyncio variant of ProjectScoutEdgeClient
+
+    Exposes the same public methods as coroutines. All requests share one
+    keep-alive connection pool and at most max_concurrent_requests are in
+    flight at once, so a slow insert no longer blocks health reporting.
+    """
+
+    def __init__(self, config_file: str = "edge_device_config.json",
+                 device_id: Optional[str] = None, data_dir: Optional[str] = None):
+        """Initialize async edge client with configuration"""
+        super().__init__(config_file, device_id=device_id, data_dir=data_dir)
+
+        device_settings = self.config['device_settings']
+        max_in_flight = device_settings.get('max_concurrent_requests', 4)
+
+        self.rest_url = self.config['endpoints']['supabase'].get(
+            'api_url', f"{self.supabase_url}/rest/v1"
+        )
+        self.http = httpx.AsyncClient(
+            headers={
+                'apikey': self.supabase_key,
+                'Authorization': f"Bearer {self.supabase_key}",
+                'Content-Type': 'application/json'
+            },
+            timeout=device_settings.get('timeout_seconds', 10),
+            limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_in_flight
+            )
+        )
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        # Loop the deduplicator's thread hands collapsed detections to, and their pending sends
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._group_sends: Set[Future] = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Send open detection groups, then close the pooled HTTP connections"""
+        if self._detection_dedup is not None:
+            # Off the loop, so the groups it emits while closing can still be sent
+            await asyncio.to_thread(self._detection_dedup.close)
+            if self._group_sends:
+                await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self._group_sends)))
+        await self.http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send one request through the shared pool, bounded by the in-flight limit"""
+        lane = TABLE_LANES.get(path, 'transactions')
+        if not self.circuit.allow_request():
+            self._observe_request(lane, 'circuit_open')
+            raise CircuitOpenError("Backend unreachable, circuit open")
+
+        # Only hand off to a worker thread when the bucket is actually contended
+        acquired = self.rate_limiter.try_acquire(lane) or await asyncio.to_thread(
+            self.rate_limiter.acquire, lane, 1, self.rate_limit_timeout
+        )
+        if not acquired:
+            self.circuit.release()
+            self._observe_request(lane, 'rate_limited')
+            raise RateLimitExceeded(f"No request budget for {lane} within {self.rate_limit_timeout}s")
+
+        started = time.perf_counter()
+        try:
+            async with self._in_flight:
+                response = await self.http.request(method, f"{self.rest_url}/{path}", **kwargs)
+        except Exception:
+            self.circuit.record_failure()
+            self._observe_request(lane, 'error', started)
+            raise
+
+        if is_transient_status(response.status_code):
+            self.circuit.record_failure()
+            self._observe_request(lane, 'error', started)
+        else:
+            self.circuit.record_success()
+            self._observe_request(lane, 'ok' if response.status_code < 400 else 'rejected', started)
+        return response
+
+    async def _insert(self, table: str, rows: Any, prefer: str = 'return=representation',
+                      params: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Insert one row or a list of rows; raises APIError when the backend rejects them"""
+        response = await self._request(
+            'POST', table, json=rows, params=params, headers={'Prefer': prefer}
+        )
+        if 400 <= response.status_code < 500 and not is_transient_status(response.status_code):
+            raise APIError(response.json())
+        response.raise_for_status()
+        return response.json() if response.content else []
+
+    async def _insert_transactions_with_items(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store transactions and their nested items in one RPC call"""
+        return await self._insert(f"rpc/{self.TRANSACTION_ITEMS_RPC}", {'p_transactions': rows})
+
+    async def register_device(self) -> bool:
+        """Register device with Project Scout backend (heartbeat when already registered)"""
+        started = time.perf_counter()
+        try:
+            profile = self._registration_profile()
+            record = self._load_registration_record()
+
+            if record and all(record.get(key) == value for key, value in profile.items()):
+                response = await self._request(
+                    'PATCH', 'devices',
+                    params={'device_id': f"eq.{self.device_id}"},
+                    json={'last_seen': datetime.utcnow().isoformat(), 'status': 'active'},
+                    headers={'Prefer': 'return=representation'}
+                )
+                response.raise_for_status()
+
+                if response.json():
+                    self._save_registration_record(profile)
+                    self.logger.debug(f"Device heartbeat sent: {self.device_id}")
+                    self._observe_send('register_device', started, 'sent')
+                    return True
+
+            await self._insert(
+                'devices',
+                {**profile, 'status': 'active', 'last_seen': datetime.utcnow().isoformat()},
+                prefer='resolution=merge-duplicates,return=minimal',
+                params={'on_conflict': 'device_id'}
+            )
+
+            self._save_registration_record(profile)
+            self.logger.info(f"Registered device: {self.device_id}")
+            self._observe_send('register_device', started, 'sent')
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Device registration failed: {e}")
+            self._observe_send('register_device', started, 'failed')
+            return False
+
+    async def send_transaction_data(self, transaction_data: Dict[str, Any]) -> bool:
+        """Send transaction data (and any nested line items) to Project Scout backend"""
+        started = time.perf_counter()
+        if self._count_rollup('transaction', transaction_data):
+            self._observe_send('send_transaction_data', started, 'rolled_up')
+            return True
+        try:
+            transaction_data.update({
+                'device_id': self.device_id,
+                'store_id': self.store_id,
+                'created_at': datetime.utcnow().isoformat()
+            })
+            self._stamp_event_id(transaction_data)
+
+            if transaction_data.get('items'):
+                result = await self._insert_transactions_with_items([transaction_data])
+            else:
+                result = await self._insert('transactions', transaction_data)
+
+            if result:
+                self.logger.info(f"Transaction sent successfully: {result[0]['id']}")
+                self._observe_send('send_transaction_data', started, 'sent')
+                return True
+            else:
+                raise Exception("No data returned from insert")
+
+        except Exception as e:
+            self.logger.error(f"Failed to send transaction: {e}")
+            self.cache_offline_data('transaction', transaction_data)
+            self._observe_send('send_transaction_data', started, 'cached')
+            return False
+
+    async def send_product_detection(self, product_data: Dict[str, Any]) -> bool:
+        """Send product detection data"""
+        started = time.perf_counter()
+        if self._count_rollup('product_detection', product_data):
+            self._observe_send('send_product_detection', started, 'rolled_up')
+            return True
+        if self.detection_dedup_enabled:
+            self._loop = asyncio.get_running_loop()
+            merged = self.detection_dedup.add(product_data, self.store_id)
+            self._observe_send('send_product_detection', started, 'deduplicated' if merged else 'buffered')
+            return True
+        try:
+            detection_data = self._stamp_event_id({
+                'device_id': self.device_id,
+                'store_id': self.store_id,
+                'detected_at': datetime.utcnow().isoformat(),
+                **product_data
+            })
+
+            result = await self._insert('product_detections', detection_data)
+
+            if result:
+                self.logger.info(f"Product detection sent: {product_data.get('brand', 'unknown')}")
+                self._observe_send('send_product_detection', started, 'sent')
+                return True
+            else:
+                raise Exception("No data returned from insert")
+
+        except Exception as e:
+            self.logger.error(f"Failed to send product detection: {e}")
+            self.cache_offline_data('product_detection', detection_data)
+            self._observe_send('send_product_detection', started, 'cached')
+            return False
+
+    def _emit_detection_group(self, detection: Dict[str, Any], first_seen: float):
+        """Hand one collapsed detection from the deduplicator thread to the event loop"""
+        record = DetectionRecord(self.device_id, self.store_id, detection, detected_at=int(first_seen * 1000))
+        row = self._stamp_event_id(record.to_row())
+        send = self._send_detection_group(row)
+        try:
+            future = asyncio.run_coroutine_threadsafe(send, self._loop)
+        except RuntimeError:
+            # The loop is gone; keep the detection for the next offline sync
+            send.close()
+            self.cache_offline_data(record.data_type, row)
+            return
+        self._group_sends.add(future)
+        future.add_done_callback(self._group_sends.discard)
+
+    async def _send_detection_group(self, row: Dict[str, Any]):
+        try:
+            await self._insert('product_detections', row, prefer='return=minimal')
+        except Exception as e:
+            self.logger.error(f"Failed to send deduplicated detection: {e}")
+            self.cache_offline_data('product_detection', row)
+
+    async def send_health_metrics(self) -> bool:
+        """Send one aggregated device health record for the current window"""
+        started = time.perf_counter()
+        try:
+            health_data = self._collect_health_data(await self.check_network_connection())
+
+            await self._insert('device_health', health_data, prefer='return=minimal')
+            self.logger.debug("Health metrics sent successfully")
+            self._observe_send('send_health_metrics', started, 'sent')
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to send health metrics: {e}")
+            self._observe_send('send_health_metrics', started, 'failed')
+            return False
+
+    async def upload_rollups(self) -> bool:
+        """Upsert the hourly rollup buckets that changed since the last upload"""
+        if self.rollups is None:
+            return False
+        self.offline_queue.set_checkpoint('rollups', self.rollups.snapshot())
+        rows = self.rollups.take_pending()
+        if not rows:
+            return True
+
+        try:
+            await self._insert(ROLLUP_TABLE, rows, prefer='resolution=merge-duplicates,return=minimal',
+                               params={'on_conflict': ROLLUP_CONFLICT_COLUMNS})
+        except Exception as e:
+            self.logger.error(f"Failed to upload {len(rows)} hourly rollup rows: {e}")
+            self.rollups.requeue(rows)
+            return False
+
+        self.metric_rollup_rows.inc(len(rows))
+        self.logger.debug(f"Uploaded {len(rows)} hourly rollup rows")
+        return True
+
+    async def check_network_connection(self) -> bool:
+        """Check if device has network connectivity, probing only when the circuit asks for it"""
+        if self.circuit.state == CircuitBreaker.CLOSED:
+            return True
+        if not self.circuit.allow_request():
+            return False
+
+        try:
+            async with self._in_flight:
+                response = await self.http.get(self.supabase_url, timeout=5)
+            connected = response.status_code < 500
+        except Exception:
+            connected = False
+
+        if connected:
+            self.circuit.record_success()
+        else:
+            self.circuit.record_failure()
+        return connected
+
+    async def sync_offline_data(self) -> bool:
+        """Replay cached offline data in checkpointed windows, running their inserts concurrently
+
+        Offline queue reads and writes (SQLite, fsynced) run in a worker
+        thread so they never block the event loop.
+        """
+        await asyncio.to_thread(self.offline_queue.prune)
+        if not len(self.offline_queue):
+            return True
+
+        chunk_size = self._sync_chunk_size()
+        parallel = max(1, self.config['device_settings'].get('replay_parallel_chunks', 4))
+        stats = self._new_sync_stats()
+        start_time = time.time()
+
+        try:
+            replay = await asyncio.to_thread(self._start_replay, chunk_size)
+            error = None
+            in_flight = {}
+            while True:
+                # Keep up to `parallel` windows in flight; stop handing out more after an error
+                while error is None and len(in_flight) < parallel:
+                    window = await asyncio.to_thread(replay.next_window)
+                    if window is None:
+                        break
+                    in_flight[asyncio.ensure_future(self._replay_window(window, chunk_size, stats))] = window
+                if not in_flight:
+                    break
+
+                finished, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    delivered, rejected, window_error = task.result()
+                    await asyncio.to_thread(replay.complete, in_flight.pop(task), delivered,
+                                            finished=window_error is None, rejected_ids=rejected)
+                    error = error or window_error
+            if error:
+                raise error
+            await asyncio.to_thread(replay.close)
+
+        except Exception as e:
+            self.logger.error(f"Offline sync interrupted: {e}")
+            stats['failed'] += 1
+            stats['interrupted'] = True
+
+        self._record_sync_stats(stats, start_time)
+        return stats['failed'] == 0
+
+    async def _replay_window(self, window, chunk_size: int, stats: Dict[str, Any]):
+        """Send one window's table chunks concurrently; returns (delivered ids, rejected ids, first error)"""
+        chunks, delivered = self._group_sync_batch(window.entries, chunk_size)
+        results = await asyncio.gather(
+            *(self._insert_chunk(table, chunk, stats) for table, chunk in chunks),
+            return_exceptions=True
+        )
+
+        error = None
+        rejected = []
+        for (table, chunk), failed in zip(chunks, results):
+            if isinstance(failed, Exception):
+                error = error or failed
+                continue
+            delivered.extend(self._count_delivered(chunk, failed, stats))
+            rejected.extend(item['id'] for item in failed)
+        return delivered, rejected, error
+
+    async def _insert_chunk(self, table: str, items: List[Dict[str, Any]],
+                            stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert queue items as one request, bisecting rejected chunks"""
+        try:
+            stats['requests'] += 1
+            started = time.perf_counter()
+            try:
+                rows = [item['data'] for item in items]
+                if table == 'transactions' and any(row.get('items') for row in rows):
+                    await self._insert_transactions_with_items(rows)
+                elif self.idempotent_sync:
+                    await self._insert(table, rows,
+                                       prefer='return=minimal,resolution=ignore-duplicates',
+                                       params={'on_conflict': 'event_id'})
+                else:
+                    await self._insert(table, rows, prefer='return=minimal')
+            finally:
+                stats['request_seconds'] += time.perf_counter() - started
+            return []
+
+        except APIError as e:
+            if len(items) == 1:
+                self.logger.error(f"Backend rejected row for {table}: {e}")
+                return items
+
+            self.metric_retries.labels('bisect').inc()
+            middle = len(items) // 2
+            halves = await asyncio.gather(
+                self._insert_chunk(table, items[:middle], stats),
+                self._insert_chunk(table, items[middle:], stats)
+            )
+            return halves[0] + halves[1]
+
+    async def run_continuous_monitoring(self):
+        """Run registration, health reporting and offline sync as concurrent loops"""
+        self.logger.info("Starting continuous monitoring...")
+
+        device_settings = self.config['device_settings']
+        self.health_sampler.start()
+        self.start_metrics_server()
+        self.start_log_shipping()
+
+        async def periodic(name, job, interval, jitter_window=None, interval_fn=None):
+            # Same per-device phase as the threaded Scheduler
+            window = interval if jitter_window is None else jitter_window
+            await asyncio.sleep(device_jitter(self.device_id, name, window))
+            while True:
+                # One failing run is logged, like the threaded Scheduler, and never stops the other jobs
+                try:
+                    await job()
+                except Exception as e:
+                    self.logger.error(f"Scheduled job {name} failed: {e}")
+                try:
+                    delay = interval_fn() if interval_fn else interval
+                except Exception as e:
+                    self.logger.error(f"Could not choose next interval for {name}: {e}")
+                    delay = interval
+                await asyncio.sleep(delay)
+
+        async def sync_job():
+            if await self.check_network_connection():
+                if self.config.get('features', {}).get('device_batch_upload', False):
+                    try:
+                        await asyncio.to_thread(self.batch_uploader.upload_pending)
+                    except Exception as e:
+                        # e.g. IOT_DEVICE_API_KEY unset; the regular sync below still runs
+                        self.logger.error(f"Device batch upload failed: {e}")
+                await self.sync_offline_data()
+            else:
+                self.sync_policy.record_offline()
+
+        adaptive_sync = self.config.get('features', {}).get('adaptive_sync', False)
+        jobs = [
+            periodic('registration', self.register_device,
+                     device_settings.get('registration_interval_minutes', 60) * 60,
+                     device_settings.get('startup_jitter_seconds', 30)),
+            periodic('health', self.send_health_metrics,
+                     device_settings.get('health_report_interval_seconds', 300)),
+            periodic('sync', sync_job, device_settings['sync_interval_minutes'] * 60,
+                     interval_fn=self._next_sync_interval if adaptive_sync else None)
+        ]
+        if self.rollups is not None:
+            jobs.append(periodic('rollups', self.upload_rollups,
+                                 device_settings.get('rollup_upload_interval_minutes', 5) * 60))
+
+        try:
+            await asyncio.gather(*jobs)
+        except asyncio.CancelledError:
+            self.logger.info("Monitoring stopped")
+            raise
+        except Exception as e:
+            self.logger.error(f"Monitoring error: {e}")
+        finally:
+            self.health_sampler.stop()
+            await self.close()
+            # Keep this hour's counters for the next start
+            if self.rollups is not None:
+                self.offline_queue.set_checkpoint('rollups', self.rollups.snapshot())
+            self.offline_queue.flush()
+            # Ships the remaining records through the threaded client, off the event loop
+            await asyncio.to_thread(self.stop_log_shipping)
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+                self.metrics_server = None
+
+
+def main():
+    """Main entry point for the asyncio edge client"""
+
+    config_file = "edge_device_config.json"
+    if not os.path.exists(config_file):
+        print(f"Configuration file {config_file} not found!")
+        print("Please run the configuration generator first.")
+        return
+
+    if not os.getenv('SUPABASE_ANON_KEY'):
+        print("SUPABASE_ANON_KEY environment variable required!")
+        print("Please set this in your .env.edge file or system environment.")
+        return
+
+    try:
+        client = AsyncProjectScoutEdgeClient(config_file)
+        asyncio.run(client.run_continuous_monitoring())
+    except KeyboardInterrupt:
+        print("Monitoring stopped by user")
+    except Exception as e:
+        print(f"Edge client error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Micro-batching Writer for Project Scout Edge Devices
+Groups live events into multi-row inserts flushed from a background thread
+"""
+
+import time
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+
+class BatchWriter:
+    """Linger-based micro-batcher for live inserts
+
+    Events are buffered per table and flushed as one request when a table
+    reaches max_batch_size rows or its oldest row has waited linger_ms.
+    Every submitted event gets a Future that resolves to True once the row
+    is stored, or False if it had to be cached for offline sync instead.
+    Events are passed to flush_fn as submitted, so callers can buffer
+    compact records and build rows only when a batch is sent. Rows that
+    cannot be sent by the writer itself (the queue is full, or flush_fn
+    raised) are handed to overflow_fn, typically the offline queue.
+    """
+
+    def __init__(self, flush_fn: Callable[[str, List[Any]], List[bool]],
+                 max_batch_size: int = 100, linger_ms: float = 200,
+                 max_queue_size: int = 10000,
+                 overflow_fn: Optional[Callable[[str, Any], None]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """Create the writer; flush_fn(table, rows) returns per-row success flags"""
+        self.flush_fn = flush_fn
+        self.overflow_fn = overflow_fn
+        self.max_batch_size = max_batch_size
+        self.linger_seconds = linger_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._buffers: Dict[str, List[Tuple[Any, Future]]] = {}
+        self._first_enqueued: Dict[str, float] = {}
+        self._depth = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.stats = {
+            'submitted': 0,
+            'batches': 0,
+            'rows_written': 0,
+            'rows_failed': 0,
+            'overflowed': 0
+        }
+
+        self._thread = threading.Thread(target=self._run, name='edge-batch-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of events waiting to be flushed"""
+        return self._depth
+
+    def submit(self, table: str, row: Any) -> Future:
+        """Queue a row for table and return a Future for its outcome"""
+        future: Future = Future()
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchWriter is closed")
+
+            if self._depth >= self.max_queue_size:
+                # Never block capture: spill straight to the overflow handler
+                self.stats['overflowed'] += 1
+                overflow = True
+            else:
+                overflow = False
+                buffer = self._buffers.setdefault(table, [])
+                if not buffer:
+                    self._first_enqueued[table] = time.monotonic()
+                buffer.append((row, future))
+                self._depth += 1
+                self.stats['submitted'] += 1
+                if len(buffer) >= self.max_batch_size or len(buffer) == 1:
+                    self._cond.notify()
+
+        if overflow:
+            if self.overflow_fn:
+                self.overflow_fn(table, row)
+            future.set_result(False)
+
+        return future
+
+    def flush(self):
+        """Ask the writer thread to flush everything buffered now"""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify()
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush remaining rows and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _next_deadline(self) -> Optional[float]:
+        """Earliest linger deadline across tables, or None when idle"""
+        if not self._first_enqueued:
+            return None
+        return min(self._first_enqueued.values()) + self.linger_seconds
+
+    def _take_due_locked(self, now: float, force: bool) -> List[Tuple[str, List[Tuple[Any, Future]]]]:
+        """Remove and return every batch that is full or has lingered long enough"""
+        due = []
+        for table, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            if (force or len(buffer) >= self.max_batch_size
+                    or now - self._first_enqueued[table] >= self.linger_seconds):
+                batch = buffer[:self.max_batch_size]
+                del buffer[:self.max_batch_size]
+                if buffer:
+                    self._first_enqueued[table] = now
+                else:
+                    del self._first_enqueued[table]
+                self._depth -= len(batch)
+                due.append((table, batch))
+        return due
+
+    def _run(self):
+        """Writer thread: wait for a size or linger trigger, then flush"""
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    force = self._closed or self._flush_requested
+                    due = self._take_due_locked(now, force)
+                    if due or (self._closed and not self._depth):
+                        break
+                    self._flush_requested = False
+
+                    deadline = self._next_deadline()
+                    self._cond.wait(None if deadline is None else max(deadline - now, 0))
+
+                if not self._depth:
+                    self._flush_requested = False
+                stop = self._closed and not self._depth
+
+            for table, batch in due:
+                self._write(table, batch)
+
+            if stop:
+                return
+
+    def _write(self, table: str, batch: List[Tuple[Any, Future]]):
+        """Flush one batch and resolve its futures"""
+        rows = [row for row, _ in batch]
+        try:
+            outcomes = self.flush_fn(table, rows)
+        except Exception as e:
+            self.logger.error(f"Batch flush to {table} failed: {e}")
+            outcomes = [False] * len(rows)
+            self._spill(table, rows)
+
+        self.stats['batches'] += 1
+        for (_, future), ok in zip(batch, outcomes):
+            if ok:
+                self.stats['rows_written'] += 1
+            else:
+                self.stats['rows_failed'] += 1
+            future.set_result(bool(ok))
+
+    def _spill(self, table: str, rows: List[Any]):
+        """Hand the rows of a failed batch to overflow_fn so they are not lost"""
+        if not self.overflow_fn:
+            return
+        for row in rows:
+            try:
+                self.overflow_fn(table, row)
+            except Exception as e:
+                self.logger.error(f"Could not spill a {table} row after a failed flush: {e}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker for Project Scout Edge Devices
+Tracks backend reachability from the outcome of real requests
+"""
+
+import time
+import random
+import threading
+import logging
+from typing import Callable, Dict, Any, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open connection state shared by all send paths
+
+    The circuit opens after failure_threshold consecutive connection
+    failures. While open, requests fail fast. After an exponentially growing,
+    jittered backoff a single half-open probe is let through; its outcome
+    either closes the circuit or re-opens it with a longer backoff.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, base_backoff_seconds: float = 5,
+                 max_backoff_seconds: float = 300, jitter: float = 0.2,
+                 probe_timeout_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic,
+                 logger: Optional[logging.Logger] = None):
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.jitter = jitter
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._open_count = 0
+        self._retry_at = 0.0
+        self._probe_started: Optional[float] = None
+
+        self.stats = {
+            'opened': 0,
+            'rejected': 0,
+            'probes': 0
+        }
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now
+
+        In the half-open state only one probe is allowed at a time; callers
+        that get True must report the outcome with record_success or
+        record_failure.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            now = self.clock()
+            if self._state == self.OPEN:
+                if now < self._retry_at:
+                    self.stats['rejected'] += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            # Half-open: let one probe through, and a new one if it never reported back
+            if self._probe_started is None or now - self._probe_started >= self.probe_timeout_seconds:
+                self._probe_started = now
+                self.stats['probes'] += 1
+                return True
+
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        """Report a request that reached the backend"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_started = None
+            if self._state != self.CLOSED:
+                self._open_count = 0
+                self._transition(self.CLOSED)
+
+    def release(self):
+        """Report that a request allowed by allow_request was never sent
+
+        Frees the half-open probe slot, e.g. when the caller then ran out
+        of rate-limit budget.
+        """
+        with self._lock:
+            self._probe_started = None
+
+    def record_failure(self):
+        """Report a request that failed to reach the backend"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_started = None
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._open()
+
+    def _open(self):
+        """Open the circuit and schedule the next half-open probe"""
+        self._open_count += 1
+        backoff = min(
+            self.base_backoff_seconds * (2 ** (self._open_count - 1)),
+            self.max_backoff_seconds
+        )
+        # Jitter keeps a fleet that lost the same uplink from probing in lockstep
+        backoff *= 1 + random.uniform(-self.jitter, self.jitter)
+        self._retry_at = self.clock() + backoff
+        self.stats['opened'] += 1
+        self._transition(self.OPEN)
+        self.logger.warning(f"Backend circuit open, next probe in {backoff:.1f}s")
+
+    def _transition(self, state: str):
+        if state != self._state:
+            self.logger.info(f"Backend circuit {self._state} -> {state}")
+            self._state = state
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters for reporting"""
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_in_seconds': max(self._retry_at - self.clock(), 0) if self._state == self.OPEN else 0,
+                **self.stats
+            }
@@ -7,28 +7,101 @@ Connects edge devices to Project Scout Supabase backend
 import os
 import json
 import time
+import base64
 import logging
-import requests
 import hashlib
 import uuid
+import threading
+import importlib.util
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import subprocess
 
-# Third-party imports (install with pip)
-try:
-    from supabase import create_client, Client
-    import psutil
-except ImportError as e:
-    print(f"Missing dependencies: {e}")
-    print("Install with: pip install supabase psutil requests")
-    exit(1)
+# Third-party imports (install with pip). The Supabase SDK and requests take
+# most of the start-up time on a Pi, so they are imported on first use and
+# the client can queue transactions before they have loaded.
+REQUIRED_MODULES = ('supabase', 'postgrest', 'psutil', 'requests', 'httpx')
+create_client = None
+APIError = None
+
+if TYPE_CHECKING:
+    from supabase import Client
+    from edge_uploader import DeviceBatchUploader
+
+from edge_offline_queue import OfflineQueue
+from edge_batch_writer import BatchWriter
+from edge_records import TransactionRecord, DetectionRecord
+from edge_circuit_breaker import CircuitBreaker, CircuitOpenError
+from edge_health_sampler import HealthSampler
+from edge_health_codec import SERIES_CODEC, encode_health_series, resample
+from edge_log_shipper import LogShipper
+from edge_scheduler import Scheduler
+from edge_rate_limiter import PriorityRateLimiter, RateLimitExceeded, LANES, TABLE_LANES
+from edge_metrics import MetricsRegistry, MetricsServer
+from edge_sync_policy import AdaptiveSyncPolicy
+from edge_replay import BacklogReplay, ReplayWindow
+from edge_detection_dedup import DetectionDeduplicator
+from edge_rollups import HourlyRollups, ROLLUP_TABLE, ROLLUP_CONFLICT_COLUMNS, ROLLUP_MODES
+
+
+def load_backend_sdk():
+    """Import the Supabase SDK (once) and bind create_client/APIError"""
+    global create_client, APIError
+    if create_client is None:
+        from supabase import create_client as supabase_create_client
+        from postgrest.exceptions import APIError as PostgrestAPIError
+        APIError = PostgrestAPIError
+        create_client = supabase_create_client
+
+
+# HTTP statuses a retry can clear, besides 5xx. APIError carries the status
+# as its code only when the body was not PostgREST JSON (e.g. a gateway page).
+TRANSIENT_HTTP_STATUSES = (408, 429)
+# PostgREST and SQLSTATE codes of outages rather than bad rows: no database
+# connection or schema cache, connection exceptions, serialization failures
+# and deadlocks, insufficient resources, statement timeouts and shutdowns
+TRANSIENT_ERROR_CODES = ('PGRST000', 'PGRST001', 'PGRST002', '08', '40', '53', '57')
+
+
+def is_transient_status(status: int) -> bool:
+    return status >= 500 or status in TRANSIENT_HTTP_STATUSES
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an APIError reports an outage (retry later) rather than a rejected request"""
+    code = str(getattr(error, 'code', '') or '')
+    if len(code) == 3 and code.isdigit():
+        return is_transient_status(int(code))
+    return code.startswith(TRANSIENT_ERROR_CODES)
+
+
+def missing_dependencies() -> List[str]:
+    """Required modules that are not installed, without importing them"""
+    return [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+
 
 class ProjectScoutEdgeClient:
     """Edge device client for Project Scout system"""
     
-    def __init__(self, config_file: str = "edge_device_config.json"):
-        """Initialize edge client with configuration"""
+    # Offline entry types and the tables they sync to
+    SYNC_TABLES = {
+        'transaction': 'transactions',
+        'product_detection': 'product_detections'
+    }
+    SYNC_DATA_TYPES = {table: data_type for data_type, table in SYNC_TABLES.items()}
+    
+    # Writes transactions and their nested "items" to transaction_items in one call
+    TRANSACTION_ITEMS_RPC = 'insert_transactions_with_items'
+    
+    def __init__(self, config_file: str = "edge_device_config.json",
+                 device_id: Optional[str] = None, data_dir: Optional[str] = None):
+        """Initialize edge client with configuration
+        
+        device_id and data_dir override the hardware-derived ID and
+        EDGE_DATA_DIR, e.g. to run several simulated devices on one host.
+        """
         
         # Load configuration
         with open(config_file, 'r') as f:
@@ -49,82 +122,370 @@ class ProjectScoutEdgeClient:
         if not self.supabase_key:
             raise ValueError("SUPABASE_ANON_KEY environment variable required")
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        # Created on first use (or by warm_up) so start-up doesn't wait on the SDK
+        self._supabase: Optional['Client'] = None
+        self._supabase_lock = threading.Lock()
+        
+        # Connection state shared by every send path
+        device_settings = self.config['device_settings']
+        self.circuit = CircuitBreaker(
+            failure_threshold=device_settings.get('circuit_failure_threshold', 3),
+            max_backoff_seconds=device_settings.get('circuit_max_backoff_seconds', 300),
+            probe_timeout_seconds=device_settings.get('timeout_seconds', 10) * 2,
+            logger=self.logger
+        )
         
-        # Device identification
-        self.device_id = self.generate_device_id()
+        # Request budget shared by every send path (security.api_rate_limit per minute)
+        security = self.config.get('security', {})
+        self.rate_limiter = PriorityRateLimiter(
+            rate_per_minute=float(os.getenv('API_RATE_LIMIT_PER_MINUTE', security.get('api_rate_limit', 60))),
+            burst=security.get('api_rate_burst'),
+            logger=self.logger
+        )
+        self.rate_limit_timeout = device_settings.get('timeout_seconds', 10)
+        
+        # Device identification (the hardware fingerprint is cached in data_dir)
+        self.data_dir = data_dir or os.getenv('EDGE_DATA_DIR', 'edge_data')
+        self.device_id = device_id or self.generate_device_id()
         self.store_id = os.getenv('DEFAULT_STORE_ID', 'store_001')
         
-        # Data cache for offline operation
-        self.offline_cache = []
+        # Durable queue for offline operation
+        self.offline_queue = OfflineQueue(
+            os.path.join(self.data_dir, 'offline_queue.db'),
+            max_size_mb=float(os.getenv('LOCAL_CACHE_SIZE_MB', '500')),
+            max_age_hours=float(os.getenv(
+                'OFFLINE_BUFFER_HOURS',
+                self.config['device_settings'].get('max_offline_hours', 24)
+            )),
+            durability_window_ms=device_settings.get('journal_durability_ms', 200),
+            group_commit_bytes=device_settings.get('journal_group_commit_kb', 64) * 1024,
+            journal_size_limit_mb=device_settings.get('journal_size_limit_mb', 4),
+            codec=device_settings.get('queue_codec', 'json'),
+            logger=self.logger
+        )
         self.last_sync = None
+        self.last_sync_stats: Dict[str, Any] = {}
+        # Rows carry an event_id the backend dedupes on, so replays never store them twice
+        self.idempotent_sync = self.config.get('features', {}).get('idempotent_sync', False)
+        
+        # Sync cadence adapts to backlog and link quality (features.adaptive_sync)
+        self.sync_policy = AdaptiveSyncPolicy(
+            base_interval_seconds=device_settings['sync_interval_minutes'] * 60,
+            min_interval_seconds=device_settings.get('sync_min_interval_seconds', 5),
+            max_interval_seconds=device_settings.get('sync_max_interval_minutes', 30) * 60,
+            logger=self.logger
+        )
+        
+        # Hourly rollups counted on the device (features.edge_rollups), restored across restarts
+        self.rollups: Optional[HourlyRollups] = None
+        self.rollup_mode = device_settings.get('rollup_mode', 'alongside')
+        if self.rollup_mode not in ROLLUP_MODES:
+            raise ValueError(f"Unknown rollup_mode {self.rollup_mode!r}, expected one of {ROLLUP_MODES}")
+        if self.config.get('features', {}).get('edge_rollups', False):
+            self.rollups = HourlyRollups(
+                self.device_id, self.store_id,
+                retention_hours=device_settings.get('rollup_retention_hours', 48),
+                logger=self.logger
+            )
+            self.rollups.restore(self.offline_queue.get_checkpoint('rollups'))
+        
+        # Repeated sightings of a product are collapsed per window (features.detection_dedup)
+        self._detection_dedup: Optional[DetectionDeduplicator] = None
+        self.detection_dedup_enabled = self.config.get('features', {}).get('detection_dedup', False)
+        self._batch_writer: Optional[BatchWriter] = None
+        self._batch_uploader: Optional['DeviceBatchUploader'] = None
+        
+        # Health metrics are sampled in the background and reported per window
+        self.health_sampler = HealthSampler(
+            sample_interval_seconds=device_settings.get('health_sample_interval_seconds', 5),
+            temperature_fn=self.get_cpu_temperature,
+            logger=self.logger
+        )
+        # Each report also carries the window's samples as a packed series (features.health_series)
+        self.health_series_enabled = self.config.get('features', {}).get('health_series', False)
+        self.health_series_interval = device_settings.get('health_series_interval_seconds', 60)
+        
+        # Log records are shipped to edge_logs in the background (logging.telemetry_enabled)
+        self.log_shipper: Optional[LogShipper] = None
+        
+        # Counters, gauges and latency histograms, served on /metrics when enabled
+        self.metrics = MetricsRegistry()
+        self.metrics_server: Optional[MetricsServer] = None
+        self._init_metrics()
         
         self.logger.info(f"Edge client initialized for device: {self.device_id}")
     
+    def _init_metrics(self):
+        """Register client metrics; scrape-time gauges read existing state directly"""
+        metrics = self.metrics
+        self.metric_sends = metrics.counter(
+            'sends_total', 'Send method calls by outcome', ('method', 'outcome'))
+        self.metric_send_seconds = metrics.histogram(
+            'send_duration_seconds', 'Send method latency including offline caching', ('method',))
+        self.metric_requests = metrics.counter(
+            'requests_total', 'Backend requests by rate-limit lane and outcome', ('lane', 'outcome'))
+        self.metric_request_seconds = metrics.histogram(
+            'request_duration_seconds', 'Backend request latency', ('lane',))
+        self.metric_retries = metrics.counter(
+            'retries_total', 'Requests re-sent after a failure', ('kind',))
+        self.metric_sync_seconds = metrics.histogram(
+            'sync_duration_seconds', 'Offline sync pass duration',
+            buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+        self.metric_sync_rows = metrics.counter(
+            'sync_rows_total', 'Offline rows delivered by sync')
+        self.metric_rollup_rows = metrics.counter(
+            'rollup_rows_total', 'Hourly rollup rows uploaded')
+        
+        metrics.gauge('sync_last_rows', 'Rows delivered by the last sync pass').set_function(
+            lambda: self.last_sync_stats.get('rows', 0))
+        metrics.gauge('sync_interval_seconds', 'Delay chosen before the next offline sync').set_function(
+            lambda: self.sync_policy.last_decision.get('delay_seconds', self.sync_policy.base_interval))
+        metrics.gauge('offline_queue_entries', 'Entries waiting in the offline queue').set_function(
+            lambda: len(self.offline_queue))
+        metrics.gauge('offline_queue_bytes', 'Payload bytes in the offline queue').set_function(
+            lambda: self.offline_queue.size_bytes)
+        metrics.counter('offline_queue_commits_total', 'Group commits (fsyncs) of the offline queue').set_function(
+            lambda: self.offline_queue.journal_stats['commits'])
+        metrics.gauge('rollup_pending_buckets', 'Hourly rollup buckets changed since the last upload').set_function(
+            lambda: self.rollups.pending if self.rollups else 0)
+        metrics.gauge('detection_groups_open', 'Product detections being collapsed into an open window').set_function(
+            lambda: self._detection_dedup.open_groups if self._detection_dedup else 0)
+        metrics.counter('detections_deduplicated_total', 'Repeat detections folded into an open window').set_function(
+            lambda: self._detection_dedup.stats['merged'] if self._detection_dedup else 0)
+        metrics.counter('log_records_shipped_total', 'Log records delivered to edge_logs').set_function(
+            lambda: self.log_shipper.stats['shipped'] if self.log_shipper else 0)
+        log_records_dropped = metrics.counter(
+            'log_records_dropped_total', 'Log records not shipped to edge_logs by reason', ('reason',))
+        for reason in ('sampled', 'overflow', 'rejected'):
+            log_records_dropped.labels(reason).set_function(
+                lambda r=reason: self.log_shipper.stats[r] if self.log_shipper else 0)
+        metrics.gauge('batch_writer_queue_depth', 'Live events waiting for a batch').set_function(
+            lambda: self._batch_writer.queue_depth if self._batch_writer else 0)
+        metrics.gauge('circuit_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)').set_function(
+            lambda: (self.circuit.CLOSED, self.circuit.HALF_OPEN, self.circuit.OPEN).index(self.circuit.state))
+        metrics.counter('circuit_opened_total', 'Times the circuit breaker opened').set_function(
+            lambda: self.circuit.stats['opened'])
+        self.metric_retries.labels('upload').set_function(
+            lambda: self._batch_uploader.stats['retries'] if self._batch_uploader else 0)
+        
+        rate_limit_waits = metrics.counter(
+            'rate_limit_waits_total', 'Requests that waited for a rate-limit token', ('lane',))
+        rate_limit_wait_seconds = metrics.counter(
+            'rate_limit_wait_seconds_total', 'Time spent waiting for rate-limit tokens', ('lane',))
+        for lane in LANES:
+            lane_stats = self.rate_limiter.stats[lane]
+            rate_limit_waits.labels(lane).set_function(lambda s=lane_stats: s['waited'])
+            rate_limit_wait_seconds.labels(lane).set_function(lambda s=lane_stats: s['total_wait'])
+    
+    def _observe_send(self, method: str, started: float, outcome: str):
+        self.metric_sends.labels(method, outcome).inc()
+        self.metric_send_seconds.labels(method).observe_since(started)
+    
+    def _observe_request(self, lane: str, outcome: str, started: Optional[float] = None):
+        self.metric_requests.labels(lane, outcome).inc()
+        if started is not None:
+            self.metric_request_seconds.labels(lane).observe_since(started)
+    
+    def start_metrics_server(self) -> bool:
+        """Serve /metrics on device_settings.metrics_bind_host:metrics_port if the feature is enabled"""
+        if not self.config.get('features', {}).get('metrics_endpoint', False) or self.metrics_server:
+            return False
+        try:
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                host=os.getenv('EDGE_METRICS_HOST', self.config['device_settings'].get('metrics_bind_host', '127.0.0.1')),
+                port=int(os.getenv('EDGE_METRICS_PORT', self.config['device_settings'].get('metrics_port', 9109))),
+                logger=self.logger
+            ).start()
+            return True
+        except OSError as e:
+            self.logger.warning(f"Metrics endpoint unavailable: {e}")
+            return False
+    
+    def start_log_shipping(self) -> bool:
+        """Attach a LogShipper to the root logger if logging.telemetry_enabled is set"""
+        logging_config = self.config.get('logging', {})
+        if not logging_config.get('telemetry_enabled', False) or self.log_shipper:
+            return False
+        self.log_shipper = LogShipper(
+            self._ship_logs, self.device_id,
+            capacity=logging_config.get('ship_buffer_records', 1000),
+            batch_size=logging_config.get('ship_batch_size', 100),
+            interval_seconds=logging_config.get('ship_interval_seconds', 30),
+            sample_per_minute=logging_config.get('ship_sample_per_minute'),
+            level=getattr(logging, logging_config.get('ship_level', 'INFO'))
+        ).start()
+        logging.getLogger().addHandler(self.log_shipper)
+        return True
+    
+    def stop_log_shipping(self):
+        """Detach the LogShipper and ship what it still holds"""
+        if self.log_shipper is None:
+            return
+        logging.getLogger().removeHandler(self.log_shipper)
+        self.log_shipper.close(timeout=self.rate_limit_timeout)
+        self.logger.info(f"Log shipping stats: {self.log_shipper.stats}")
+    
+    def _ship_logs(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert a batch of edge_logs rows on the lowest-priority lane; False if the backend rejects it
+
+        Outages and a missing SDK raise, so LogShipper keeps the batch for the next attempt.
+        """
+        try:
+            self._execute(self.supabase.table('edge_logs').insert(rows, returning='minimal'),
+                          lane=TABLE_LANES['edge_logs'])
+        except Exception as e:
+            # APIError stays None when the SDK could not be imported; let LogShipper keep the batch
+            if APIError is not None and isinstance(e, APIError) and not is_transient_error(e):
+                return False
+            raise
+        return True
+    
+    @property
+    def supabase(self) -> 'Client':
+        """Supabase client, created on first use"""
+        if self._supabase is None:
+            with self._supabase_lock:
+                if self._supabase is None:
+                    load_backend_sdk()
+                    self._supabase = create_client(self.supabase_url, self.supabase_key)
+        return self._supabase
+    
+    def warm_up(self) -> threading.Thread:
+        """Load the backend SDK and create the Supabase client in the background"""
+        thread = threading.Thread(target=lambda: self.supabase, name='edge-warm-up', daemon=True)
+        thread.start()
+        return thread
+    
     def generate_device_id(self) -> str:
-        """Generate unique device ID based on hardware"""
+        """Generate unique device ID based on hardware
+        
+        The result is cached in data_dir together with the CPU serial, so
+        restarts skip the MAC lookup while a card moved to another board
+        still gets a fresh ID.
+        """
+        # Get CPU serial (Raspberry Pi specific)
+        cpu_serial = "unknown"
         try:
-            # Get MAC address and CPU serial
+            with open('/proc/cpuinfo', 'r') as f:
+                for line in f:
+                    if line.startswith('Serial'):
+                        cpu_serial = line.split(':')[1].strip()
+                        break
+        except:
+            pass
+        
+        identity_path = os.path.join(self.data_dir, 'device_identity.json')
+        try:
+            with open(identity_path, 'r') as f:
+                identity = json.load(f)
+            if identity.get('cpu_serial') == cpu_serial and identity.get('device_id'):
+                return identity['device_id']
+        except (OSError, ValueError):
+            pass
+        
+        try:
+            # Get MAC address
             mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff) 
                            for elements in range(0,8*6,8)][::-1])
             
-            # Get CPU serial (Raspberry Pi specific)
-            cpu_serial = "unknown"
-            try:
-                with open('/proc/cpuinfo', 'r') as f:
-                    for line in f:
-                        if line.startswith('Serial'):
-                            cpu_serial = line.split(':')[1].strip()
-                            break
-            except:
-                pass
-            
             # Create device fingerprint
             fingerprint = f"{mac}-{cpu_serial}-RaspberryPi5"
             device_hash = hashlib.sha256(fingerprint.encode()).hexdigest()[:12]
-            return f"Pi5_Edge_{device_hash}"
+            device_id = f"Pi5_Edge_{device_hash}"
             
         except Exception as e:
             self.logger.warning(f"Could not generate hardware-based ID: {e}")
-            return f"Pi5_Edge_{uuid.uuid4().hex[:12]}"
+            device_id = f"Pi5_Edge_{uuid.uuid4().hex[:12]}"
+        
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            temp_path = f"{identity_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({'device_id': device_id, 'cpu_serial': cpu_serial}, f)
+            os.replace(temp_path, identity_path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache device ID: {e}")
+        return device_id
     
     def register_device(self) -> bool:
-        """Register device with Project Scout backend"""
+        """Register device with Project Scout backend
+        
+        A device whose identity matches the local registration record only
+        sends a last_seen heartbeat; otherwise the devices row is written
+        with a single upsert and the record is refreshed.
+        """
+        started = time.perf_counter()
         try:
-            device_info = {
-                'device_id': self.device_id,
-                'device_type': self.config['device_settings']['device_type'],
-                'firmware_version': self.config['device_settings']['firmware_version'],
-                'store_id': self.store_id,
-                'registration_time': datetime.utcnow().isoformat(),
-                'status': 'active',
-                'last_seen': datetime.utcnow().isoformat()
-            }
+            profile = self._registration_profile()
+            record = self._load_registration_record()
             
-            # Check if device already exists
-            existing = self.supabase.table('devices').select('*').eq('device_id', self.device_id).execute()
-            
-            if existing.data:
-                # Update existing device
-                result = self.supabase.table('devices').update({
+            if record and all(record.get(key) == value for key, value in profile.items()):
+                result = self._execute(self.supabase.table('devices').update({
                     'last_seen': datetime.utcnow().isoformat(),
                     'status': 'active'
-                }).eq('device_id', self.device_id).execute()
+                }).eq('device_id', self.device_id), lane='health')
                 
-                self.logger.info(f"Updated existing device registration: {self.device_id}")
-            else:
-                # Register new device
-                result = self.supabase.table('devices').insert(device_info).execute()
-                self.logger.info(f"Registered new device: {self.device_id}")
+                if result.data:
+                    self._save_registration_record(profile)
+                    self.logger.debug(f"Device heartbeat sent: {self.device_id}")
+                    self._observe_send('register_device', started, 'sent')
+                    return True
+                # The backend lost the row, fall through and register again
+            
+            # registration_time is left to the column default so re-registering keeps it
+            self._execute(self.supabase.table('devices').upsert({
+                **profile,
+                'status': 'active',
+                'last_seen': datetime.utcnow().isoformat()
+            }, on_conflict='device_id'), lane='health')
             
+            self._save_registration_record(profile)
+            self.logger.info(f"Registered device: {self.device_id}")
+            self._observe_send('register_device', started, 'sent')
             return True
             
         except Exception as e:
             self.logger.error(f"Device registration failed: {e}")
+            self._observe_send('register_device', started, 'failed')
             return False
     
+    def _registration_profile(self) -> Dict[str, Any]:
+        """Device fields that require a full re-registration when they change"""
+        return {
+            'device_id': self.device_id,
+            'device_type': self.config['device_settings']['device_type'],
+            'firmware_version': self.config['device_settings']['firmware_version'],
+            'store_id': self.store_id
+        }
+    
+    def _load_registration_record(self) -> Optional[Dict[str, Any]]:
+        """Read the locally cached registration record, if any"""
+        try:
+            with open(os.path.join(self.data_dir, 'registration.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_registration_record(self, profile: Dict[str, Any]):
+        """Persist the confirmed registration so restarts can skip the upsert"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = os.path.join(self.data_dir, 'registration.json')
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({**profile, 'confirmed_at': datetime.utcnow().isoformat()}, f)
+        os.replace(temp_path, path)
+    
     def send_transaction_data(self, transaction_data: Dict[str, Any]) -> bool:
-        """Send transaction data to Project Scout backend"""
+        """Send transaction data to Project Scout backend
+        
+        Line items passed as transaction_data['items'] are written to
+        transaction_items in the same request and database transaction.
+        """
+        started = time.perf_counter()
+        if self._count_rollup('transaction', transaction_data):
+            self._observe_send('send_transaction_data', started, 'rolled_up')
+            return True
         try:
             # Add device metadata
             transaction_data.update({
@@ -132,12 +493,18 @@ class ProjectScoutEdgeClient:
                 'store_id': self.store_id,
                 'created_at': datetime.utcnow().isoformat()
             })
+            self._stamp_event_id(transaction_data)
             
             # Send to Supabase
-            result = self.supabase.table('transactions').insert(transaction_data).execute()
+            if transaction_data.get('items'):
+                query = self._transaction_items_query([transaction_data])
+            else:
+                query = self.supabase.table('transactions').insert(transaction_data)
+            result = self._execute(query, lane='transactions')
             
             if result.data:
                 self.logger.info(f"Transaction sent successfully: {result.data[0]['id']}")
+                self._observe_send('send_transaction_data', started, 'sent')
                 return True
             else:
                 raise Exception("No data returned from insert")
@@ -147,22 +514,32 @@ class ProjectScoutEdgeClient:
             
             # Cache for offline sync
             self.cache_offline_data('transaction', transaction_data)
+            self._observe_send('send_transaction_data', started, 'cached')
             return False
     
     def send_product_detection(self, product_data: Dict[str, Any]) -> bool:
         """Send product detection data"""
+        started = time.perf_counter()
+        if self._count_rollup('product_detection', product_data):
+            self._observe_send('send_product_detection', started, 'rolled_up')
+            return True
+        if self.detection_dedup_enabled:
+            merged = self.detection_dedup.add(product_data, self.store_id)
+            self._observe_send('send_product_detection', started, 'deduplicated' if merged else 'buffered')
+            return True
         try:
-            detection_data = {
+            detection_data = self._stamp_event_id({
                 'device_id': self.device_id,
                 'store_id': self.store_id,
                 'detected_at': datetime.utcnow().isoformat(),
                 **product_data
-            }
+            })
             
-            result = self.supabase.table('product_detections').insert(detection_data).execute()
+            result = self._execute(self.supabase.table('product_detections').insert(detection_data), lane='product_detections')
             
             if result.data:
                 self.logger.info(f"Product detection sent: {product_data.get('brand', 'unknown')}")
+                self._observe_send('send_product_detection', started, 'sent')
                 return True
             else:
                 raise Exception("No data returned from insert")
@@ -170,35 +547,204 @@ class ProjectScoutEdgeClient:
         except Exception as e:
             self.logger.error(f"Failed to send product detection: {e}")
             self.cache_offline_data('product_detection', detection_data)
+            self._observe_send('send_product_detection', started, 'cached')
+            return False
+    
+    @property
+    def batch_writer(self) -> BatchWriter:
+        """Micro-batching writer for live events, started on first use"""
+        if self._batch_writer is None:
+            device_settings = self.config['device_settings']
+            self._batch_writer = BatchWriter(
+                self._write_live_batch,
+                max_batch_size=device_settings.get('batch_max_size', 100),
+                linger_ms=device_settings.get('batch_linger_ms', 200),
+                overflow_fn=lambda table, record: self.cache_offline_data(record.data_type, record.to_row()),
+                logger=self.logger
+            )
+        return self._batch_writer
+    
+    def submit_transaction(self, transaction_data: Dict[str, Any]) -> Future:
+        """Queue a transaction on the batch writer without waiting for the network
+        
+        The returned Future resolves to True once stored, or False if the
+        transaction was cached for offline sync. It is buffered as a compact
+        record and only turned into a row when its batch is sent.
+        """
+        record = TransactionRecord(self.device_id, self.store_id, transaction_data)
+        if self._count_rollup(record.data_type, transaction_data, record.created_at / 1000):
+            return self._accepted_future()
+        return self.batch_writer.submit(record.table, record)
+    
+    def submit_product_detection(self, product_data: Dict[str, Any]) -> Future:
+        """Queue a product detection on the batch writer
+        
+        With detection deduplication on, the detection is folded into its
+        window and the Future resolves at once; the collapsed record is
+        submitted when the window closes.
+        """
+        record = DetectionRecord(self.device_id, self.store_id, product_data)
+        if self._count_rollup(record.data_type, product_data, record.detected_at / 1000):
+            return self._accepted_future()
+        if self.detection_dedup_enabled:
+            self.detection_dedup.add(product_data, self.store_id, seen_at=record.detected_at / 1000)
+            return self._accepted_future()
+        return self.batch_writer.submit(record.table, record)
+    
+    def _count_rollup(self, data_type: str, data: Dict[str, Any], timestamp: Optional[float] = None) -> bool:
+        """Count a captured event in the hourly rollups; True if its raw row is not to be uploaded"""
+        if self.rollups is None:
             return False
+        self.rollups.add(data_type, data, timestamp)
+        return self.rollup_mode == 'instead'
+    
+    @staticmethod
+    def _accepted_future() -> Future:
+        future = Future()
+        future.set_result(True)
+        return future
+    
+    @property
+    def detection_dedup(self) -> DetectionDeduplicator:
+        """Windowed deduplicator feeding collapsed detections to the batch writer, started on first use"""
+        if self._detection_dedup is None:
+            device_settings = self.config['device_settings']
+            self._detection_dedup = DetectionDeduplicator(
+                self._emit_detection_group,
+                window_seconds=device_settings.get('detection_dedup_window_seconds', 30),
+                gap_seconds=device_settings.get('detection_dedup_gap_seconds', 5),
+                max_keys=device_settings.get('detection_dedup_max_keys', 256),
+                logger=self.logger
+            )
+        return self._detection_dedup
+    
+    def _emit_detection_group(self, detection: Dict[str, Any], first_seen: float):
+        """Send one collapsed detection, stamped with its first sighting"""
+        record = DetectionRecord(self.device_id, self.store_id, detection, detected_at=int(first_seen * 1000))
+        self.batch_writer.submit(record.table, record)
+    
+    def _write_live_batch(self, table: str, records: List[Any]) -> List[bool]:
+        """Flush callback for the batch writer; caches rows that could not be stored"""
+        items = [{'id': index, 'data': self._stamp_event_id(record.to_row())}
+                 for index, record in enumerate(records)]
+        try:
+            failed = self._insert_chunk(table, items, {'requests': 0, 'request_seconds': 0.0})
+        except Exception as e:
+            self.logger.error(f"Failed to send batch of {len(items)} rows to {table}: {e}")
+            failed = items
+        
+        failed_ids = {item['id'] for item in failed}
+        for item in failed:
+            self.cache_offline_data(self.SYNC_DATA_TYPES[table], item['data'])
+        
+        if len(failed) < len(items):
+            self.logger.info(f"Batch sent to {table}: {len(items) - len(failed)} rows")
+        return [item['id'] not in failed_ids for item in items]
     
     def send_health_metrics(self) -> bool:
-        """Send device health metrics"""
+        """Send one aggregated device health record for the current window"""
+        started = time.perf_counter()
         try:
-            # Collect system metrics
-            health_data = {
-                'device_id': self.device_id,
-                'timestamp': datetime.utcnow().isoformat(),
-                'cpu_usage': psutil.cpu_percent(interval=1),
-                'memory_usage': psutil.virtual_memory().percent,
-                'disk_usage': psutil.disk_usage('/').percent,
-                'temperature': self.get_cpu_temperature(),
-                'uptime_seconds': time.time() - psutil.boot_time(),
-                'network_connected': self.check_network_connection()
-            }
+            health_data = self._collect_health_data(self.check_network_connection())
             
-            result = self.supabase.table('device_health').insert(health_data).execute()
+            result = self._execute(self.supabase.table('device_health').insert(health_data), lane='health')
             
             if result.data:
                 self.logger.debug("Health metrics sent successfully")
+                self._observe_send('send_health_metrics', started, 'sent')
                 return True
             else:
                 raise Exception("No data returned from insert")
                 
         except Exception as e:
             self.logger.error(f"Failed to send health metrics: {e}")
+            self._observe_send('send_health_metrics', started, 'failed')
             return False
     
+    def upload_rollups(self) -> bool:
+        """Upsert the hourly rollup buckets that changed since the last upload
+        
+        The counters are saved to the offline queue database first, so
+        after a restart the device resumes from totals at least as large
+        as any it has uploaded.
+        """
+        if self.rollups is None:
+            return False
+        self.offline_queue.set_checkpoint('rollups', self.rollups.snapshot())
+        rows = self.rollups.take_pending()
+        if not rows:
+            return True
+        
+        try:
+            self._execute(self.supabase.table(ROLLUP_TABLE).upsert(
+                rows, on_conflict=ROLLUP_CONFLICT_COLUMNS, returning='minimal'
+            ), lane=TABLE_LANES[ROLLUP_TABLE])
+        except Exception as e:
+            self.logger.error(f"Failed to upload {len(rows)} hourly rollup rows: {e}")
+            self.rollups.requeue(rows)
+            return False
+        
+        self.metric_rollup_rows.inc(len(rows))
+        self.logger.debug(f"Uploaded {len(rows)} hourly rollup rows")
+        return True
+    
+    def _collect_health_data(self, network_connected: bool) -> Dict[str, Any]:
+        """Build a device_health row from the background sampler without blocking
+        
+        The base columns carry the window mean (uptime the latest value); the
+        full min/mean/max/p95 summary and offline queue storage/eviction
+        counters go into metadata. With features.health_series the samples
+        themselves, averaged to health_series_interval_seconds, are added as
+        a base64 edge_health_codec batch under metadata.series. The summary
+        stays alongside it, since the backend does not decode the series.
+        
+        network_connected is probed by the caller, since the async client's
+        check_network_connection is a coroutine.
+        """
+        if not self.health_sampler.running:
+            self.health_sampler.start()
+        
+        window = self.health_sampler.drain_window()
+        if window is None:
+            self.health_sampler.sample()
+            window = self.health_sampler.drain_window()
+        
+        def mean(metric):
+            return window[metric]['mean'] if window[metric] else None
+        
+        health_data = {
+            'device_id': self.device_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'cpu_usage': mean('cpu_usage'),
+            'memory_usage': mean('memory_usage'),
+            'disk_usage': mean('disk_usage'),
+            'temperature': mean('temperature'),
+            'uptime_seconds': int(window['uptime_seconds']),
+            'network_connected': network_connected,
+            'metadata': {
+                'window_seconds': round(window['window_end'] - window['window_start'], 1),
+                'samples': window['samples'],
+                'cpu_usage': window['cpu_usage'],
+                'memory_usage': window['memory_usage'],
+                'disk_usage': window['disk_usage'],
+                'temperature': window['temperature'],
+                'offline_queue': self.offline_queue.stats(),
+                'sync_policy': self.sync_policy.last_decision
+            }
+        }
+        
+        if self.health_series_enabled:
+            points = window['points']
+            if self.health_series_interval:
+                points = resample(points, self.health_series_interval)
+            health_data['metadata']['series'] = {
+                'codec': SERIES_CODEC,
+                'interval_seconds': self.health_series_interval,
+                'points': len(points),
+                'data': base64.b64encode(encode_health_series(points)).decode('ascii')
+            }
+        return health_data
+    
     def get_cpu_temperature(self) -> Optional[float]:
         """Get CPU temperature (Raspberry Pi specific)"""
         try:
@@ -209,102 +755,383 @@ class ProjectScoutEdgeClient:
             return None
     
     def check_network_connection(self) -> bool:
-        """Check if device has network connectivity"""
+        """Check if device has network connectivity
+        
+        Answers from the circuit breaker, which tracks the outcome of real
+        requests; the network is only probed when a half-open probe is due.
+        """
+        if self.circuit.state == CircuitBreaker.CLOSED:
+            return True
+        if not self.circuit.allow_request():
+            return False
+        
         try:
+            import requests
             response = requests.get(self.supabase_url, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+            connected = response.status_code < 500
+        except Exception:
+            connected = False
+        
+        if connected:
+            self.circuit.record_success()
+        else:
+            self.circuit.record_failure()
+        return connected
     
-    def cache_offline_data(self, data_type: str, data: Dict[str, Any]):
-        """Cache data for offline sync"""
-        cache_entry = {
-            'type': data_type,
-            'data': data,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+    def _execute(self, query, lane: str):
+        """Execute a PostgREST query through the rate limiter and circuit breaker
+        
+        Raises CircuitOpenError without touching the network while the
+        backend is known to be unreachable, and RateLimitExceeded when the
+        lane cannot get a token in time, so callers fall straight back to
+        the offline queue. An APIError for an outage (5xx, 408, 429 or a
+        database-side timeout) counts against the circuit; any other
+        APIError means the backend answered and rejected the request.
+        """
+        if not self.circuit.allow_request():
+            self._observe_request(lane, 'circuit_open')
+            raise CircuitOpenError("Backend unreachable, circuit open")
         
-        self.offline_cache.append(cache_entry)
+        # Only spend (and wait for) a token on a request that will actually be sent
+        if not self.rate_limiter.acquire(lane, timeout=self.rate_limit_timeout):
+            self.circuit.release()
+            self._observe_request(lane, 'rate_limited')
+            raise RateLimitExceeded(f"No request budget for {lane} within {self.rate_limit_timeout}s")
         
-        # Limit cache size
-        max_cache_size = 1000
-        if len(self.offline_cache) > max_cache_size:
-            self.offline_cache = self.offline_cache[-max_cache_size:]
+        started = time.perf_counter()
+        try:
+            result = query.execute()
+        except APIError as e:
+            if is_transient_error(e):
+                self.circuit.record_failure()
+                self._observe_request(lane, 'error', started)
+                raise
+            # The backend answered, it just rejected the request
+            self.circuit.record_success()
+            self._observe_request(lane, 'rejected', started)
+            raise
+        except Exception:
+            self.circuit.record_failure()
+            self._observe_request(lane, 'error', started)
+            raise
         
+        self.circuit.record_success()
+        self._observe_request(lane, 'ok', started)
+        return result
+    
+    def cache_offline_data(self, data_type: str, data: Dict[str, Any]):
+        """Cache data for offline sync"""
+        if data_type in self.SYNC_TABLES:
+            self._stamp_event_id(data)
+        self.offline_queue.enqueue(data_type, data)
         self.logger.debug(f"Cached {data_type} data for offline sync")
     
+    def _stamp_event_id(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a row its idempotency key before its first send; kept across retries"""
+        if self.idempotent_sync and not data.get('event_id'):
+            data['event_id'] = str(uuid.uuid4())
+        return data
+    
     def sync_offline_data(self) -> bool:
-        """Sync cached offline data"""
-        if not self.offline_cache:
+        """Replay cached offline data in checkpointed windows, a few in parallel
+        
+        Progress is a high-water mark saved with each acknowledgement (see
+        BacklogReplay), so a pass cut short by a crash or outage resumes where
+        it stopped. Windows in flight at the time are sent again; their
+        event_ids let the backend skip the rows it already stored.
+        """
+        self.offline_queue.prune()
+        if not len(self.offline_queue):
             return True
         
-        synced_count = 0
-        failed_items = []
+        chunk_size = self._sync_chunk_size()
+        parallel = max(1, self.config['device_settings'].get('replay_parallel_chunks', 4))
+        stats = self._new_sync_stats()
+        start_time = time.time()
         
-        for item in self.offline_cache:
-            try:
-                data_type = item['type']
-                data = item['data']
-                
-                if data_type == 'transaction':
-                    result = self.supabase.table('transactions').insert(data).execute()
-                elif data_type == 'product_detection':
-                    result = self.supabase.table('product_detections').insert(data).execute()
-                else:
-                    continue
-                
-                if result.data:
-                    synced_count += 1
-                else:
-                    failed_items.append(item)
+        try:
+            replay = self._start_replay(chunk_size)
+            error = None
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='edge-replay') as pool:
+                in_flight = {}
+                while True:
+                    # Keep up to `parallel` windows in flight; stop handing out more after an error
+                    while error is None and len(in_flight) < parallel:
+                        window = replay.next_window()
+                        if window is None:
+                            break
+                        in_flight[pool.submit(self._replay_window, window, chunk_size)] = window
+                    if not in_flight:
+                        break
                     
-            except Exception as e:
-                self.logger.error(f"Failed to sync cached item: {e}")
-                failed_items.append(item)
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        delivered, rejected, window_stats, window_error = future.result()
+                        # Acknowledged as soon as each window is done, not per wave
+                        replay.complete(in_flight.pop(future), delivered, finished=window_error is None,
+                                        rejected_ids=rejected)
+                        self._merge_sync_stats(stats, window_stats)
+                        error = error or window_error
+            if error:
+                raise error
+            replay.close()
+                    
+        except Exception as e:
+            self.logger.error(f"Offline sync interrupted: {e}")
+            stats['failed'] += 1
+            stats['interrupted'] = True
+        
+        self._record_sync_stats(stats, start_time)
+        return stats['failed'] == 0
+    
+    def _start_replay(self, chunk_size: int) -> BacklogReplay:
+        """Resume the persisted replay cycle, or start one over the current backlog"""
+        return BacklogReplay(
+            self.offline_queue,
+            window_size=chunk_size * len(self.SYNC_TABLES),
+            order=self.config['device_settings'].get('replay_order', 'oldest_first'),
+            max_rejections=self.config['device_settings'].get('replay_max_rejections', 3),
+            logger=self.logger
+        )
+    
+    def _replay_window(self, window: ReplayWindow, chunk_size: int):
+        """Send one window; returns (delivered ids, rejected ids, stats, error that cut it short)"""
+        stats = self._new_sync_stats()
+        chunks, delivered = self._group_sync_batch(window.entries, chunk_size)
+        rejected = []
+        try:
+            for table, chunk in chunks:
+                failed = self._insert_chunk(table, chunk, stats)
+                delivered.extend(self._count_delivered(chunk, failed, stats))
+                rejected.extend(item['id'] for item in failed)
+        except Exception as e:
+            return delivered, rejected, stats, e
+        return delivered, rejected, stats, None
+    
+    @staticmethod
+    def _new_sync_stats() -> Dict[str, Any]:
+        return {'rows': 0, 'bytes': 0, 'requests': 0, 'request_seconds': 0.0, 'failed': 0}
+    
+    @staticmethod
+    def _merge_sync_stats(stats: Dict[str, Any], window_stats: Dict[str, Any]):
+        for key, value in window_stats.items():
+            stats[key] += value
+    
+    def _sync_chunk_size(self) -> int:
+        """Rows per insert request; batch_upload off falls back to one row per request"""
+        if self.config.get('features', {}).get('batch_upload', True):
+            return self.config['device_settings'].get('sync_batch_size', 500)
+        return 1
+    
+    def _group_sync_batch(self, batch: List[Dict[str, Any]], chunk_size: int):
+        """Split queue items into (table, chunk) pairs; returns them with unsyncable ids"""
+        by_table = defaultdict(list)
+        unsyncable = []
+        for item in batch:
+            table = self.SYNC_TABLES.get(item['type'])
+            if table:
+                by_table[table].append(item)
+            else:
+                # Unknown entry types can never be synced
+                unsyncable.append(item['id'])
         
-        # Update cache with failed items
-        self.offline_cache = failed_items
+        chunks = [
+            (table, items[start:start + chunk_size])
+            for table, items in by_table.items()
+            for start in range(0, len(items), chunk_size)
+        ]
+        return chunks, unsyncable
+    
+    def _count_delivered(self, chunk: List[Dict[str, Any]], failed: List[Dict[str, Any]],
+                         stats: Dict[str, Any]) -> List[int]:
+        """Update sync stats for a chunk and return the ids that were delivered"""
+        failed_ids = {item['id'] for item in failed}
+        delivered = []
+        for item in chunk:
+            if item['id'] not in failed_ids:
+                delivered.append(item['id'])
+                stats['rows'] += 1
+                stats['bytes'] += item['size']
+        stats['failed'] += len(failed)
+        return delivered
+    
+    def _record_sync_stats(self, stats: Dict[str, Any], start_time: float):
+        """Derive throughput for a finished sync pass and log it"""
+        elapsed = max(time.time() - start_time, 1e-6)
+        stats['seconds'] = round(elapsed, 3)
+        stats['rows_per_sec'] = round(stats['rows'] / elapsed, 1)
+        stats['bytes_per_sec'] = round(stats['bytes'] / elapsed, 1)
+        stats['request_seconds'] = round(stats['request_seconds'], 3)
+        self.last_sync_stats = stats
+        self.sync_policy.record_pass(stats)
+        self.metric_sync_seconds.observe(elapsed)
+        self.metric_sync_rows.inc(stats['rows'])
         
-        if synced_count > 0:
-            self.logger.info(f"Synced {synced_count} cached items")
+        if stats['rows'] > 0:
+            self.logger.info(
+                f"Synced {stats['rows']} cached items in {stats['requests']} requests "
+                f"({stats['rows_per_sec']} rows/s, {stats['bytes_per_sec']} bytes/s)"
+            )
+    
+    def _transaction_items_query(self, rows: List[Dict[str, Any]]):
+        """One RPC storing transactions with their nested items; event_ids already stored are skipped"""
+        return self.supabase.rpc(self.TRANSACTION_ITEMS_RPC, {'p_transactions': rows})
+    
+    def _insert_query(self, table: str, rows: List[Dict[str, Any]]):
+        """Bulk insert, or with idempotent_sync an upsert that skips event_ids already stored
         
-        return len(failed_items) == 0
+        Transactions carrying line items go through the transaction-items
+        RPC instead, headers and items committed together.
+        """
+        if table == 'transactions' and any(row.get('items') for row in rows):
+            return self._transaction_items_query(rows)
+        if self.idempotent_sync:
+            return self.supabase.table(table).upsert(
+                rows, on_conflict='event_id', ignore_duplicates=True, returning='minimal'
+            )
+        return self.supabase.table(table).insert(rows)
+    
+    def _insert_chunk(self, table: str, items: List[Dict[str, Any]],
+                      stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert queue items as one request, bisecting rejected chunks
+        
+        Returns the items the backend rejected. Connectivity errors and
+        outage responses (see is_transient_error) are re-raised so the sync
+        stops with the chunk still queued instead of bisecting a dead link.
+        """
+        try:
+            stats['requests'] += 1
+            started = time.perf_counter()
+            try:
+                result = self._execute(
+                    self._insert_query(table, [item['data'] for item in items]),
+                    lane=TABLE_LANES[table]
+                )
+            finally:
+                stats['request_seconds'] += time.perf_counter() - started
+            # Idempotent inserts return no representation; getting no error is success
+            if result.data or self.idempotent_sync:
+                return []
+            raise APIError({'message': 'No data returned from insert'})
+            
+        except APIError as e:
+            if is_transient_error(e):
+                raise
+            if len(items) == 1:
+                self.logger.error(f"Backend rejected row for {table}: {e}")
+                return items
+            
+            self.metric_retries.labels('bisect').inc()
+            middle = len(items) // 2
+            return (self._insert_chunk(table, items[:middle], stats) +
+                    self._insert_chunk(table, items[middle:], stats))
     
     def run_continuous_monitoring(self):
-        """Run continuous monitoring and data collection"""
+        """Run registration, health reporting and offline sync as scheduled jobs"""
         self.logger.info("Starting continuous monitoring...")
         
-        # Register device on startup
-        self.register_device()
+        device_settings = self.config['device_settings']
+        self.scheduler = Scheduler(self.device_id, logger=self.logger)
         
-        health_interval = 300  # 5 minutes
-        sync_interval = self.config['device_settings']['sync_interval_minutes'] * 60
+        # Registration runs shortly after boot (spread across the fleet), then refreshes last_seen
+        self.scheduler.add_job(
+            'registration', self.register_device,
+            device_settings.get('registration_interval_minutes', 60) * 60,
+            jitter_seconds=device_settings.get('startup_jitter_seconds', 30)
+        )
+        self.scheduler.add_job(
+            'health', self.send_health_metrics,
+            device_settings.get('health_report_interval_seconds', 300)
+        )
+        adaptive_sync = self.config.get('features', {}).get('adaptive_sync', False)
+        self.scheduler.add_job(
+            'sync', self._sync_job,
+            device_settings['sync_interval_minutes'] * 60,
+            interval_fn=self._next_sync_interval if adaptive_sync else None
+        )
+        if self.rollups is not None:
+            self.scheduler.add_job(
+                'rollups', self.upload_rollups,
+                device_settings.get('rollup_upload_interval_minutes', 5) * 60
+            )
         
-        last_health_check = 0
-        last_sync = 0
+        self.warm_up()
+        self.health_sampler.start()
+        self.start_metrics_server()
+        self.start_log_shipping()
         
         try:
-            while True:
-                current_time = time.time()
-                
-                # Send health metrics periodically
-                if current_time - last_health_check >= health_interval:
-                    self.send_health_metrics()
-                    last_health_check = current_time
-                
-                # Sync offline data periodically
-                if current_time - last_sync >= sync_interval:
-                    if self.check_network_connection():
-                        self.sync_offline_data()
-                    last_sync = current_time
-                
-                # Sleep for collection interval
-                time.sleep(self.config['device_settings']['collection_interval_seconds'])
+            self.scheduler.run_forever()
                 
         except KeyboardInterrupt:
             self.logger.info("Monitoring stopped by user")
         except Exception as e:
             self.logger.error(f"Monitoring error: {e}")
+        finally:
+            self.scheduler.stop()
+            self.logger.info(f"Scheduler job stats: {self.scheduler.stats()}")
+            self.logger.info(f"Rate limiter stats: {self.rate_limiter.snapshot()}")
+            self.health_sampler.stop()
+            # Emit open detection groups, then flush events still lingering in the batch writer
+            if self._detection_dedup is not None:
+                self._detection_dedup.close()
+            if self._batch_writer is not None:
+                self._batch_writer.close()
+            # Keep this hour's counters for the next start
+            if self.rollups is not None:
+                self.offline_queue.set_checkpoint('rollups', self.rollups.snapshot())
+            # Commit queued events still inside the durability window
+            self.offline_queue.flush()
+            self.stop_log_shipping()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+                self.metrics_server = None
+    
+    def _sync_job(self):
+        """Scheduled offline sync, skipped while the backend is unreachable"""
+        if self.check_network_connection():
+            if self.config.get('features', {}).get('device_batch_upload', False):
+                try:
+                    self.batch_uploader.upload_pending()
+                except Exception as e:
+                    # e.g. IOT_DEVICE_API_KEY unset; the regular sync below still runs
+                    self.logger.error(f"Device batch upload failed: {e}")
+            self.sync_offline_data()
+        else:
+            self.sync_policy.record_offline()
+    
+    def _next_sync_interval(self) -> float:
+        """Delay before the next sync pass, chosen by the adaptive sync policy"""
+        return self.sync_policy.next_interval(len(self.offline_queue))
+    
+    @property
+    def batch_uploader(self) -> 'DeviceBatchUploader':
+        """Uploader for the dashboard's /api/iot/device-upload endpoint"""
+        if self._batch_uploader is None:
+            from edge_uploader import DeviceBatchUploader
+            
+            api_key = os.getenv('IOT_DEVICE_API_KEY')
+            if not api_key:
+                raise ValueError("IOT_DEVICE_API_KEY environment variable required for batch upload")
+            
+            device_settings = self.config['device_settings']
+            self._batch_uploader = DeviceBatchUploader(
+                self.offline_queue,
+                self.device_id,
+                self.store_id,
+                f"{self.config['endpoints']['dashboard']['api_url']}/iot/device-upload",
+                api_key,
+                firmware_version=device_settings['firmware_version'],
+                compression=device_settings.get('upload_compression', 'gzip'),
+                codec=device_settings.get('upload_codec', 'json'),
+                batch_size=device_settings.get('upload_batch_size', 200),
+                retry_attempts=device_settings.get('retry_attempts', 3),
+                timeout_seconds=device_settings.get('timeout_seconds', 10),
+                circuit=self.circuit,
+                rate_limiter=self.rate_limiter,
+                logger=self.logger
+            )
+        return self._batch_uploader
 
 
 def main():
@@ -317,6 +1144,12 @@ def main():
         print("Please run the configuration generator first.")
         return
     
+    missing = missing_dependencies()
+    if missing:
+        print(f"Missing dependencies: {', '.join(missing)}")
+        print("Install with: pip install supabase psutil requests httpx")
+        exit(1)
+    
     # Check for environment variables
     if not os.getenv('SUPABASE_ANON_KEY'):
         print("SUPABASE_ANON_KEY environment variable required!")
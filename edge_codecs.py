@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Payload Codecs for Project Scout Edge Devices
+Pluggable serialization for offline queue entries and upload bodies: JSON, MessagePack and a schema-aware binary record format
+"""
+
+import json
+import uuid
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+# MessagePack is optional; JSON is always available
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# First byte of every binary payload, so stored entries stay readable when the codec changes
+TAG_MSGPACK = 0x01
+TAG_RECORD = 0x02
+
+# Field kinds for schema-aware encoding (see RecordCodec)
+RAW, TIMESTAMP, UUID, CENTS, SCALED4, ENUM = range(6)
+
+# Values observed in practice; anything else is stored as-is
+GENDERS = ('Male', 'Female', 'Other')
+PAYMENT_METHODS = ('Cash', 'GCash', 'PayMaya', 'Card')
+
+# Field order per record type. Only the position and kind are stored for a
+# listed field; fields not listed here travel in a trailing map.
+RECORD_SCHEMAS: Dict[str, Tuple[Tuple[str, int, Any], ...]] = {
+    'transaction': (
+        ('device_id', RAW, None),
+        ('store_id', RAW, None),
+        ('created_at', TIMESTAMP, None),
+        ('event_id', UUID, None),
+        ('total_amount', CENTS, None),
+        ('items_count', RAW, None),
+        ('customer_age', RAW, None),
+        ('customer_gender', ENUM, GENDERS),
+        ('payment_method', ENUM, PAYMENT_METHODS),
+        ('items', RAW, None)
+    ),
+    'product_detection': (
+        ('device_id', RAW, None),
+        ('store_id', RAW, None),
+        ('detected_at', TIMESTAMP, None),
+        ('event_id', UUID, None),
+        ('brand_detected', RAW, None),
+        ('confidence_score', SCALED4, None),
+        ('customer_age', RAW, None),
+        ('customer_gender', ENUM, GENDERS),
+        ('last_seen', TIMESTAMP, None),
+        ('detection_count', RAW, None)
+    ),
+    'device_health': (
+        ('device_id', RAW, None),
+        ('timestamp', TIMESTAMP, None),
+        ('cpu_usage', RAW, None),
+        ('memory_usage', RAW, None),
+        ('disk_usage', RAW, None),
+        ('temperature', RAW, None),
+        ('uptime_seconds', RAW, None),
+        ('network_connected', RAW, None),
+        ('metadata', RAW, None)
+    )
+}
+SCHEMA_IDS = {name: index for index, name in enumerate(RECORD_SCHEMAS)}
+SCHEMA_NAMES = list(RECORD_SCHEMAS)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _encode_timestamp(value: Any) -> Any:
+    """Naive ISO-8601 string as integer microseconds, when that round-trips exactly"""
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if parsed.tzinfo is None and parsed.isoformat() == value:
+            delta = parsed - EPOCH
+            return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return value
+
+
+def _decode_timestamp(value: int) -> str:
+    seconds, micros = divmod(value, 1_000_000)
+    return datetime.utcfromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+def _encode_uuid(value: Any) -> Any:
+    """Canonical UUID string as its 16 bytes"""
+    if isinstance(value, str) and len(value) == 36:
+        try:
+            parsed = uuid.UUID(value)
+        except ValueError:
+            return value
+        if str(parsed) == value:
+            return parsed.bytes
+    return value
+
+
+def _decode_uuid(value: bytes) -> str:
+    return str(uuid.UUID(bytes=value))
+
+
+def _encode_scaled(value: Any, scale: int) -> Any:
+    """A float with at most log10(scale) decimals as an integer count of 1/scale"""
+    if isinstance(value, float):
+        scaled = round(value * scale)
+        if scaled / scale == value:
+            return scaled
+    return value
+
+
+def _decode_scaled(value: int, scale: int) -> float:
+    return value / scale
+
+
+def _encode_enum(value: Any, choices: Tuple[str, ...]) -> Any:
+    return choices.index(value) if value in choices else value
+
+
+def _decode_enum(value: int, choices: Tuple[str, ...]) -> str:
+    return choices[value]
+
+
+ENCODERS = {
+    RAW: lambda value, arg: value,
+    TIMESTAMP: lambda value, arg: _encode_timestamp(value),
+    UUID: lambda value, arg: _encode_uuid(value),
+    CENTS: lambda value, arg: _encode_scaled(value, 100),
+    SCALED4: lambda value, arg: _encode_scaled(value, 10000),
+    ENUM: _encode_enum
+}
+DECODERS = {
+    RAW: lambda value, arg: value,
+    TIMESTAMP: lambda value, arg: _decode_timestamp(value),
+    UUID: lambda value, arg: _decode_uuid(value),
+    CENTS: lambda value, arg: _decode_scaled(value, 100),
+    SCALED4: lambda value, arg: _decode_scaled(value, 10000),
+    ENUM: _decode_enum
+}
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Anything msgpack can't encode is stored as its string, as json.dumps(default=str) does"""
+    return str(value)
+
+
+class JsonCodec:
+    """Compact JSON text; the fallback every consumer can read"""
+
+    name = 'json'
+    content_type = 'application/json'
+    binary = False
+
+    def encode(self, data: Any, data_type: Optional[str] = None) -> str:
+        return json.dumps(data, separators=(',', ':'), default=str)
+
+    def decode(self, payload: Union[str, bytes], data_type: Optional[str] = None) -> Any:
+        return json.loads(payload)
+
+
+class MsgpackCodec:
+    """MessagePack, tagged so it can be told apart from other stored payloads"""
+
+    name = 'msgpack'
+    content_type = 'application/msgpack'
+    binary = True
+
+    def encode(self, data: Any, data_type: Optional[str] = None) -> bytes:
+        return bytes((TAG_MSGPACK,)) + msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+    def encode_body(self, data: Any) -> bytes:
+        """Untagged MessagePack for an HTTP body (the Content-Type identifies it)"""
+        return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+    def decode(self, payload: bytes, data_type: Optional[str] = None) -> Any:
+        return msgpack.unpackb(payload[1:], raw=False, strict_map_key=False)
+
+
+class RecordCodec(MsgpackCodec):
+    """Schema-aware MessagePack for the edge record types in RECORD_SCHEMAS
+
+    A record becomes [schema id, presence bitmap, converted bitmap, field
+    values..., extra fields], with field names replaced by their
+    position. Timestamps are stored as integer microseconds, event_ids as
+    16 raw bytes, money as cents, confidences as 1/10000ths and known
+    enum values as small integers. A conversion is only applied (and
+    flagged in the converted bitmap) when it round-trips to the identical
+    value, so decode(encode(x)) == x for any input. Types without a
+    schema fall back to plain tagged MessagePack.
+    """
+
+    name = 'record'
+
+    def encode(self, data: Any, data_type: Optional[str] = None) -> bytes:
+        schema = RECORD_SCHEMAS.get(data_type)
+        if schema is None or not isinstance(data, dict):
+            return super().encode(data)
+
+        present = converted = 0
+        values: List[Any] = [SCHEMA_IDS[data_type], 0, 0]
+        for position, (field, kind, arg) in enumerate(schema):
+            if field not in data:
+                continue
+            present |= 1 << position
+            value = data[field]
+            encoded = ENCODERS[kind](value, arg)
+            if encoded is not value:
+                converted |= 1 << position
+            values.append(encoded)
+        values[1] = present
+        values[2] = converted
+        if len(data) > len(values) - 3:
+            values.append({key: value for key, value in data.items() if key not in FIELD_NAMES[data_type]})
+        return bytes((TAG_RECORD,)) + msgpack.packb(values, use_bin_type=True, default=_msgpack_default)
+
+    def decode(self, payload: bytes, data_type: Optional[str] = None) -> Any:
+        if payload[0] != TAG_RECORD:
+            return super().decode(payload)
+        values = msgpack.unpackb(payload[1:], raw=False, strict_map_key=False)
+        schema = RECORD_SCHEMAS[SCHEMA_NAMES[values[0]]]
+        present, converted = values[1], values[2]
+
+        data = {}
+        index = 3
+        for position, (field, kind, arg) in enumerate(schema):
+            if present & (1 << position):
+                value = values[index]
+                data[field] = DECODERS[kind](value, arg) if converted & (1 << position) else value
+                index += 1
+        if index < len(values):
+            data.update(values[index])
+        return data
+
+
+FIELD_NAMES = {name: frozenset(field for field, _, _ in schema) for name, schema in RECORD_SCHEMAS.items()}
+
+CODECS = {'json': JsonCodec, 'msgpack': MsgpackCodec, 'record': RecordCodec}
+
+_JSON = JsonCodec()
+_BINARY = {TAG_MSGPACK: MsgpackCodec, TAG_RECORD: RecordCodec}
+
+
+def get_codec(name: str, logger: Optional[logging.Logger] = None):
+    """Codec by name, falling back to JSON when MessagePack is not installed"""
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec {name!r}, expected one of {tuple(CODECS)}")
+    if CODECS[name].binary and msgpack is None:
+        (logger or logging.getLogger(__name__)).warning(
+            f"msgpack not installed, falling back to JSON for the {name} codec")
+        return _JSON
+    return CODECS[name]()
+
+
+def decode_payload(payload: Union[str, bytes], data_type: Optional[str] = None) -> Any:
+    """Decode a stored payload written by any codec (JSON text or tagged binary)"""
+    if isinstance(payload, str):
+        return json.loads(payload)
+    codec = _BINARY.get(payload[0]) if payload else None
+    if codec is None:
+        return json.loads(payload)
+    if msgpack is None:
+        raise RuntimeError("msgpack is required to read binary queue entries")
+    return codec().decode(payload, data_type)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Detection Deduplication for Project Scout Edge Devices
+Collapses repeated sightings of the same product into one record per time window
+"""
+
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from edge_records import intern_id, iso_from_ms
+
+
+def detection_key(detection: Dict[str, Any], store_id: Any) -> Tuple[Any, Any, Any]:
+    """(brand, product, store) a detection is deduplicated on"""
+    brand = detection.get('brand_detected') or detection.get('brand')
+    product = detection.get('product_name') or detection.get('product') or detection.get('sku')
+    return intern_id(brand), intern_id(product), intern_id(store_id)
+
+
+class DetectionGroup:
+    """Repeats of one product within a window; only the first detection is kept"""
+
+    __slots__ = ('first', 'first_seen', 'last_seen', 'count', 'max_confidence')
+
+    def __init__(self, first: Dict[str, Any], seen_at: float):
+        self.first = first
+        self.first_seen = seen_at
+        self.last_seen = seen_at
+        self.count = 1
+        self.max_confidence = first.get('confidence_score')
+
+    def add(self, detection: Dict[str, Any], seen_at: float):
+        self.last_seen = seen_at
+        self.count += 1
+        confidence = detection.get('confidence_score')
+        if confidence is not None and (self.max_confidence is None or confidence > self.max_confidence):
+            self.max_confidence = confidence
+
+    def to_detection(self) -> Dict[str, Any]:
+        """The first detection, annotated with the group's span, count and highest confidence"""
+        detection = dict(self.first)
+        if self.max_confidence is not None:
+            detection['confidence_score'] = self.max_confidence
+        detection['last_seen'] = iso_from_ms(int(self.last_seen * 1000))
+        detection['detection_count'] = self.count
+        return detection
+
+
+class DetectionDeduplicator:
+    """Windowed debouncer for product detections
+
+    A detection opens a group keyed by (brand, product, store); repeats
+    of that key are folded into it. A group is emitted through emit_fn
+    once no repeat has arrived for gap_seconds, or once it has been open
+    for window_seconds, so a product left on the counter produces one
+    record per window instead of one per frame. Each group holds the
+    first detection and four counters however many repeats it absorbs,
+    and at most max_keys groups are open: when a new key arrives at the
+    limit, the oldest group is emitted early.
+
+    emit_fn(detection, first_seen) is called from a background thread
+    with the collapsed detection and its first sighting in epoch seconds.
+    """
+
+    def __init__(self, emit_fn: Callable[[Dict[str, Any], float], None],
+                 window_seconds: float = 30, gap_seconds: float = 5, max_keys: int = 256,
+                 clock: Callable[[], float] = time.time,
+                 logger: Optional[logging.Logger] = None):
+        self.emit_fn = emit_fn
+        self.window_seconds = window_seconds
+        self.gap_seconds = min(gap_seconds, window_seconds)
+        self.max_keys = max_keys
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+
+        # Insertion order is first-seen order, so the front is always the oldest group
+        self._groups: 'OrderedDict[Tuple[Any, Any, Any], DetectionGroup]' = OrderedDict()
+        self._ready = []
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.stats = {'detections': 0, 'merged': 0, 'emitted': 0, 'evicted': 0}
+
+        self._thread = threading.Thread(target=self._run, name='edge-detection-dedup', daemon=True)
+        self._thread.start()
+
+    @property
+    def open_groups(self) -> int:
+        return len(self._groups)
+
+    def add(self, detection: Dict[str, Any], store_id: Any, seen_at: Optional[float] = None) -> bool:
+        """Fold a detection into its group; True if it repeated an open group"""
+        key = detection_key(detection, store_id)
+        seen_at = self.clock() if seen_at is None else seen_at
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("DetectionDeduplicator is closed")
+            self.stats['detections'] += 1
+
+            group = self._groups.get(key)
+            if group is not None:
+                if self._deadline(group) > seen_at:
+                    group.add(detection, seen_at)
+                    self.stats['merged'] += 1
+                    return True
+                # Closed but not yet picked up by the emitter thread
+                self._ready.append(self._groups.pop(key))
+
+            if len(self._groups) >= self.max_keys:
+                _, oldest = self._groups.popitem(last=False)
+                self._ready.append(oldest)
+                self.stats['evicted'] += 1
+            self._groups[key] = DetectionGroup(detection, seen_at)
+            self._cond.notify()
+        return False
+
+    def flush(self):
+        """Emit every open group now"""
+        with self._cond:
+            self._ready.extend(self._groups.values())
+            self._groups.clear()
+            self._cond.notify()
+
+    def close(self, timeout: Optional[float] = None):
+        """Emit remaining groups and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _deadline(self, group: DetectionGroup) -> float:
+        return min(group.last_seen + self.gap_seconds, group.first_seen + self.window_seconds)
+
+    def _take_due_locked(self, now: float):
+        """Move every group whose gap or window has passed to the ready list"""
+        due = [key for key, group in self._groups.items() if self._deadline(group) <= now]
+        for key in due:
+            self._ready.append(self._groups.pop(key))
+
+    def _run(self):
+        """Emitter thread: sleep until the earliest group deadline, then emit what is due"""
+        while True:
+            with self._cond:
+                while True:
+                    now = self.clock()
+                    if self._closed:
+                        self._ready.extend(self._groups.values())
+                        self._groups.clear()
+                    else:
+                        self._take_due_locked(now)
+                    if self._ready or self._closed:
+                        break
+                    deadline = min((self._deadline(group) for group in self._groups.values()), default=None)
+                    self._cond.wait(None if deadline is None else max(deadline - now, 0))
+
+                ready, self._ready = self._ready, []
+                stop = self._closed
+
+            for group in ready:
+                self._emit(group)
+
+            if stop:
+                return
+
+    def _emit(self, group: DetectionGroup):
+        try:
+            self.emit_fn(group.to_detection(), group.first_seen)
+            self.stats['emitted'] += 1
+        except Exception as e:
+            self.logger.error(f"Failed to emit deduplicated detection: {e}")
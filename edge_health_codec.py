@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Columnar Health Series Codec for Project Scout Edge Devices
+Packs health samples as columns of delta-of-delta timestamps and quantized deltas, and unpacks them for the backend or a local gateway
+"""
+
+import zlib
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+
+from edge_records import HealthSample
+
+
+SERIES_CODEC = 'health-delta-v1'
+
+MAGIC = b'HS'
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+# Column name, units per stored integer, and delta order (1 = delta,
+# 2 = delta-of-delta). Precision matches what the sampler reports:
+# psutil percentages have one decimal and temperature is rounded to 0.01.
+TIMESTAMP_COLUMN = ('timestamp', 1000, 2)
+METRIC_COLUMNS: Tuple[Tuple[str, int, int], ...] = (
+    ('cpu_usage', 10, 1),
+    ('memory_usage', 10, 1),
+    ('disk_usage', 10, 1),
+    ('temperature', 100, 1),
+    ('uptime_seconds', 1, 2)
+)
+COLUMNS = (TIMESTAMP_COLUMN,) + METRIC_COLUMNS
+
+# How a column's missing values are stored
+ALL_PRESENT, ALL_MISSING, BITMAP = range(3)
+
+
+def _write_varint(out: bytearray, value: int):
+    """Append a signed integer as a zigzag LEB128 varint (small magnitudes take one byte)"""
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (result >> 1) ^ -(result & 1), offset
+
+
+def _deltas(values: List[int], order: int) -> List[int]:
+    """First value, then differences of the requested order"""
+    out = list(values)
+    for _ in range(order):
+        out = out[:1] + [b - a for a, b in zip(out, out[1:])]
+    return out
+
+
+def _undeltas(values: List[int], order: int) -> List[int]:
+    out = list(values)
+    for _ in range(order):
+        for index in range(1, len(out)):
+            out[index] += out[index - 1]
+    return out
+
+
+def _row(sample: Any) -> Dict[str, Any]:
+    return sample.to_dict() if isinstance(sample, HealthSample) else sample
+
+
+def resample(samples: Iterable[Any], interval_seconds: float) -> List[HealthSample]:
+    """Average samples into fixed buckets of interval_seconds
+
+    Each bucket is stamped with the time of its last sample and keeps the
+    latest uptime; metrics are the mean of the values present.
+    """
+    buckets: Dict[int, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        row = _row(sample)
+        buckets.setdefault(int(row['timestamp'] // interval_seconds), []).append(row)
+
+    points = []
+    for key in sorted(buckets):
+        rows = buckets[key]
+        values = {}
+        for name in ('cpu_usage', 'memory_usage', 'disk_usage', 'temperature'):
+            present = [row[name] for row in rows if row.get(name) is not None]
+            values[name] = sum(present) / len(present) if present else None
+        points.append(HealthSample(timestamp=rows[-1]['timestamp'],
+                                   uptime_seconds=rows[-1]['uptime_seconds'], **values))
+    return points
+
+
+def encode_health_series(samples: Sequence[Any], compress: bool = True) -> bytes:
+    """Pack health samples (HealthSample or dicts, oldest first) into a columnar batch
+
+    Values are rounded to each column's precision, so decoding returns
+    them at that precision. Timestamps must be present on every sample;
+    other columns may have missing values. With compress the body is
+    deflated when that makes it smaller, which it rarely does below a few
+    dozen samples.
+    """
+    body = bytearray()
+    _write_varint(body, len(samples))
+    rows = [_row(sample) for sample in samples]
+
+    for name, scale, order in COLUMNS:
+        values = [row.get(name) for row in rows]
+        present = [value for value in values if value is not None]
+        if len(present) == len(values):
+            body.append(ALL_PRESENT)
+        elif not present:
+            body.append(ALL_MISSING)
+            continue
+        else:
+            body.append(BITMAP)
+            bitmap = bytearray((len(values) + 7) // 8)
+            for index, value in enumerate(values):
+                if value is not None:
+                    bitmap[index // 8] |= 1 << (index % 8)
+            body.extend(bitmap)
+
+        for delta in _deltas([round(value * scale) for value in present], order):
+            _write_varint(body, delta)
+
+    flags = 0
+    if compress:
+        deflated = zlib.compress(bytes(body), 9)
+        if len(deflated) < len(body):
+            body = deflated
+            flags |= FLAG_ZLIB
+    return MAGIC + bytes((VERSION, flags)) + bytes(body)
+
+
+def decode_health_series(payload: bytes) -> List[Dict[str, Any]]:
+    """Unpack a batch written by encode_health_series into device_health-style dicts"""
+    if payload[:2] != MAGIC:
+        raise ValueError("Not a health series batch")
+    if payload[2] != VERSION:
+        raise ValueError(f"Unsupported health series version {payload[2]}")
+    body = payload[4:]
+    if payload[3] & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    count, offset = _read_varint(body, 0)
+    rows: List[Dict[str, Any]] = [{} for _ in range(count)]
+
+    for name, scale, order in COLUMNS:
+        kind = body[offset]
+        offset += 1
+        if kind == ALL_MISSING:
+            for row in rows:
+                row[name] = None
+            continue
+
+        present: Optional[List[int]] = None
+        if kind == BITMAP:
+            bitmap = body[offset:offset + (count + 7) // 8]
+            offset += len(bitmap)
+            present = [index for index in range(count) if bitmap[index // 8] & (1 << (index % 8))]
+
+        positions = present if present is not None else range(count)
+        deltas = []
+        for _ in positions:
+            delta, offset = _read_varint(body, offset)
+            deltas.append(delta)
+        values = _undeltas(deltas, order)
+
+        for row in rows:
+            row[name] = None
+        for index, value in zip(positions, values):
+            rows[index][name] = value if scale == 1 else value / scale
+    return rows
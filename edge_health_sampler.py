@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Background Health Sampler for Project Scout Edge Devices
+Samples system metrics off the main loop and summarizes them per reporting window
+"""
+
+import time
+import math
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, List, Any, Optional
+
+from edge_records import HealthSample
+
+
+# Metrics aggregated per window; uptime is reported as the latest value
+AGGREGATED_METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'temperature')
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    """Return min/mean/max/p95 for values, or None when there are none"""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    p95 = ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)]
+    return {
+        'min': round(ordered[0], 2),
+        'mean': round(sum(ordered) / len(ordered), 2),
+        'max': round(ordered[-1], 2),
+        'p95': round(p95, 2)
+    }
+
+
+class HealthSampler:
+    """Samples CPU, memory, disk, temperature and uptime on a background thread
+
+    Samples go into a fixed-size ring buffer, so memory stays constant no
+    matter how long a window runs. drain_window() summarizes and clears the
+    buffer without ever blocking on a measurement.
+    """
+
+    def __init__(self, sample_interval_seconds: float = 5, max_samples: int = 720,
+                 temperature_fn: Optional[Callable[[], Optional[float]]] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.sample_interval_seconds = sample_interval_seconds
+        self.temperature_fn = temperature_fn
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._window_started = time.time()
+        # psutil is imported on the first sample so it stays off the start-up path
+        self._boot_time: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling in a daemon thread"""
+        if self.running:
+            return
+        import psutil
+        # The first non-blocking cpu_percent call only primes the counters
+        psutil.cpu_percent(interval=None)
+        self._stop.clear()
+        self._window_started = time.time()
+        self._thread = threading.Thread(target=self._run, name='edge-health-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.sample_interval_seconds + 1)
+            self._thread = None
+
+    def sample(self) -> HealthSample:
+        """Take one measurement and add it to the ring buffer"""
+        import psutil
+        if self._boot_time is None:
+            self._boot_time = psutil.boot_time()
+        now = time.time()
+        point = HealthSample(
+            timestamp=now,
+            cpu_usage=psutil.cpu_percent(interval=None),
+            memory_usage=psutil.virtual_memory().percent,
+            disk_usage=psutil.disk_usage('/').percent,
+            temperature=self.temperature_fn() if self.temperature_fn else None,
+            uptime_seconds=now - self._boot_time
+        )
+        with self._lock:
+            self._samples.append(point)
+        return point
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.warning(f"Health sample failed: {e}")
+            self._stop.wait(self.sample_interval_seconds)
+
+    def drain_window(self) -> Optional[Dict[str, Any]]:
+        """Summarize and clear the samples collected since the last drain
+
+        The raw samples are kept under 'points' for callers that report the
+        full series as well as the summary.
+        """
+        with self._lock:
+            samples = list(self._samples)
+            self._samples.clear()
+            window_started = self._window_started
+            self._window_started = time.time()
+
+        if not samples:
+            return None
+
+        window = {
+            'window_start': window_started,
+            'window_end': samples[-1].timestamp,
+            'samples': len(samples),
+            'uptime_seconds': samples[-1].uptime_seconds,
+            'points': samples
+        }
+        for metric in AGGREGATED_METRICS:
+            values = [getattr(s, metric) for s in samples]
+            window[metric] = summarize([value for value in values if value is not None])
+        return window
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Log Shipping for Project Scout Edge Devices
+Logging handler that buffers records in a bounded ring and ships them to edge_logs in compacted batches from a background thread
+"""
+
+import time
+import logging
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from edge_records import intern_id
+
+
+# Python level -> edge_logs.log_level (the table's CHECK constraint)
+LOG_LEVELS = {
+    logging.DEBUG: 'DEBUG',
+    logging.INFO: 'INFO',
+    logging.WARNING: 'WARN',
+    logging.ERROR: 'ERROR',
+    logging.CRITICAL: 'FATAL'
+}
+
+# Default per-minute allowance for each (logger, level); levels not listed are never sampled
+DEFAULT_SAMPLE_PER_MINUTE = {'DEBUG': 10, 'INFO': 60}
+
+
+def log_level(levelno: int) -> str:
+    """edge_logs level for a Python level, rounding custom levels down"""
+    for threshold in sorted(LOG_LEVELS, reverse=True):
+        if levelno >= threshold:
+            return LOG_LEVELS[threshold]
+    return 'DEBUG'
+
+
+class BufferedLog:
+    """One log record reduced to what edge_logs stores, captured at emit time"""
+
+    __slots__ = ('created', 'level', 'component', 'message', 'error_code', 'detail')
+
+    def __init__(self, created: float, level: str, component: str, message: str,
+                 error_code: Optional[str], detail: Optional[str]):
+        self.created = created
+        self.level = level
+        self.component = component
+        self.message = message
+        self.error_code = error_code
+        self.detail = detail
+
+
+class LogShipper(logging.Handler):
+    """Ships log records to the edge_logs table without blocking the caller
+
+    emit() only appends to a ring of `capacity` records; when it is full
+    the oldest record is dropped. DEBUG and INFO records are sampled per
+    (logger, level) to at most sample_per_minute[level] a minute, so a
+    chatty loop cannot crowd out warnings and errors. A daemon thread
+    ships a batch every interval_seconds, or sooner once batch_size
+    records are waiting. Identical records within a batch are sent as one
+    row with a repeat count, and any records dropped since the previous
+    batch are reported in a WARN row of their own.
+
+    ship_fn(rows) runs on the shipping thread and returns False when the
+    backend rejected the rows (they are discarded). If it raises, the
+    rows go back to the front of the ring and are retried next interval.
+    Records logged on the shipping thread itself are ignored, so failures
+    while shipping never feed back into the buffer.
+    """
+
+    def __init__(self, ship_fn: Callable[[List[Dict[str, Any]]], bool], device_id: str,
+                 capacity: int = 1000, batch_size: int = 100, interval_seconds: float = 30,
+                 sample_per_minute: Optional[Dict[str, float]] = None,
+                 max_message_chars: int = 2000, clock: Callable[[], float] = time.time,
+                 level: int = logging.INFO):
+        super().__init__(level)
+        self.ship_fn = ship_fn
+        self.device_id = device_id
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.sample_per_minute = (DEFAULT_SAMPLE_PER_MINUTE if sample_per_minute is None
+                                  else {name.upper(): limit for name, limit in sample_per_minute.items()})
+        self.max_message_chars = max_message_chars
+        self.clock = clock
+
+        self._buffer: deque = deque()
+        self._buffer_lock = threading.Lock()
+        # (logger, level) -> (minute, records taken in that minute)
+        self._sample_windows: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id: Optional[int] = None
+        self._unreported = {'sampled': 0, 'overflow': 0, 'rejected': 0}
+
+        self.stats = {'buffered': 0, 'shipped': 0, 'rows': 0, 'batches': 0, 'failures': 0,
+                      'sampled': 0, 'overflow': 0, 'rejected': 0}
+
+    @property
+    def dropped(self) -> int:
+        """Records that will never be shipped: sampled out, overflowed or rejected"""
+        return self.stats['sampled'] + self.stats['overflow'] + self.stats['rejected']
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> 'LogShipper':
+        """Start the shipping thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='edge-log-shipper', daemon=True)
+            self._thread.start()
+        return self
+
+    def emit(self, record: logging.LogRecord):
+        if threading.get_ident() == self._thread_id:
+            return
+        try:
+            level = log_level(record.levelno)
+            if not self._take_sample(record.name, level, record.created):
+                return
+
+            message = record.getMessage()
+            if len(message) > self.max_message_chars:
+                message = message[:self.max_message_chars] + '…'
+            error_code = detail = None
+            if record.exc_info and record.exc_info[0] is not None:
+                error_code = record.exc_info[0].__name__
+                detail = ''.join(traceback.format_exception(*record.exc_info))[-self.max_message_chars:]
+            entry = BufferedLog(record.created, level, intern_id(record.name), message, error_code, detail)
+
+            with self._buffer_lock:
+                if len(self._buffer) >= self.capacity:
+                    self._buffer.popleft()
+                    self._count_drop_locked('overflow', 1)
+                self._buffer.append(entry)
+                self.stats['buffered'] += 1
+                full = len(self._buffer) >= self.batch_size
+            if full:
+                self._wake.set()
+        except Exception:
+            self.handleError(record)
+
+    def _take_sample(self, component: str, level: str, created: float) -> bool:
+        """Whether this record fits its (logger, level) allowance for the current minute"""
+        limit = self.sample_per_minute.get(level)
+        if limit is None:
+            return True
+        key = (component, level)
+        minute = int(created // 60)
+        with self._buffer_lock:
+            window_minute, taken = self._sample_windows.get(key, (minute, 0))
+            if window_minute != minute:
+                taken = 0
+            if taken >= limit:
+                self._count_drop_locked('sampled', 1)
+                return False
+            self._sample_windows[key] = (minute, taken + 1)
+            if len(self._sample_windows) > 4 * self.capacity:
+                # Forget allowances from earlier minutes once many loggers have been seen
+                self._sample_windows = {k: v for k, v in self._sample_windows.items() if v[0] == minute}
+            return True
+
+    def _count_drop_locked(self, reason: str, count: int):
+        self.stats[reason] += count
+        self._unreported[reason] += count
+
+    def _run(self):
+        self._thread_id = threading.get_ident()
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            self.ship_pending()
+
+    def ship_pending(self, deadline: Optional[float] = None) -> bool:
+        """Ship batches until the ring is empty, a batch fails, or deadline (clock time) passes"""
+        while self._buffer or any(self._unreported.values()):
+            if deadline is not None and self.clock() >= deadline:
+                return False
+            if not self._ship_batch():
+                return False
+        return True
+
+    def _ship_batch(self) -> bool:
+        with self._buffer_lock:
+            count = min(self.batch_size, len(self._buffer))
+            entries = [self._buffer.popleft() for _ in range(count)]
+            unreported = dict(self._unreported)
+            for reason in self._unreported:
+                self._unreported[reason] = 0
+
+        rows = self._compact(entries)
+        if any(unreported.values()):
+            rows.append(self._drop_row(unreported))
+
+        try:
+            accepted = self.ship_fn(rows)
+        except Exception:
+            with self._buffer_lock:
+                self.stats['failures'] += 1
+                # Put the batch back in front; anything that no longer fits is dropped
+                room = max(self.capacity - len(self._buffer), 0)
+                self._buffer.extendleft(reversed(entries[len(entries) - room:] if room else []))
+                self._count_drop_locked('overflow', max(len(entries) - room, 0))
+                for reason, count in unreported.items():
+                    self._unreported[reason] += count
+            return False
+
+        with self._buffer_lock:
+            if accepted is False:
+                self._count_drop_locked('rejected', len(entries))
+            else:
+                self.stats['shipped'] += len(entries)
+                self.stats['rows'] += len(rows)
+                self.stats['batches'] += 1
+        return True
+
+    def _compact(self, entries: List[BufferedLog]) -> List[Dict[str, Any]]:
+        """edge_logs rows for entries, with identical records folded into one row"""
+        rows: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for entry in entries:
+            key = (entry.level, entry.component, entry.message, entry.error_code)
+            row = rows.get(key)
+            if row is not None:
+                metadata = row['metadata']
+                metadata['repeats'] = metadata.get('repeats', 1) + 1
+                metadata['last_seen'] = datetime.utcfromtimestamp(entry.created).isoformat()
+                continue
+            rows[key] = {
+                'device_id': self.device_id,
+                'log_level': entry.level,
+                'message': entry.message,
+                'timestamp': datetime.utcfromtimestamp(entry.created).isoformat(),
+                'component': entry.component,
+                'error_code': entry.error_code,
+                'metadata': {'traceback': entry.detail} if entry.detail else {}
+            }
+        return list(rows.values())
+
+    def _drop_row(self, unreported: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            'device_id': self.device_id,
+            'log_level': 'WARN',
+            'message': f"Dropped {sum(unreported.values())} log records since the previous batch",
+            'timestamp': datetime.utcfromtimestamp(self.clock()).isoformat(),
+            'component': __name__,
+            'error_code': None,
+            'metadata': dict(unreported)
+        }
+
+    def close(self, timeout: float = 5):
+        """Stop the shipping thread, then try to ship what is left within timeout seconds"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Records logged while flushing are not shipped (this thread is now the shipper)
+        self._thread_id = threading.get_ident()
+        self.ship_pending(deadline=self.clock() + timeout)
+        super().close()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Metrics Registry for Project Scout Edge Devices
+Counters, gauges and bucketed latency histograms served in Prometheus text format
+"""
+
+import time
+import bisect
+import threading
+import logging
+from typing import Callable, Dict, List, Tuple, Optional, Sequence
+
+# Request latencies on a Pi over a mobile link range from a few ms to the timeout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class _Value:
+    """A single counter or gauge series"""
+
+    __slots__ = ('_value', '_lock', '_fn')
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._fn: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, fn: Callable[[], float]):
+        """Read the value from fn at scrape time instead of tracking it"""
+        self._fn = fn
+
+    def get(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float('nan')
+        return self._value
+
+
+class _HistogramValue:
+    """A single histogram series with fixed bucket bounds"""
+
+    __slots__ = ('_bounds', '_counts', '_sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def observe_since(self, started: float):
+        """Observe the seconds elapsed since a time.perf_counter() reading"""
+        self.observe(time.perf_counter() - started)
+
+    def get(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric:
+    """Base for a named metric with a fixed set of label names"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Series for these label values; look it up once and keep it on hot paths"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use labels()")
+        return self._children[()]
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._samples(_format_labels(self.labelnames, values), values, child))
+        return lines
+
+    def _samples(self, labels: str, values: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._unlabelled().set_function(fn)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._unlabelled().dec(amount)
+
+    def set(self, value: float):
+        self._unlabelled().set(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._unlabelled().set_function(fn)
+
+
+class Histogram(_Metric):
+    """Distribution over fixed buckets, so memory does not grow with observations"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+
+    def observe_since(self, started: float):
+        self._unlabelled().observe_since(started)
+
+    def _samples(self, labels: str, values: Tuple[str, ...], child) -> List[str]:
+        counts, total = child.get()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            bucket_labels = _format_labels(self.labelnames + ('le',), values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics for one process, rendered together on scrape"""
+
+    def __init__(self, prefix: str = 'edge_'):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serves a registry on http://host:port/metrics from a background thread
+
+    Binds to loopback by default; pass host='0.0.0.0' to let other machines scrape it.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9109,
+                 logger: Optional[logging.Logger] = None):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        self.registry = registry
+        self.logger = logger or logging.getLogger(__name__)
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='edge-metrics', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Serving metrics on port {self.port}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -18,9 +18,9 @@ class EdgeNLPProcessor:
     def __init__(self, config_path: str = "nlp_config.json"):
         """Initialize the Edge NLP Processor with configuration."""
         self.config_path = config_path
+        self.logger = self._setup_logging()
         self.config = self._load_config()
         self.models = {}
-        self.logger = self._setup_logging()
         
         if self.config.get("local_processing", {}).get("enabled", False):
             self._initialize_models()
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Durable Offline Queue for Project Scout Edge Devices
+Persists data that could not be sent so it survives reboots and service restarts
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from edge_codecs import get_codec, decode_payload
+
+
+# Eviction order, lowest first. Raw detections are compacted into per-brand
+# summaries (priority + 1) before any of them are dropped, and transactions
+# are only dropped once nothing else is left.
+TYPE_PRIORITIES = {
+    'device_health': 0,
+    'product_detection': 10,
+    'transaction': 20
+}
+COMPACTABLE_TYPES = ('product_detection',)
+COMPACTION_WINDOW = 500
+EVICTION_LOW_WATER = 0.9
+
+
+def merge_detections(detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge repeated brand detections into one row per brand with a count
+
+    The merged row keeps the first detection's columns, the highest
+    confidence, and records detection_count plus the first/last detection
+    time in metadata. Customer fields survive only if all members agree.
+    """
+    groups: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for detection in detections:
+        key = (detection.get('device_id'), detection.get('store_id'),
+               detection.get('brand_detected', detection.get('brand')))
+        groups[key].append(detection)
+
+    merged = []
+    for members in groups.values():
+        first = members[0]
+        if len(members) == 1:
+            merged.append(first)
+            continue
+
+        row = dict(first)
+        metadata = dict(first.get('metadata') or {})
+        times = [m.get('detected_at') for m in members if m.get('detected_at')]
+        confidences = [m['confidence_score'] for m in members if m.get('confidence_score') is not None]
+
+        metadata['detection_count'] = sum((m.get('metadata') or {}).get('detection_count', 1) for m in members)
+        if times:
+            metadata['first_detected_at'] = min(times)
+            metadata['last_detected_at'] = max(times)
+            row['detected_at'] = min(times)
+        if confidences:
+            metadata['mean_confidence'] = round(sum(confidences) / len(confidences), 4)
+            row['confidence_score'] = max(confidences)
+
+        for field in ('customer_age', 'customer_gender', 'image_path'):
+            if any(m.get(field) != first.get(field) for m in members):
+                row[field] = None
+
+        row['metadata'] = metadata
+        merged.append(row)
+
+    return merged
+
+
+class OfflineQueue:
+    """Append-only queue backed by SQLite in WAL mode
+
+    Entries are appended in O(1) and only removed once the caller acknowledges
+    them, so a crash between reading and uploading never loses data. The queue
+    is bounded by total payload size and by entry age. When it is full,
+    entries are evicted lowest priority first, oldest first within a
+    priority, using the (priority, id) index so each decision is O(log n).
+
+    The WAL is the write-ahead journal. Enqueues are group-committed: they
+    share one open transaction that is committed (and fsynced) once
+    durability_window_ms has passed since the first uncommitted enqueue or
+    group_commit_bytes of payload are pending, whichever comes first. A power
+    cut can lose at most that window. A window of 0 commits every enqueue.
+    Once acknowledged entries are deleted the WAL is checkpointed and
+    truncated, so it never grows much past journal_size_limit_mb.
+
+    Payloads are written with codec ('json', 'msgpack' or the schema-aware
+    'record', see edge_codecs) and size accounting uses the encoded bytes.
+    Entries written under an earlier codec stay readable.
+    """
+
+    def __init__(self, db_path: str, max_size_mb: float = 500,
+                 max_age_hours: float = 24, priorities: Optional[Dict[str, int]] = None,
+                 durability_window_ms: float = 0, group_commit_bytes: int = 64 * 1024,
+                 journal_size_limit_mb: float = 4, codec: str = 'json',
+                 logger: Optional[logging.Logger] = None):
+        """Open (or create) the queue database at db_path"""
+        self.db_path = db_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_hours * 3600
+        self.priorities = dict(TYPE_PRIORITIES, **(priorities or {}))
+        self.durability_window = max(0.0, durability_window_ms / 1000)
+        self.group_commit_bytes = group_commit_bytes
+        self.journal_size_limit = int(journal_size_limit_mb * 1024 * 1024)
+        self.logger = logger or logging.getLogger(__name__)
+        self.codec = get_codec(codec, self.logger)
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        # Checkpoint about every journal_size_limit bytes of WAL and shrink it back afterwards
+        self._conn.execute(f'PRAGMA wal_autocheckpoint={max(1, self.journal_size_limit // 4096)}')
+        self._conn.execute(f'PRAGMA journal_size_limit={self.journal_size_limit}')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                rejections INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(queue)')]
+        if 'priority' not in columns:
+            # Queue written before priority-aware eviction
+            self._conn.execute('ALTER TABLE queue ADD COLUMN priority INTEGER NOT NULL DEFAULT 0')
+            for data_type, priority in self.priorities.items():
+                self._conn.execute('UPDATE queue SET priority = ? WHERE type = ?', (priority, data_type))
+        if 'rejections' not in columns:
+            # Queue written before rejected entries were counted
+            self._conn.execute('ALTER TABLE queue ADD COLUMN rejections INTEGER NOT NULL DEFAULT 0')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_queue_created_at ON queue(created_at)')
+        # Small named JSON records (e.g. the replay high-water mark), written atomically with acks
+        self._conn.execute('CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_queue_priority ON queue(priority, id)')
+        # Entries the backend rejected for good, kept out of the backlog until they age out
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                id INTEGER PRIMARY KEY,
+                type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                reason TEXT,
+                failed_at REAL NOT NULL
+            )
+        ''')
+
+        # Running totals (overall and per type) so enqueue never has to scan the table
+        self._count = 0
+        self._bytes = 0
+        # Ids handed out by peek(checkout=True) and not yet acked or released
+        self._checked_out: Set[int] = set()
+        self._type_count: Dict[str, int] = defaultdict(int)
+        self._type_bytes: Dict[str, int] = defaultdict(int)
+        for data_type, count, total in self._conn.execute(
+            'SELECT type, COUNT(*), SUM(size) FROM queue GROUP BY type'
+        ):
+            self._account(data_type, count, total)
+        self._dead_letters = self._conn.execute('SELECT COUNT(*) FROM dead_letters').fetchone()[0]
+
+        self.eviction_stats = {
+            'evicted': defaultdict(int),
+            'evicted_bytes': defaultdict(int),
+            'compactions': 0,
+            'compacted_rows': 0,
+            'compacted_bytes_saved': 0
+        }
+        self.journal_stats = {
+            'commits': 0,
+            'committed_entries': 0,
+            'checkpoints': 0
+        }
+
+        # Uncommitted enqueues in the open group transaction
+        self._pending = 0
+        self._pending_bytes = 0
+        self._pending_since = 0.0
+        self._closed = False
+        self._commit_due = threading.Condition(self._lock)
+        self._committer: Optional[threading.Thread] = None
+        if self.durability_window > 0:
+            self._committer = threading.Thread(target=self._commit_loop, name='offline-queue-commit',
+                                               daemon=True)
+            self._committer.start()
+
+        dropped = self.prune()
+        if self._count:
+            self.logger.info(f"Offline queue restored {self._count} entries ({self._bytes} bytes)")
+        if dropped:
+            self.logger.warning(f"Dropped {dropped} expired offline entries on startup")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        """Total payload bytes currently queued"""
+        return self._bytes
+
+    def _account(self, data_type: str, count: int, size: int):
+        """Apply a change to the running totals"""
+        self._count += count
+        self._bytes += size
+        self._type_count[data_type] += count
+        self._type_bytes[data_type] += size
+
+    def _account_removed(self, where: str, params: List[Any]):
+        """Subtract the rows matching where from the running totals before deleting them"""
+        for data_type, count, size in self._conn.execute(
+            f'SELECT type, COUNT(*), SUM(size) FROM queue WHERE {where} GROUP BY type', params
+        ).fetchall():
+            self._account(data_type, -count, -size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Storage cost per entry type and eviction counters"""
+        with self._lock:
+            return {
+                'entries': self._count,
+                'bytes': self._bytes,
+                'max_bytes': self.max_size_bytes,
+                'types': {
+                    data_type: {
+                        'entries': self._type_count[data_type],
+                        'bytes': self._type_bytes[data_type],
+                        'mean_bytes': self._type_bytes[data_type] // self._type_count[data_type]
+                    }
+                    for data_type in self._type_count if self._type_count[data_type]
+                },
+                'evicted': dict(self.eviction_stats['evicted']),
+                'evicted_bytes': dict(self.eviction_stats['evicted_bytes']),
+                'compactions': self.eviction_stats['compactions'],
+                'compacted_rows': self.eviction_stats['compacted_rows'],
+                'compacted_bytes_saved': self.eviction_stats['compacted_bytes_saved'],
+                'journal': dict(self.journal_stats, pending=self._pending),
+                'dead_letters': self._dead_letters
+            }
+
+    def enqueue(self, data_type: str, data: Dict[str, Any]) -> int:
+        """Append an entry and return its queue id"""
+        payload = self.codec.encode(data, data_type)
+        size = len(payload)
+
+        with self._lock:
+            if not self._conn.in_transaction:
+                self._conn.execute('BEGIN')
+            cursor = self._conn.execute(
+                'INSERT INTO queue (type, payload, created_at, size, priority) VALUES (?, ?, ?, ?, ?)',
+                (data_type, payload, time.time(), size, self.priorities.get(data_type, 0))
+            )
+            self._account(data_type, 1, size)
+
+            if self._bytes > self.max_size_bytes:
+                # Free down to the low-water mark so eviction runs in batches, not per enqueue
+                self._evict_locked(self._bytes - int(self.max_size_bytes * EVICTION_LOW_WATER))
+
+            if not self._pending:
+                self._pending_since = time.monotonic()
+                self._commit_due.notify()
+            self._pending += 1
+            self._pending_bytes += size
+            if self.durability_window <= 0 or self._pending_bytes >= self.group_commit_bytes:
+                self._commit_locked()
+
+            return cursor.lastrowid
+
+    def flush(self):
+        """Commit enqueues still waiting for their group commit"""
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self):
+        """Commit the open transaction, making every pending enqueue durable"""
+        if self._conn.in_transaction:
+            self._conn.execute('COMMIT')
+            self.journal_stats['commits'] += 1
+            self.journal_stats['committed_entries'] += self._pending
+        self._pending = 0
+        self._pending_bytes = 0
+
+    def _commit_loop(self):
+        """Commit each group once the oldest pending enqueue reaches the durability window"""
+        with self._lock:
+            while not self._closed:
+                if not self._pending:
+                    self._commit_due.wait()
+                    continue
+                remaining = self._pending_since + self.durability_window - time.monotonic()
+                if remaining > 0:
+                    self._commit_due.wait(remaining)
+                    continue
+                try:
+                    self._commit_locked()
+                except Exception as e:
+                    self.logger.error(f"Offline queue group commit failed: {e}")
+                    self._commit_due.wait(self.durability_window)
+
+    def peek(self, limit: int = 100, after_id: int = 0,
+             types: Optional[Iterable[str]] = None, before_id: Optional[int] = None,
+             newest_first: bool = False, checkout: bool = False) -> List[Dict[str, Any]]:
+        """Return up to limit entries with after_id < id < before_id without removing them
+
+        Entries come oldest first, or newest first when newest_first is set.
+        With checkout the entries are held out of compaction until they are
+        acked or released, so an ack can never remove rows merged into them.
+        """
+        query = 'SELECT id, type, payload, created_at, size FROM queue WHERE id > ?'
+        params: List[Any] = [after_id]
+        if before_id is not None:
+            query += ' AND id < ?'
+            params.append(before_id)
+        if types is not None:
+            types = list(types)
+            query += f" AND type IN ({','.join('?' * len(types))})"
+            params.extend(types)
+        query += f" ORDER BY id {'DESC' if newest_first else 'ASC'} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            if checkout:
+                self._checked_out.update(row[0] for row in rows)
+
+        return [
+            {
+                'id': row[0],
+                'type': row[1],
+                'data': decode_payload(row[2], row[1]),
+                'timestamp': row[3],
+                'size': row[4]
+            }
+            for row in rows
+        ]
+
+    def ack(self, entry_ids: Iterable[int], checkpoint: Optional[Tuple[str, Any]] = None) -> int:
+        """Remove entries that were delivered successfully
+
+        checkpoint=(name, value) is saved in the same transaction, so a
+        progress marker can never disagree with what was removed.
+        """
+        ids = list(entry_ids)
+        if not ids and checkpoint is None:
+            return 0
+
+        with self._lock:
+            before = self._count
+            self._checked_out.difference_update(ids)
+            with self._savepoint('ack'):
+                # Chunk to stay under SQLite's bound-parameter limit
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    where = f"id IN ({','.join('?' * len(chunk))})"
+                    self._account_removed(where, chunk)
+                    self._conn.execute(f'DELETE FROM queue WHERE {where}', chunk)
+                if checkpoint is not None:
+                    self._save_checkpoint_locked(*checkpoint)
+            # Pending enqueues ride along in the same commit
+            self._commit_locked()
+
+            if not self._count:
+                # Everything is confirmed upstream; reset the WAL to zero length
+                self._truncate_wal_locked()
+
+            return before - self._count
+
+    def release(self, entry_ids: Iterable[int]):
+        """Return checked-out entries that were not delivered to the queue"""
+        with self._lock:
+            self._checked_out.difference_update(entry_ids)
+
+    def dead_letter(self, entry_ids: Iterable[int], reason: str) -> int:
+        """Move entries the backend rejected for good into dead_letters; returns how many moved
+
+        They stop counting towards the backlog but are kept, until they
+        age out, for inspection or requeue_dead_letters().
+        """
+        ids = list(entry_ids)
+        if not ids:
+            return 0
+
+        with self._lock:
+            before = self._count
+            self._checked_out.difference_update(ids)
+            with self._savepoint('dead_letter'):
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    where = f"id IN ({','.join('?' * len(chunk))})"
+                    self._account_removed(where, chunk)
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO dead_letters '
+                        '(id, type, payload, created_at, size, priority, reason, failed_at) '
+                        f'SELECT id, type, payload, created_at, size, priority, ?, ? FROM queue WHERE {where}',
+                        [reason, time.time()] + chunk
+                    )
+                    self._conn.execute(f'DELETE FROM queue WHERE {where}', chunk)
+            self._commit_locked()
+            moved = before - self._count
+            self._dead_letters += moved
+        if moved:
+            self.logger.warning(f"Dead-lettered {moved} offline entries: {reason}")
+        return moved
+
+    def reject(self, entry_ids: Iterable[int], max_rejections: int,
+               reason: str = 'rejected by the backend') -> int:
+        """Count a backend rejection against entries; returns how many reached max_rejections
+
+        Entries stay queued for the next pass until they have been rejected
+        max_rejections times, then they are dead-lettered so one bad row
+        cannot keep the backlog from ever draining.
+        """
+        ids = list(entry_ids)
+        if not ids:
+            return 0
+
+        capped = []
+        with self._lock:
+            with self._savepoint('reject'):
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    where = f"id IN ({','.join('?' * len(chunk))})"
+                    self._conn.execute(f'UPDATE queue SET rejections = rejections + 1 WHERE {where}', chunk)
+                    capped.extend(row[0] for row in self._conn.execute(
+                        f'SELECT id FROM queue WHERE rejections >= ? AND {where}', [max_rejections] + chunk
+                    ))
+            self._commit_locked()
+        return self.dead_letter(capped, f"{reason} {max_rejections} times")
+
+    def requeue_dead_letters(self, types: Optional[Iterable[str]] = None) -> int:
+        """Put dead-lettered entries (optionally only some types) back at the end of the queue"""
+        query = 'SELECT id, type, payload, size, priority FROM dead_letters'
+        params: List[Any] = []
+        if types is not None:
+            types = list(types)
+            query += f" WHERE type IN ({','.join('?' * len(types))})"
+            params.extend(types)
+        query += ' ORDER BY id'
+
+        with self._lock:
+            with self._savepoint('requeue'):
+                rows = self._conn.execute(query, params).fetchall()
+                now = time.time()
+                for entry_id, data_type, payload, size, priority in rows:
+                    self._conn.execute(
+                        'INSERT INTO queue (type, payload, created_at, size, priority) VALUES (?, ?, ?, ?, ?)',
+                        (data_type, payload, now, size, priority)
+                    )
+                    self._conn.execute('DELETE FROM dead_letters WHERE id = ?', (entry_id,))
+                    self._account(data_type, 1, size)
+            self._commit_locked()
+            self._dead_letters -= len(rows)
+            return len(rows)
+
+    def max_id(self) -> int:
+        """Id of the newest entry, or 0 when the queue is empty"""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(MAX(id), 0) FROM queue').fetchone()[0]
+
+    def get_checkpoint(self, name: str) -> Any:
+        """Value saved under name, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM checkpoints WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_checkpoint(self, name: str, value: Any):
+        """Save (or with None, delete) a checkpoint and commit it"""
+        with self._lock:
+            self._save_checkpoint_locked(name, value)
+            self._commit_locked()
+
+    def _save_checkpoint_locked(self, name: str, value: Any):
+        if value is None:
+            self._conn.execute('DELETE FROM checkpoints WHERE name = ?', (name,))
+        else:
+            self._conn.execute('INSERT OR REPLACE INTO checkpoints (name, value) VALUES (?, ?)',
+                               (name, json.dumps(value)))
+
+    @contextmanager
+    def _savepoint(self, name: str):
+        """Atomic block that nests inside an open group transaction
+
+        On failure only the block is rolled back, never pending enqueues.
+        """
+        self._conn.execute(f'SAVEPOINT {name}')
+        try:
+            yield
+        except Exception:
+            self._conn.execute(f'ROLLBACK TO {name}')
+            self._conn.execute(f'RELEASE {name}')
+            raise
+        self._conn.execute(f'RELEASE {name}')
+
+    def _truncate_wal_locked(self):
+        """Copy the WAL into the database and truncate it"""
+        try:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.journal_stats['checkpoints'] += 1
+        except sqlite3.Error as e:
+            self.logger.warning(f"Offline queue checkpoint failed: {e}")
+
+    def prune(self) -> int:
+        """Drop entries (and dead letters) older than the offline buffer window"""
+        cutoff = time.time() - self.max_age_seconds
+
+        with self._lock:
+            before = self._count
+            self._account_removed('created_at < ?', [cutoff])
+            if self._count < before:
+                self._conn.execute('DELETE FROM queue WHERE created_at < ?', (cutoff,))
+            if self._dead_letters:
+                self._dead_letters -= self._conn.execute(
+                    'DELETE FROM dead_letters WHERE failed_at < ?', (cutoff,)
+                ).rowcount
+            return before - self._count
+
+    def _evict_locked(self, bytes_needed: int):
+        """Free bytes_needed, lowest priority and oldest first
+
+        Compactable types are downsampled into summaries before any of
+        them are dropped. Checked-out entries are never evicted, since
+        dropping one loses it if its upload fails, so the queue can stay
+        over its limit until they are acked or released.
+        """
+        freed = 0
+        evicted: Dict[str, int] = defaultdict(int)
+
+        while freed < bytes_needed and self._count > 0:
+            rows = self._conn.execute(
+                'SELECT id, type, size, priority FROM queue ORDER BY priority, id LIMIT ?',
+                (100 + len(self._checked_out),)
+            ).fetchall()
+            rows = [row for row in rows if row[0] not in self._checked_out][:100]
+            if not rows:
+                self.logger.warning(f"Offline queue over its limit with {len(self._checked_out)} "
+                                    f"entries out for delivery, nothing left to evict")
+                break
+
+            lowest = rows[0][3]
+            merge = self._is_raw_compactable(rows[0][1], lowest)
+            if merge:
+                saved = self._compact_locked(rows[0][1], lowest)
+                if saved is not None:
+                    freed += saved
+                    continue
+                merge = False
+
+            ids = []
+            for entry_id, data_type, size, priority in rows:
+                if priority != lowest:
+                    break
+                if merge and self._is_raw_compactable(data_type, priority):
+                    continue
+                ids.append(entry_id)
+                freed += size
+                evicted[data_type] += 1
+                self.eviction_stats['evicted'][data_type] += 1
+                self.eviction_stats['evicted_bytes'][data_type] += size
+                if freed >= bytes_needed:
+                    break
+
+            where = f"id IN ({','.join('?' * len(ids))})"
+            self._account_removed(where, ids)
+            self._conn.execute(f'DELETE FROM queue WHERE {where}', ids)
+
+        if evicted:
+            self.logger.warning(f"Offline queue full, evicted {dict(evicted)}")
+
+    def _is_raw_compactable(self, data_type: str, priority: int) -> bool:
+        return data_type in COMPACTABLE_TYPES and self.priorities.get(data_type) == priority
+
+    def _compact_locked(self, data_type: str, priority: int) -> Optional[int]:
+        """Merge the oldest raw entries of data_type into summaries; returns bytes freed
+
+        Summaries take over the oldest ids of the merged window so queue
+        order is kept, and move up one priority so they are dropped only
+        after every raw entry of this type has been compacted. Checked-out
+        entries are skipped: their ids are about to be acked, which would
+        also delete whatever had been merged into them. Returns None when
+        there is nothing left to compact.
+        """
+        rows = self._conn.execute(
+            'SELECT id, payload, size FROM queue WHERE priority = ? AND type = ? ORDER BY id LIMIT ?',
+            (priority, data_type, COMPACTION_WINDOW + len(self._checked_out))
+        ).fetchall()
+        rows = [row for row in rows if row[0] not in self._checked_out][:COMPACTION_WINDOW]
+        if not rows:
+            return None
+
+        ids = [row[0] for row in rows]
+        original_size = sum(row[2] for row in rows)
+        merged = merge_detections([decode_payload(row[1], data_type) for row in rows])
+        payloads = [self.codec.encode(data, data_type) for data in merged]
+        merged_size = sum(len(payload) for payload in payloads)
+        dropped_ids = ids[len(payloads):]
+
+        with self._savepoint('compact'):
+            if dropped_ids:
+                self._conn.execute(
+                    f"DELETE FROM queue WHERE id IN ({','.join('?' * len(dropped_ids))})", dropped_ids
+                )
+            self._conn.executemany(
+                'UPDATE queue SET payload = ?, size = ?, priority = ? WHERE id = ?',
+                [(payload, len(payload), priority + 1, entry_id)
+                 for payload, entry_id in zip(payloads, ids)]
+            )
+
+        saved = original_size - merged_size
+        self._account(data_type, len(payloads) - len(ids), -saved)
+        self.eviction_stats['compactions'] += 1
+        self.eviction_stats['compacted_rows'] += len(ids)
+        self.eviction_stats['compacted_bytes_saved'] += saved
+        self.logger.info(f"Compacted {len(ids)} {data_type} entries into {len(payloads)} summaries")
+        return saved
+
+    def close(self):
+        """Commit pending enqueues and close the underlying database"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._commit_due.notify()
+            self._commit_locked()
+            self._conn.close()
+        if self._committer is not None:
+            self._committer.join(timeout=1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Client-side Rate Limiter for Project Scout Edge Devices
+Token bucket shared by all send paths, with priority lanes for important data
+"""
+
+import time
+import itertools
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+
+# Highest priority first
+LANES = ('transactions', 'product_detections', 'health', 'logs')
+
+# Backend table -> lane its writes are charged to
+TABLE_LANES = {
+    'transactions': 'transactions',
+    'transaction_items': 'transactions',
+    'product_detections': 'product_detections',
+    'devices': 'health',
+    'device_health': 'health',
+    'edge_hourly_rollups': 'health',
+    'edge_logs': 'logs'
+}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request could not get a token within its timeout"""
+
+
+class PriorityRateLimiter:
+    """Token bucket refilled at rate_per_minute with burst capacity
+
+    When requests contend for tokens, a waiter is only served once no
+    higher-priority lane has anyone waiting; within a lane requests are
+    served in arrival order. Total throughput never exceeds the bucket
+    rate, but transactions get through first.
+    """
+
+    def __init__(self, rate_per_minute: float = 60, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 logger: Optional[logging.Logger] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(rate_per_minute / 6.0, 1)
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._tokens = self.capacity
+        self._last_refill = clock()
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting: Dict[str, deque] = {lane: deque() for lane in LANES}
+
+        self.stats = {
+            lane: {'acquired': 0, 'waited': 0, 'total_wait': 0.0, 'max_wait': 0.0, 'timeouts': 0}
+            for lane in LANES
+        }
+
+    def _refill_locked(self):
+        now = self.clock()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+            self._last_refill = now
+
+    def _is_next_locked(self, lane: str, ticket: int) -> bool:
+        """True when ticket heads its lane and no higher-priority lane is waiting"""
+        for other in LANES:
+            if other == lane:
+                return self._waiting[lane][0] == ticket
+            if self._waiting[other]:
+                return False
+        return False
+
+    def acquire(self, lane: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are granted to lane; False if timeout expires first"""
+        if lane not in self._waiting:
+            raise ValueError(f"Unknown rate limit lane: {lane}")
+
+        started = self.clock()
+        deadline = None if timeout is None else started + timeout
+
+        with self._cond:
+            ticket = next(self._tickets)
+            self._waiting[lane].append(ticket)
+            try:
+                while True:
+                    self._refill_locked()
+                    is_next = self._is_next_locked(lane, ticket)
+                    if is_next and self._tokens >= tokens:
+                        self._tokens -= tokens
+                        self._record_locked(lane, self.clock() - started)
+                        return True
+
+                    now = self.clock()
+                    if deadline is not None and now >= deadline:
+                        self.stats[lane]['timeouts'] += 1
+                        return False
+
+                    # The head waiter sleeps until enough tokens accrue; others until notified
+                    wait = (tokens - self._tokens) / self.rate_per_second if is_next else None
+                    if deadline is not None:
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[lane].remove(ticket)
+                self._cond.notify_all()
+
+    def try_acquire(self, lane: str, tokens: float = 1) -> bool:
+        """Take tokens without waiting
+
+        Fails if they are not free right now or a request of this or a
+        higher-priority lane is already waiting. A failed attempt is not
+        counted as a timeout, so callers can fall back to acquire().
+        """
+        if lane not in self._waiting:
+            raise ValueError(f"Unknown rate limit lane: {lane}")
+
+        with self._cond:
+            for other in LANES:
+                if self._waiting[other]:
+                    return False
+                if other == lane:
+                    break
+            self._refill_locked()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            self._record_locked(lane, 0.0)
+            return True
+
+    def _record_locked(self, lane: str, waited: float):
+        stats = self.stats[lane]
+        stats['acquired'] += 1
+        if waited > 0.001:
+            stats['waited'] += 1
+            stats['total_wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Available tokens, queue lengths and per-lane wait metrics"""
+        with self._cond:
+            self._refill_locked()
+            lanes = {}
+            for lane, stats in self.stats.items():
+                lanes[lane] = {
+                    **stats,
+                    'total_wait': round(stats['total_wait'], 3),
+                    'max_wait': round(stats['max_wait'], 3),
+                    'mean_wait': round(stats['total_wait'] / stats['waited'], 3) if stats['waited'] else 0.0,
+                    'queued': len(self._waiting[lane])
+                }
+            return {'tokens': round(self._tokens, 2), 'lanes': lanes}
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compact Event Records for Project Scout Edge Devices
+Slotted in-memory records for buffered events, converted to backend rows only when sent
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+def epoch_ms() -> int:
+    """Current time as integer milliseconds since the epoch"""
+    return time.time_ns() // 1_000_000
+
+
+def iso_from_ms(timestamp_ms: int) -> str:
+    """Epoch milliseconds as the naive UTC ISO string the backend tables use"""
+    return datetime.utcfromtimestamp(timestamp_ms / 1000).isoformat()
+
+
+def intern_id(value: Any) -> Any:
+    """Share one string object per device/store ID across all records"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class TransactionRecord:
+    """A transaction waiting to be sent; payload is kept as given, not copied"""
+
+    __slots__ = ('device_id', 'store_id', 'created_at', 'payload')
+
+    table = 'transactions'
+    data_type = 'transaction'
+
+    def __init__(self, device_id: str, store_id: Any, payload: Dict[str, Any],
+                 created_at: Optional[int] = None):
+        self.device_id = intern_id(device_id)
+        self.store_id = intern_id(store_id)
+        self.created_at = epoch_ms() if created_at is None else created_at
+        self.payload = payload
+
+    def to_row(self) -> Dict[str, Any]:
+        """Row for the transactions table"""
+        return {
+            **self.payload,
+            'device_id': self.device_id,
+            'store_id': self.store_id,
+            'created_at': iso_from_ms(self.created_at)
+        }
+
+
+class DetectionRecord:
+    """A product detection waiting to be sent
+
+    The common columns are slots; anything else the detector reports is
+    kept in extra, which stays None for the usual detection.
+    """
+
+    __slots__ = ('device_id', 'store_id', 'detected_at', 'brand_detected',
+                 'confidence_score', 'customer_age', 'customer_gender', 'extra')
+
+    table = 'product_detections'
+    data_type = 'product_detection'
+
+    COLUMNS = ('brand_detected', 'confidence_score', 'customer_age', 'customer_gender')
+
+    def __init__(self, device_id: str, store_id: Any, detection: Dict[str, Any],
+                 detected_at: Optional[int] = None):
+        self.device_id = intern_id(device_id)
+        self.store_id = intern_id(store_id)
+        self.detected_at = epoch_ms() if detected_at is None else detected_at
+        self.brand_detected = intern_id(detection.get('brand_detected'))
+        self.confidence_score = detection.get('confidence_score')
+        self.customer_age = detection.get('customer_age')
+        self.customer_gender = intern_id(detection.get('customer_gender'))
+        extra = {key: value for key, value in detection.items() if key not in self.COLUMNS}
+        self.extra = extra or None
+
+    def to_row(self) -> Dict[str, Any]:
+        """Row for the product_detections table"""
+        row = {
+            'device_id': self.device_id,
+            'store_id': self.store_id,
+            'detected_at': iso_from_ms(self.detected_at)
+        }
+        for column in self.COLUMNS:
+            value = getattr(self, column)
+            if value is not None:
+                row[column] = value
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+
+class HealthSample:
+    """One system measurement held in the health sampler's ring buffer"""
+
+    __slots__ = ('timestamp', 'cpu_usage', 'memory_usage', 'disk_usage',
+                 'temperature', 'uptime_seconds')
+
+    def __init__(self, timestamp: float, cpu_usage: float, memory_usage: float,
+                 disk_usage: float, temperature: Optional[float], uptime_seconds: float):
+        self.timestamp = timestamp
+        self.cpu_usage = cpu_usage
+        self.memory_usage = memory_usage
+        self.disk_usage = disk_usage
+        self.temperature = temperature
+        self.uptime_seconds = uptime_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
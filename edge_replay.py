@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Resumable Backlog Replay for Project Scout Edge Devices
+Hands out offline queue entries in windows and persists a high-water mark as they are delivered
+"""
+
+import time
+import logging
+from typing import Dict, List, Any, Iterable, Optional
+
+from edge_offline_queue import OfflineQueue
+
+REPLAY_ORDERS = ('oldest_first', 'newest_first')
+
+CHECKPOINT_NAME = 'replay'
+
+
+class ReplayWindow:
+    """A contiguous run of queue entries sent together"""
+
+    __slots__ = ('index', 'entries')
+
+    def __init__(self, index: int, entries: List[Dict[str, Any]]):
+        self.index = index
+        self.entries = entries
+
+    @property
+    def last_id(self) -> int:
+        return self.entries[-1]['id']
+
+
+class BacklogReplay:
+    """One replay cycle over the offline backlog, resumable after a restart
+
+    A cycle covers the entries that were queued when it started. Windows are
+    handed out in order (oldest or newest first) and may finish out of
+    order, e.g. when several are uploaded in parallel. The high-water mark
+    only moves past a window once every earlier window has finished, and it
+    is saved in the same transaction that acknowledges the window's
+    delivered entries. After a crash or an outage the next pass resumes at
+    the mark, so at most the windows that were in flight are sent again.
+    Entries the backend rejected stay queued and are retried by the next
+    cycle, until they have been rejected max_rejections times; then they
+    are dead-lettered (see OfflineQueue.reject).
+    """
+
+    def __init__(self, queue: OfflineQueue, window_size: int, order: str = 'oldest_first',
+                 max_rejections: int = 3, logger: Optional[logging.Logger] = None):
+        if order not in REPLAY_ORDERS:
+            raise ValueError(f"Unknown replay order {order!r}, expected one of {REPLAY_ORDERS}")
+        self.queue = queue
+        self.window_size = window_size
+        self.order = order
+        self.max_rejections = max_rejections
+        self.logger = logger or logging.getLogger(__name__)
+
+        state = queue.get_checkpoint(CHECKPOINT_NAME)
+        self.resumed = bool(state) and state.get('order') == order
+        if self.resumed:
+            self.logger.info(f"Resuming backlog replay ({order}) at id {state['mark']}, "
+                             f"{state['rows']} rows already delivered")
+        else:
+            end_id = queue.max_id()
+            state = {
+                'order': order,
+                'end_id': end_id,
+                # Exclusive bound: entries past the mark in replay order are still to send
+                'mark': 0 if order == 'oldest_first' else end_id + 1,
+                'rows': 0,
+                'started_at': time.time()
+            }
+            queue.set_checkpoint(CHECKPOINT_NAME, state)
+        self.state = state
+
+        self._position = state['mark']
+        self._next_index = 0
+        self._mark_index = 0
+        self._finished: Dict[int, ReplayWindow] = {}
+        self._exhausted = False
+
+    def next_window(self) -> Optional[ReplayWindow]:
+        """The next window after those already handed out, or None when the cycle has no more"""
+        if self._exhausted:
+            return None
+        if self.order == 'oldest_first':
+            entries = self.queue.peek(self.window_size, after_id=self._position,
+                                      before_id=self.state['end_id'] + 1, checkout=True)
+        else:
+            entries = self.queue.peek(self.window_size, before_id=self._position, newest_first=True,
+                                      checkout=True)
+        if not entries:
+            self._exhausted = True
+            return None
+
+        window = ReplayWindow(self._next_index, entries)
+        self._next_index += 1
+        self._position = window.last_id
+        return window
+
+    def complete(self, window: ReplayWindow, delivered_ids: Iterable[int], finished: bool = True,
+                 rejected_ids: Iterable[int] = ()):
+        """Acknowledge delivered entries and, if the window finished, advance the mark
+
+        A window that did not finish (the link dropped part-way) still has
+        its delivered entries acknowledged, but the mark stays before it.
+        Rejected entries have the rejection counted against them, and the
+        rest of the window is released back to the queue.
+        """
+        delivered_ids = list(delivered_ids)
+        if finished:
+            self._finished[window.index] = window
+        while self._mark_index in self._finished:
+            self.state['mark'] = self._finished.pop(self._mark_index).last_id
+            self._mark_index += 1
+        self.state['rows'] += len(delivered_ids)
+        self.queue.ack(delivered_ids, checkpoint=(CHECKPOINT_NAME, self.state))
+        self.queue.reject(rejected_ids, self.max_rejections)
+        # Only after the ack, so compaction never sees a delivered id as free
+        self.queue.release(entry['id'] for entry in window.entries)
+
+    @property
+    def done(self) -> bool:
+        """Every window of the cycle has been handed out and finished"""
+        return self._exhausted and self._mark_index == self._next_index
+
+    def close(self) -> bool:
+        """End the pass; returns True (and clears the mark) if the cycle is complete"""
+        if not self.done:
+            return False
+        self.queue.set_checkpoint(CHECKPOINT_NAME, None)
+        elapsed = time.time() - self.state['started_at']
+        self.logger.info(f"Backlog replay ({self.order}) complete: {self.state['rows']} rows "
+                         f"in {elapsed:.1f}s")
+        return True
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Hourly Rollups for Project Scout Edge Devices
+Incremental per-hour counters by brand, category and demographic, uploaded as compact rollup rows
+"""
+
+import time
+import calendar
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from edge_records import intern_id, iso_from_ms
+
+ROLLUP_TABLE = 'edge_hourly_rollups'
+
+# Rows are upserted on the table's primary key; each carries this device's running totals
+ROLLUP_CONFLICT_COLUMNS = 'device_id,hour_start,dimension,dimension_key'
+
+ROLLUP_MODES = ('alongside', 'instead')
+
+# Same brackets as the dashboard's age distribution
+AGE_BRACKETS = ((18, 24), (25, 34), (35, 44), (45, 54), (55, 64))
+
+HOUR_SECONDS = 3600
+
+
+def age_bracket(age: Any) -> str:
+    """Dashboard age group for an age, 'unknown' if missing"""
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return 'unknown'
+    if age < AGE_BRACKETS[0][0]:
+        return f"<{AGE_BRACKETS[0][0]}"
+    for low, high in AGE_BRACKETS:
+        if age <= high:
+            return f"{low}-{high}"
+    return f"{AGE_BRACKETS[-1][1] + 1}+"
+
+
+class RollupCounters:
+    """Running totals for one (hour, dimension, key)"""
+
+    __slots__ = ('transactions', 'revenue', 'items', 'detections', 'confidence_sum')
+
+    def __init__(self, transactions: int = 0, revenue: float = 0.0, items: int = 0,
+                 detections: int = 0, confidence_sum: float = 0.0):
+        self.transactions = transactions
+        self.revenue = revenue
+        self.items = items
+        self.detections = detections
+        self.confidence_sum = confidence_sum
+
+    def to_list(self) -> List[Any]:
+        return [getattr(self, name) for name in self.__slots__]
+
+
+class HourlyRollups:
+    """Per-hour counters kept in memory and uploaded as running totals
+
+    Every event is counted once, when it is captured, under the hour it
+    happened in:
+
+    - total: transactions, revenue and items (basket size), detections
+    - brand / category: from transaction line items (revenue and
+      quantity) and from product detections (count and confidence)
+    - demographic: age bracket and gender of the customer
+
+    A rollup row holds the device's totals for its hour rather than a
+    delta, so uploads are upserts that can be repeated or retried
+    safely, and the open hour can be re-sent as it fills up. Only
+    buckets changed since the last upload are sent. snapshot()/restore()
+    carry the counters across restarts so a re-sent hour never goes
+    backwards.
+    """
+
+    def __init__(self, device_id: str, store_id: Any, retention_hours: float = 48,
+                 logger: Optional[logging.Logger] = None):
+        self.device_id = intern_id(device_id)
+        self.store_id = intern_id(store_id)
+        self.retention_hours = retention_hours
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[int, str, str], RollupCounters] = {}
+        self._dirty = set()
+        self.stats = {'events': 0, 'buckets_pruned': 0}
+
+    def _bucket(self, hour: int, dimension: str, key: Any) -> RollupCounters:
+        bucket_key = (hour, dimension, intern_id(str(key)))
+        counters = self._buckets.get(bucket_key)
+        if counters is None:
+            counters = self._buckets[bucket_key] = RollupCounters()
+        self._dirty.add(bucket_key)
+        return counters
+
+    @staticmethod
+    def _hour(timestamp: Optional[float]) -> int:
+        return int((time.time() if timestamp is None else timestamp) // HOUR_SECONDS) * HOUR_SECONDS
+
+    @staticmethod
+    def _demographic(data: Dict[str, Any]) -> str:
+        return f"{age_bracket(data.get('customer_age'))}|{data.get('customer_gender') or 'unknown'}"
+
+    def add(self, data_type: str, data: Dict[str, Any], timestamp: Optional[float] = None):
+        """Count a captured event ('transaction' or 'product_detection'); timestamp in epoch seconds"""
+        if data_type == 'transaction':
+            self.add_transaction(data, timestamp)
+        elif data_type == 'product_detection':
+            self.add_detection(data, timestamp)
+
+    def add_transaction(self, data: Dict[str, Any], timestamp: Optional[float] = None):
+        """Count a transaction and its line items"""
+        hour = self._hour(timestamp)
+        revenue = float(data.get('total_amount') or 0)
+        items = data.get('items') or []
+        quantity = sum(int(item.get('quantity', 1)) for item in items) if items else int(data.get('items_count') or 0)
+
+        with self._lock:
+            self.stats['events'] += 1
+            for dimension, key in (('total', 'all'), ('demographic', self._demographic(data))):
+                counters = self._bucket(hour, dimension, key)
+                counters.transactions += 1
+                counters.revenue += revenue
+                counters.items += quantity
+
+            # A brand or category counts each transaction once, however many lines it has
+            seen = set()
+            for item in items:
+                item_quantity = int(item.get('quantity', 1))
+                line_total = item.get('total_price')
+                if line_total is None:
+                    line_total = float(item.get('unit_price', item.get('price')) or 0) * item_quantity
+                for dimension, key in (('brand', item.get('brand_name') or item.get('brand')),
+                                       ('category', item.get('category'))):
+                    if not key:
+                        continue
+                    counters = self._bucket(hour, dimension, key)
+                    if (dimension, key) not in seen:
+                        counters.transactions += 1
+                        seen.add((dimension, key))
+                    counters.revenue += float(line_total)
+                    counters.items += item_quantity
+
+    def add_detection(self, data: Dict[str, Any], timestamp: Optional[float] = None):
+        """Count a product detection"""
+        hour = self._hour(timestamp)
+        confidence = float(data.get('confidence_score') or 0)
+        keys = [('total', 'all'), ('demographic', self._demographic(data))]
+        brand = data.get('brand_detected') or data.get('brand')
+        if brand:
+            keys.append(('brand', brand))
+        if data.get('category'):
+            keys.append(('category', data['category']))
+
+        with self._lock:
+            self.stats['events'] += 1
+            for dimension, key in keys:
+                counters = self._bucket(hour, dimension, key)
+                counters.detections += 1
+                counters.confidence_sum += confidence
+
+    def _row(self, bucket_key: Tuple[int, str, str], counters: RollupCounters) -> Dict[str, Any]:
+        hour, dimension, key = bucket_key
+        return {
+            'device_id': self.device_id,
+            'store_id': self.store_id,
+            'hour_start': iso_from_ms(hour * 1000),
+            'dimension': dimension,
+            'dimension_key': key,
+            'transactions': counters.transactions,
+            'revenue': round(counters.revenue, 2),
+            'items': counters.items,
+            'detections': counters.detections,
+            'confidence_sum': round(counters.confidence_sum, 4)
+        }
+
+    def take_pending(self) -> List[Dict[str, Any]]:
+        """Rows for every bucket changed since the last upload; requeue() them if the upload fails"""
+        with self._lock:
+            self._prune_locked()
+            rows = [self._row(bucket_key, self._buckets[bucket_key]) for bucket_key in sorted(self._dirty)]
+            self._dirty.clear()
+        return rows
+
+    def requeue(self, rows: Iterable[Dict[str, Any]]):
+        """Mark rows from a failed upload as changed again"""
+        with self._lock:
+            for row in rows:
+                hour = calendar.timegm(datetime.fromisoformat(row['hour_start']).timetuple())
+                bucket_key = (hour, row['dimension'], row['dimension_key'])
+                if bucket_key in self._buckets:
+                    self._dirty.add(bucket_key)
+
+    def _prune_locked(self):
+        """Forget hours older than the retention window that have already been uploaded"""
+        cutoff = self._hour(None) - self.retention_hours * HOUR_SECONDS
+        stale = [bucket_key for bucket_key in self._buckets
+                 if bucket_key[0] < cutoff and bucket_key not in self._dirty]
+        for bucket_key in stale:
+            del self._buckets[bucket_key]
+        self.stats['buckets_pruned'] += len(stale)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable counters, including which buckets still need uploading"""
+        with self._lock:
+            return {
+                'buckets': [[*bucket_key, *counters.to_list(), bucket_key in self._dirty]
+                            for bucket_key, counters in self._buckets.items()]
+            }
+
+    def restore(self, state: Optional[Dict[str, Any]]):
+        """Load counters saved by snapshot(), adding them to anything counted since start-up"""
+        if not state:
+            return
+        with self._lock:
+            for hour, dimension, key, transactions, revenue, items, detections, confidence_sum, dirty in state['buckets']:
+                bucket_key = (hour, dimension, intern_id(key))
+                counters = self._buckets.setdefault(bucket_key, RollupCounters())
+                counters.transactions += transactions
+                counters.revenue += revenue
+                counters.items += items
+                counters.detections += detections
+                counters.confidence_sum += confidence_sum
+                if dirty:
+                    self._dirty.add(bucket_key)
+            self._prune_locked()
+        self.logger.info(f"Restored {len(state['buckets'])} hourly rollup buckets")
+
+    @property
+    def pending(self) -> int:
+        """Buckets changed since the last upload"""
+        return len(self._dirty)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Pipelined Edge Runtime for Project Scout
+Runs capture, NLP enrichment and upload as separate processes linked by bounded queues
+"""
+
+import os
+import json
+import time
+import queue
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+from typing import Callable, Dict, Iterable, List, Any, Optional
+
+# End-of-stream marker passed down the pipeline
+STOP = None
+
+# How often a capture process waiting on its source checks for a stop request
+SOURCE_POLL_SECONDS = 0.5
+
+STAGE_FIELDS = ('received', 'processed', 'errors', 'bypassed', 'busy_seconds', 'blocked_seconds')
+
+# NLP task per event, chosen by the event's 'nlp_task' (default customer_feedback)
+NLP_TASKS = {
+    'customer_feedback': 'process_customer_feedback',
+    'product_mention': 'process_product_mention'
+}
+
+
+class StageStats:
+    """Counters for one stage, shared between the stage's worker processes and the parent"""
+
+    def __init__(self, ctx):
+        self._values = ctx.Array('d', len(STAGE_FIELDS))
+
+    def add(self, **amounts: float):
+        with self._values.get_lock():
+            for name, amount in amounts.items():
+                self._values[STAGE_FIELDS.index(name)] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._values.get_lock():
+            return dict(zip(STAGE_FIELDS, self._values[:]))
+
+
+def jsonl_source(path: str) -> Iterable[Dict[str, Any]]:
+    """Events as JSON lines from a file or a FIFO the capture software writes to
+
+    Each event is {"type": "transaction" | "product_detection", "data": {...}}
+    with an optional "text" (and "nlp_task") to enrich before upload. The
+    enrichment is stored in data['metadata']['nlp'].
+    """
+    with open(path, 'r') as stream:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _read_source(source: Callable[..., Iterable[Dict[str, Any]]], source_args: tuple,
+                 stop_event, buffer_size: int = 100) -> Iterable[Dict[str, Any]]:
+    """Events from source(*source_args) until it ends or stop_event is set
+
+    The source is read on a daemon thread, so a read blocked on an idle FIFO
+    (or an open() waiting for its writer) cannot keep the capture process
+    from noticing a stop; the thread is abandoned when the process exits.
+    """
+    events: queue.Queue = queue.Queue(buffer_size)
+    done = object()
+
+    def offer(item) -> bool:
+        while not stop_event.is_set():
+            try:
+                events.put(item, timeout=SOURCE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pump():
+        try:
+            for event in source(*source_args):
+                if not offer(event):
+                    return
+        except Exception as e:
+            offer((done, e))
+            return
+        offer((done, None))
+
+    threading.Thread(target=pump, name='edge-capture-source', daemon=True).start()
+    while not stop_event.is_set():
+        try:
+            item = events.get(timeout=SOURCE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+        if isinstance(item, tuple) and item and item[0] is done:
+            if item[1] is not None:
+                raise item[1]
+            return
+        yield item
+
+
+def _put(target, item, stats: StageStats):
+    """Blocking put; the time spent waiting is the backpressure this stage absorbed"""
+    try:
+        target.put_nowait(item)
+    except queue.Full:
+        started = time.perf_counter()
+        target.put(item)
+        stats.add(blocked_seconds=time.perf_counter() - started)
+
+
+def _worker_setup(name: str, log_level: str) -> logging.Logger:
+    # The parent coordinates shutdown; a Ctrl-C must not kill a stage mid-event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=log_level, format=f'%(asctime)s - {name} - %(levelname)s - %(message)s')
+    return logging.getLogger(f"EdgeRuntime.{name}")
+
+
+def capture_stage(source: Callable[..., Iterable[Dict[str, Any]]], source_args: tuple,
+                  nlp_queue, upload_queue, nlp_workers: int, bypass_when_full: bool,
+                  stats: StageStats, stop_event, log_level: str):
+    """Read events from source and route them: text to NLP, everything else straight to upload
+
+    When bypass_when_full is set, an event meant for NLP goes to upload
+    unenriched if the NLP queue is full, so a slow model never stalls capture.
+    """
+    logger = _worker_setup('capture', log_level)
+    try:
+        for event in _read_source(source, source_args, stop_event):
+            if stop_event.is_set():
+                break
+            started = time.perf_counter()
+            stats.add(received=1)
+            if event.get('text') and nlp_queue is not None:
+                try:
+                    nlp_queue.put_nowait(event)
+                except queue.Full:
+                    if bypass_when_full:
+                        event['nlp_skipped'] = 'queue_full'
+                        stats.add(bypassed=1)
+                        _put(upload_queue, event, stats)
+                    else:
+                        _put(nlp_queue, event, stats)
+            else:
+                _put(upload_queue, event, stats)
+            stats.add(processed=1, busy_seconds=time.perf_counter() - started)
+    except Exception as e:
+        stats.add(errors=1)
+        logger.error(f"Capture stopped: {e}")
+    finally:
+        if nlp_queue is not None:
+            for _ in range(nlp_workers):
+                nlp_queue.put(STOP)
+        else:
+            upload_queue.put(STOP)
+
+
+def nlp_stage(nlp_config: str, nlp_queue, upload_queue, stats: StageStats, log_level: str):
+    """Enrich events with EdgeNLPProcessor; passes events through if the models are unavailable"""
+    logger = _worker_setup(f"nlp-{os.getpid()}", log_level)
+    processor = None
+    try:
+        from edge_nlp_processor import EdgeNLPProcessor
+        processor = EdgeNLPProcessor(nlp_config)
+    except Exception as e:
+        logger.error(f"NLP unavailable, forwarding events unenriched: {e}")
+
+    while True:
+        event = nlp_queue.get()
+        if event is STOP:
+            upload_queue.put(STOP)
+            return
+
+        started = time.perf_counter()
+        stats.add(received=1)
+        try:
+            if processor is None:
+                event['nlp_skipped'] = 'unavailable'
+                stats.add(bypassed=1)
+            else:
+                task = NLP_TASKS.get(event.get('nlp_task'), NLP_TASKS['customer_feedback'])
+                result = getattr(processor, task)(event['text'])
+                result.pop('text', None)
+                event['data'].setdefault('metadata', {})['nlp'] = result
+        except Exception as e:
+            stats.add(errors=1)
+            event['nlp_skipped'] = 'error'
+            logger.error(f"NLP enrichment failed: {e}")
+        stats.add(processed=1, busy_seconds=time.perf_counter() - started)
+        _put(upload_queue, event, stats)
+
+
+def upload_stage(config_file: str, upload_queue, producers: int, monitor: bool,
+                 stats: StageStats, log_level: str):
+    """Hand events to ProjectScoutEdgeClient's batch writer until every producer has stopped
+
+    With monitor set, the client's registration, health and offline sync jobs
+    run alongside in this process.
+    """
+    logger = _worker_setup('upload', log_level)
+    from edge_client import ProjectScoutEdgeClient
+
+    client = ProjectScoutEdgeClient(config_file)
+    submit = {
+        'transaction': client.submit_transaction,
+        'product_detection': client.submit_product_detection
+    }
+    monitor_thread = None
+    if monitor:
+        monitor_thread = threading.Thread(target=client.run_continuous_monitoring,
+                                          name='edge-monitor', daemon=True)
+        monitor_thread.start()
+
+    stopped = 0
+    while stopped < producers:
+        event = upload_queue.get()
+        if event is STOP:
+            stopped += 1
+            continue
+
+        started = time.perf_counter()
+        stats.add(received=1)
+        try:
+            submit[event['type']](event['data'])
+        except Exception as e:
+            stats.add(errors=1)
+            logger.error(f"Upload stage dropped event: {e}")
+        stats.add(processed=1, busy_seconds=time.perf_counter() - started)
+
+    if monitor_thread is not None:
+        # run_continuous_monitoring flushes the batch writer and offline queue on exit
+        while monitor_thread.is_alive():
+            scheduler = getattr(client, 'scheduler', None)
+            if scheduler is not None:
+                scheduler.stop()
+            monitor_thread.join(0.1)
+    else:
+        client.batch_writer.close()
+        client.offline_queue.flush()
+
+
+class EdgeRuntime:
+    """Capture, NLP and upload stages in their own processes
+
+    Stages are linked by bounded queues: a full queue blocks the producer
+    (backpressure) instead of growing memory. Events without text skip the
+    NLP stage entirely, and with bypass_when_full enrichment is skipped
+    rather than stalling capture, so a slow transformer call only delays
+    the events it is enriching.
+    """
+
+    def __init__(self, config_file: str, source: Callable[..., Iterable[Dict[str, Any]]],
+                 source_args: tuple = (), nlp_config: str = 'nlp_config.json',
+                 nlp_workers: Optional[int] = None, queue_size: int = 1000,
+                 bypass_when_full: bool = True, monitor: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """source(*source_args) runs in the capture process and must be picklable (module-level)"""
+        self.logger = logger or logging.getLogger(__name__)
+        # Capture and upload take one core each; the rest go to NLP
+        self.nlp_workers = max(1, (os.cpu_count() or 4) - 2) if nlp_workers is None else nlp_workers
+        self.log_level = logging.getLevelName(self.logger.getEffectiveLevel())
+
+        # Spawn so each stage starts clean, without the parent's threads or loaded models
+        ctx = multiprocessing.get_context('spawn')
+        self.stop_event = ctx.Event()
+        self.queues = {'upload': ctx.Queue(queue_size)}
+        if self.nlp_workers:
+            self.queues['nlp'] = ctx.Queue(queue_size)
+        self.stage_stats = {name: StageStats(ctx) for name in ('capture', 'nlp', 'upload')}
+
+        nlp_queue = self.queues.get('nlp')
+        upload_queue = self.queues['upload']
+        self.processes: Dict[str, List[Any]] = {
+            'capture': [ctx.Process(
+                target=capture_stage, name='edge-capture',
+                args=(source, source_args, nlp_queue, upload_queue, self.nlp_workers,
+                      bypass_when_full, self.stage_stats['capture'], self.stop_event, self.log_level)
+            )],
+            'nlp': [ctx.Process(
+                target=nlp_stage, name=f'edge-nlp-{index}',
+                args=(nlp_config, nlp_queue, upload_queue, self.stage_stats['nlp'], self.log_level)
+            ) for index in range(self.nlp_workers)],
+            'upload': [ctx.Process(
+                target=upload_stage, name='edge-upload',
+                args=(config_file, upload_queue, self.nlp_workers or 1, monitor,
+                      self.stage_stats['upload'], self.log_level)
+            )]
+        }
+        self.started_at: Optional[float] = None
+
+    def start(self) -> 'EdgeRuntime':
+        self.started_at = time.perf_counter()
+        # Downstream first, so capture never fills a queue nobody is reading
+        for name in ('upload', 'nlp', 'capture'):
+            for process in self.processes[name]:
+                process.start()
+        self.logger.info(f"Edge runtime started: 1 capture, {self.nlp_workers} NLP, 1 upload process")
+        return self
+
+    def stop(self):
+        """Stop capturing; events already in the pipeline are still uploaded"""
+        self.stop_event.set()
+
+    def join(self, stats_interval: float = 0, timeout: Optional[float] = None):
+        """Wait for every stage to drain, logging stats every stats_interval seconds
+
+        With a timeout, stages still running after that many seconds are
+        terminated, losing whatever is left in their queues.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        upload = self.processes['upload'][0]
+        while upload.is_alive():
+            wait = stats_interval or None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait = min(wait, remaining) if wait else remaining
+            upload.join(wait)
+            if stats_interval and upload.is_alive():
+                self.logger.info(f"Pipeline stats: {self.stats()}")
+
+        if upload.is_alive():
+            self.logger.error(f"Pipeline did not drain within {timeout}s, terminating stages")
+            for processes in self.processes.values():
+                for process in processes:
+                    process.terminate()
+        elif upload.exitcode != 0:
+            # Nothing is draining the queues any more; upstream stages would block forever
+            self.logger.error(f"Upload stage exited with code {upload.exitcode}, stopping pipeline")
+            for process in self.processes['capture'] + self.processes['nlp']:
+                process.terminate()
+        for processes in self.processes.values():
+            for process in processes:
+                process.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage throughput, busy fraction, backpressure and input queue depth"""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        inputs = {'nlp': self.queues.get('nlp'), 'upload': self.queues['upload']}
+
+        result = {}
+        for name, stage_stats in self.stage_stats.items():
+            workers = len(self.processes[name])
+            if not workers:
+                continue
+            stats = stage_stats.snapshot()
+            stats['workers'] = workers
+            stats['events_per_sec'] = round(stats['processed'] / elapsed, 1) if elapsed else 0.0
+            stats['utilization'] = round(stats['busy_seconds'] / (elapsed * workers), 3) if elapsed else 0.0
+            stats['queue_depth'] = self._depth(inputs.get(name))
+            result[name] = stats
+        return result
+
+    @staticmethod
+    def _depth(stage_queue) -> Optional[int]:
+        if stage_queue is None:
+            return None
+        try:
+            return stage_queue.qsize()
+        except NotImplementedError:
+            # qsize() is unavailable on macOS
+            return None
+
+
+def main():
+    """Run the pipelined runtime over a JSON-lines event stream"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--source', required=True,
+                        help='JSON-lines event file or FIFO written by the capture software')
+    parser.add_argument('--config', default='edge_device_config.json')
+    parser.add_argument('--nlp-config', default='nlp_config.json')
+    parser.add_argument('--stats-interval', type=float, default=60)
+    parser.add_argument('--drain-timeout', type=float, default=60,
+                        help='Seconds to wait for the pipeline to drain after Ctrl-C before terminating it')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        print(f"Configuration file {args.config} not found!")
+        print("Please run the configuration generator first.")
+        return
+
+    with open(args.config, 'r') as f:
+        device_settings = json.load(f)['device_settings']
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    runtime = EdgeRuntime(
+        args.config, jsonl_source, (args.source,), nlp_config=args.nlp_config,
+        nlp_workers=device_settings.get('nlp_workers'),
+        queue_size=device_settings.get('pipeline_queue_size', 1000)
+    ).start()
+    try:
+        runtime.join(args.stats_interval)
+    except KeyboardInterrupt:
+        runtime.logger.info("Stopping capture, draining pipeline...")
+        runtime.stop()
+        runtime.join(timeout=args.drain_timeout)
+    runtime.logger.info(f"Pipeline stats: {runtime.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Periodic Job Scheduler for Project Scout Edge Devices
+Runs health, sync and registration jobs independently with per-device jitter
+"""
+
+import time
+import heapq
+import hashlib
+import itertools
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+
+def device_jitter(device_id: str, job_name: str, window_seconds: float) -> float:
+    """Deterministic offset in [0, window_seconds) for this device and job
+
+    Derived from a hash of the device ID, so a fleet that boots together
+    after a power cut spreads its jobs out, while each device keeps the same
+    phase across restarts.
+    """
+    if window_seconds <= 0:
+        return 0.0
+    digest = hashlib.sha256(f"{device_id}:{job_name}".encode()).digest()
+    fraction = int.from_bytes(digest[:8], 'big') / 2 ** 64
+    return fraction * window_seconds
+
+
+class ScheduledJob:
+    """A periodic job and its timing statistics"""
+
+    def __init__(self, name: str, fn: Callable[[], Any], interval_seconds: float,
+                 interval_fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.fn = fn
+        self.interval_seconds = interval_seconds
+        self.interval_fn = interval_fn
+        self.next_run = 0.0
+        # Sequence number of the job's live heap entry; older entries are stale
+        self.entry = -1
+        self.running = False
+        self.stats = {
+            'runs': 0,
+            'failures': 0,
+            'coalesced': 0,
+            'last_duration': 0.0,
+            'max_duration': 0.0,
+            'total_duration': 0.0
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['mean_duration'] = round(stats['total_duration'] / stats['runs'], 3) if stats['runs'] else 0.0
+        stats['total_duration'] = round(stats['total_duration'], 3)
+        stats['interval_seconds'] = self.interval_seconds
+        return stats
+
+
+class Scheduler:
+    """Priority queue of timed jobs executed on a small worker pool
+
+    Each job runs on its own worker, so a slow sync can't delay health
+    reporting. Runs missed while a job was still busy (or the device was
+    suspended) are coalesced into a single run instead of firing in a burst.
+    """
+
+    def __init__(self, device_id: str, clock: Callable[[], float] = time.monotonic,
+                 logger: Optional[logging.Logger] = None):
+        self.device_id = device_id
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List = []
+        self._heap_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add_job(self, name: str, fn: Callable[[], Any], interval_seconds: float,
+                jitter_seconds: Optional[float] = None,
+                interval_fn: Optional[Callable[[], float]] = None) -> ScheduledJob:
+        """Schedule fn every interval_seconds
+
+        The first run is delayed by a per-device offset within jitter_seconds
+        (defaults to one full interval). With interval_fn, the job is adaptive:
+        interval_fn() is asked for the delay after each run finishes, and
+        interval_seconds only applies until then.
+        """
+        job = ScheduledJob(name, fn, interval_seconds, interval_fn)
+        window = interval_seconds if jitter_seconds is None else jitter_seconds
+        job.next_run = self.clock() + device_jitter(self.device_id, name, window)
+
+        self.jobs[name] = job
+        self._push(job)
+        self.logger.debug(f"Scheduled {name} every {interval_seconds}s, first run in "
+                          f"{job.next_run - self.clock():.1f}s")
+        return job
+
+    def _push(self, job: ScheduledJob):
+        with self._heap_lock:
+            job.entry = next(self._sequence)
+            heapq.heappush(self._heap, (job.next_run, job.entry, job))
+
+    def reschedule(self, name: str, delay_seconds: float):
+        """Move a job's next run to delay_seconds from now"""
+        job = self.jobs[name]
+        if delay_seconds > 0:
+            job.interval_seconds = delay_seconds
+        job.next_run = self.clock() + max(delay_seconds, 0)
+        self._push(job)
+        self._wakeup.set()
+
+    def run_forever(self):
+        """Dispatch jobs until stop() is called"""
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.jobs), 1), thread_name_prefix='edge-job'
+        )
+
+        try:
+            while not self._stop.is_set() and self._heap:
+                with self._heap_lock:
+                    # Cleared under the lock so a reschedule() after this point still wakes us
+                    self._wakeup.clear()
+                    next_run, entry, job = self._heap[0]
+                    if entry != job.entry:
+                        # Superseded by reschedule()
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = next_run - self.clock()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+
+                self._dispatch(job)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stop(self):
+        """Stop dispatching; running jobs are allowed to finish"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def _dispatch(self, job: ScheduledJob):
+        """Start job if it is idle and compute its next run time"""
+        now = self.clock()
+        start = not job.running
+
+        # Skip over slots missed while busy instead of running them back to back
+        job.next_run += job.interval_seconds
+        if job.next_run <= now:
+            missed = int((now - job.next_run) // job.interval_seconds) + 1
+            job.next_run += missed * job.interval_seconds
+            job.stats['coalesced'] += missed
+        # Queued before the run starts, so an adaptive job's reschedule() always wins
+        self._push(job)
+
+        if start:
+            job.running = True
+            self._executor.submit(self._run_job, job)
+        else:
+            job.stats['coalesced'] += 1
+
+    def _run_job(self, job: ScheduledJob):
+        started = time.monotonic()
+        try:
+            job.fn()
+        except Exception as e:
+            job.stats['failures'] += 1
+            self.logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            job.stats['runs'] += 1
+            job.stats['last_duration'] = round(duration, 3)
+            job.stats['max_duration'] = round(max(job.stats['max_duration'], duration), 3)
+            job.stats['total_duration'] += duration
+            job.running = False
+
+        if job.interval_fn is not None:
+            try:
+                self.reschedule(job.name, job.interval_fn())
+            except Exception as e:
+                self.logger.error(f"Could not choose next interval for {job.name}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job timing statistics"""
+        return {name: job.snapshot() for name, job in self.jobs.items()}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Adaptive Sync Policy for Project Scout Edge Devices
+Chooses the delay before the next offline sync from backlog, link success rate and measured RTT/bandwidth
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class AdaptiveSyncPolicy:
+    """Decides when the next offline sync should run
+
+    - Link degraded (the last pass was interrupted, the backend was
+      unreachable, or the recent success rate fell below
+      healthy_success_rate): back off exponentially from min_interval up
+      to max_interval, resetting on the first clean pass.
+    - Link healthy with a backlog: drain continuously, every min_interval.
+      On a slow link (RTT above slow_rtt_seconds) the delay stretches in
+      proportion to the RTT, capped at the base interval. If the last pass
+      delivered nothing because the backend rejected every row it tried,
+      wait the base interval instead of re-sending them right away.
+    - Link healthy and nothing queued: the configured base interval.
+
+    Every decision is logged with the inputs it was made from and kept
+    in a short history for stats().
+    """
+
+    def __init__(self, base_interval_seconds: float = 300, min_interval_seconds: float = 5,
+                 max_interval_seconds: float = 1800, backoff_factor: float = 2.0,
+                 healthy_success_rate: float = 0.8, slow_rtt_seconds: float = 2.0,
+                 smoothing: float = 0.3, logger: Optional[logging.Logger] = None):
+        self.base_interval = base_interval_seconds
+        self.min_interval = min(min_interval_seconds, base_interval_seconds)
+        self.max_interval = max(max_interval_seconds, base_interval_seconds)
+        self.backoff_factor = backoff_factor
+        self.healthy_success_rate = healthy_success_rate
+        self.slow_rtt_seconds = slow_rtt_seconds
+        self.smoothing = smoothing
+        self.logger = logger or logging.getLogger(__name__)
+
+        # Exponentially weighted link measurements; None until first observed
+        self.success_rate: Optional[float] = None
+        self.rtt_seconds: Optional[float] = None
+        self.bandwidth_bytes_per_sec: Optional[float] = None
+        self.consecutive_failures = 0
+        self.stalled = False
+        self.last_decision: Dict[str, Any] = {}
+        self.decisions: deque = deque(maxlen=20)
+
+    def _smooth(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def _record_outcome(self, link_ok: bool):
+        self.success_rate = self._smooth(self.success_rate, 1.0 if link_ok else 0.0)
+        self.consecutive_failures = 0 if link_ok else self.consecutive_failures + 1
+
+    def record_pass(self, stats: Dict[str, Any]):
+        """Feed the stats of a finished sync pass (see _record_sync_stats)"""
+        self._record_outcome(not stats.get('interrupted'))
+        self.stalled = not stats.get('interrupted') and not stats.get('rows') and bool(stats.get('failed'))
+        if stats.get('requests') and stats.get('request_seconds'):
+            self.rtt_seconds = self._smooth(self.rtt_seconds, stats['request_seconds'] / stats['requests'])
+        if stats.get('bytes') and stats.get('bytes_per_sec'):
+            self.bandwidth_bytes_per_sec = self._smooth(self.bandwidth_bytes_per_sec, stats['bytes_per_sec'])
+
+    def record_offline(self):
+        """A sync that was skipped because the backend was unreachable"""
+        self._record_outcome(False)
+        self.stalled = False
+
+    @property
+    def degraded(self) -> bool:
+        return self.consecutive_failures > 0 or (
+            self.success_rate is not None and self.success_rate < self.healthy_success_rate
+        )
+
+    def next_interval(self, backlog: int) -> float:
+        """Seconds until the next sync, given the number of entries still queued"""
+        if self.degraded:
+            steps = max(self.consecutive_failures, 1)
+            delay = min(self.min_interval * self.backoff_factor ** steps, self.max_interval)
+            reason = 'backoff'
+        elif backlog and self.stalled:
+            delay = self.base_interval
+            reason = 'stalled'
+        elif backlog:
+            delay = self.min_interval
+            reason = 'drain'
+            if self.rtt_seconds is not None and self.rtt_seconds > self.slow_rtt_seconds:
+                delay = min(self.min_interval * self.rtt_seconds / self.slow_rtt_seconds, self.base_interval)
+                reason = 'drain_slow_link'
+        else:
+            delay = self.base_interval
+            reason = 'idle'
+
+        decision = {
+            'delay_seconds': round(delay, 1),
+            'reason': reason,
+            'backlog': backlog,
+            'success_rate': None if self.success_rate is None else round(self.success_rate, 2),
+            'rtt_ms': None if self.rtt_seconds is None else round(self.rtt_seconds * 1000, 1),
+            'bandwidth_kbps': None if self.bandwidth_bytes_per_sec is None
+            else round(self.bandwidth_bytes_per_sec * 8 / 1000, 1),
+            'consecutive_failures': self.consecutive_failures
+        }
+        # Log changes of mode and each backoff step at info; repeated drain decisions would flood the log
+        changed = (reason != self.last_decision.get('reason')
+                   or self.consecutive_failures != self.last_decision.get('consecutive_failures'))
+        log = self.logger.info if changed else self.logger.debug
+        log(f"Next sync in {delay:.1f}s ({reason}): backlog={backlog}, "
+            f"success_rate={decision['success_rate']}, rtt_ms={decision['rtt_ms']}, "
+            f"bandwidth_kbps={decision['bandwidth_kbps']}, failures={self.consecutive_failures}")
+        self.last_decision = decision
+        self.decisions.append(decision)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Current link estimates and recent decisions"""
+        return {
+            'success_rate': self.success_rate,
+            'rtt_seconds': self.rtt_seconds,
+            'bandwidth_bytes_per_sec': self.bandwidth_bytes_per_sec,
+            'consecutive_failures': self.consecutive_failures,
+            'last_decision': dict(self.last_decision),
+            'recent_reasons': [decision['reason'] for decision in self.decisions]
+        }
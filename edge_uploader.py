@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Batch Uploader for Project Scout Edge Devices
+Posts compressed DeviceBatchData batches to the dashboard /api/iot/device-upload endpoint
+"""
+
+import gzip
+import time
+import random
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import requests
+
+# zstd is optional; gzip is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from edge_offline_queue import OfflineQueue
+from edge_codecs import get_codec
+
+# Content-Encodings api/iot/device-upload.ts accepts
+COMPRESSIONS = ('gzip', 'zstd', 'identity')
+
+# Statuses worth retrying, besides 5xx
+TRANSIENT_STATUSES = (408, 429)
+# Statuses that reject the batch's own content; other 4xx (auth, unknown
+# device, encoding) would reject every batch, so they stop the upload instead
+PAYLOAD_REJECTIONS = (400, 413, 422)
+
+
+class BatchRejected(Exception):
+    """The endpoint refused a batch's content; sending it again will not help"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class DeviceBatchUploader:
+    """Builds DeviceBatchData batches from the offline queue and uploads them
+
+    Mirrors the DeviceBatchData contract in api/iot/device-upload.ts. Each
+    batch_id is derived from the queue ids it covers, so a batch retried
+    after a failed attempt or a restart is sent under the same key; the
+    endpoint records processed batch_ids (device_upload_batches) and
+    acknowledges a repeat without storing it again.
+
+    A batch whose content is rejected is split in half until the rejected
+    transactions are isolated; those are dead-lettered in the queue so
+    they no longer hold up the uploads behind them.
+    """
+
+    def __init__(self, queue: OfflineQueue, device_id: str, store_id: Any,
+                 endpoint_url: str, api_key: str, firmware_version: Optional[str] = None,
+                 compression: str = 'gzip', codec: str = 'json', batch_size: int = 200,
+                 retry_attempts: int = 3, timeout_seconds: float = 10,
+                 circuit=None, rate_limiter=None, logger: Optional[logging.Logger] = None):
+        self.queue = queue
+        self.device_id = device_id
+        self.store_id = int(store_id) if str(store_id).isdigit() else store_id
+        self.endpoint_url = endpoint_url
+        self.firmware_version = firmware_version
+        self.batch_size = batch_size
+        self.retry_attempts = retry_attempts
+        self.timeout_seconds = timeout_seconds
+        self.circuit = circuit
+        self.rate_limiter = rate_limiter
+        self.logger = logger or logging.getLogger(__name__)
+
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported upload compression {compression!r}, expected one of {COMPRESSIONS}")
+        if compression == 'zstd' and zstandard is None:
+            self.logger.warning("zstandard not installed, falling back to gzip")
+            compression = 'gzip'
+        self.compression = compression
+        self._zstd = zstandard.ZstdCompressor(level=3) if compression == 'zstd' else None
+
+        # Body format: JSON, or MessagePack (falls back to JSON when msgpack is missing)
+        if codec not in ('json', 'msgpack'):
+            raise ValueError(f"Unsupported upload codec {codec!r}, expected 'json' or 'msgpack'")
+        self.codec = get_codec(codec, self.logger)
+
+        # One keep-alive session for every batch
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f"Bearer {api_key}",
+            'Content-Type': self.codec.content_type
+        })
+
+        self.stats = {
+            'batches': 0,
+            'transactions': 0,
+            'raw_bytes': 0,
+            'wire_bytes': 0,
+            'retries': 0,
+            'failed_batches': 0,
+            'dead_lettered': 0,
+            'seconds': 0.0
+        }
+
+    @property
+    def compression_ratio(self) -> float:
+        """Uncompressed over compressed bytes for everything uploaded so far"""
+        if not self.stats['wire_bytes']:
+            return 0.0
+        return round(self.stats['raw_bytes'] / self.stats['wire_bytes'], 2)
+
+    def build_batch(self, entries: List[Dict[str, Any]],
+                    health_metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a DeviceBatchData payload from queued transaction entries"""
+        batch = {
+            'device_id': self.device_id,
+            'store_id': self.store_id,
+            'batch_metadata': {
+                'batch_id': f"{self.device_id}-{entries[0]['id']}-{entries[-1]['id']}",
+                'created_at': datetime.utcnow().isoformat(),
+                'transaction_count': len(entries)
+            },
+            'transactions': [self._to_transaction(entry) for entry in entries]
+        }
+        if self.firmware_version:
+            batch['batch_metadata']['firmware_version'] = self.firmware_version
+        if health_metrics:
+            batch['health_metrics'] = health_metrics
+        return batch
+
+    def _to_transaction(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a queued transaction onto the contract's transaction shape"""
+        data = entry['data']
+        customer = data.get('customer') or {}
+
+        transaction = {
+            'interaction_id': (data.get('interaction_id') or data.get('transaction_id')
+                               or f"{self.device_id}-{entry['id']}"),
+            'timestamp': (data.get('timestamp') or data.get('created_at')
+                          or datetime.utcfromtimestamp(entry['timestamp']).isoformat()),
+            'customer': {
+                'facial_id': customer.get('facial_id', data.get('facial_id')),
+                'gender': customer.get('gender', data.get('customer_gender')),
+                'age': customer.get('age', data.get('customer_age')),
+                'emotion': customer.get('emotion', data.get('emotion'))
+            },
+            'transcript': data.get('transcript') or data.get('transcription_text') or '',
+            'items': [
+                {
+                    'brand_name': item.get('brand_name') or item.get('brand'),
+                    'product_name': item.get('product_name') or item.get('name'),
+                    'quantity': item.get('quantity', 1),
+                    'confidence': item.get('confidence', 1.0)
+                }
+                for item in data.get('items', [])
+            ]
+        }
+        if data.get('session_matches'):
+            transaction['session_matches'] = data['session_matches']
+        return transaction
+
+    def encode(self, batch: Dict[str, Any]) -> Tuple[bytes, int]:
+        """Serialize and compress a batch; returns (body, uncompressed size)"""
+        if self.codec.binary:
+            raw = self.codec.encode_body(batch)
+        else:
+            raw = self.codec.encode(batch).encode('utf-8')
+        if self.compression == 'gzip':
+            return gzip.compress(raw, compresslevel=6), len(raw)
+        if self.compression == 'zstd':
+            return self._zstd.compress(raw), len(raw)
+        return raw, len(raw)
+
+    def post_batch(self, batch: Dict[str, Any]) -> bool:
+        """Upload one batch, retrying transient failures under the same batch_id
+
+        Returns False if the batch could not be delivered for now, and
+        raises BatchRejected when the endpoint refused its content.
+        """
+        batch_id = batch['batch_metadata']['batch_id']
+        body, raw_size = self.encode(batch)
+        headers = {'Idempotency-Key': batch_id}
+        if self.compression != 'identity':
+            headers['Content-Encoding'] = self.compression
+
+        for attempt in range(self.retry_attempts + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                # Exponential backoff with jitter between attempts
+                time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+
+            if self.circuit and not self.circuit.allow_request():
+                self.logger.debug(f"Circuit open, deferring batch {batch_id}")
+                return False
+
+            if self.rate_limiter and not self.rate_limiter.acquire('transactions', timeout=self.timeout_seconds):
+                if self.circuit:
+                    self.circuit.release()
+                self.logger.debug(f"No request budget, deferring batch {batch_id}")
+                return False
+
+            try:
+                response = self.session.post(
+                    self.endpoint_url, data=body, headers=headers, timeout=self.timeout_seconds
+                )
+            except requests.RequestException as e:
+                if self.circuit:
+                    self.circuit.record_failure()
+                self.logger.warning(f"Batch {batch_id} upload attempt {attempt + 1} failed: {e}")
+                continue
+
+            if self.circuit:
+                if response.status_code >= 500 or response.status_code in TRANSIENT_STATUSES:
+                    self.circuit.record_failure()
+                else:
+                    self.circuit.record_success()
+
+            if 200 <= response.status_code < 300:
+                self.stats['batches'] += 1
+                self.stats['transactions'] += len(batch['transactions'])
+                self.stats['raw_bytes'] += raw_size
+                self.stats['wire_bytes'] += len(body)
+                return True
+
+            if response.status_code not in TRANSIENT_STATUSES and response.status_code < 500:
+                # Rejected outright; retrying the same payload will not help
+                self.logger.error(f"Batch {batch_id} rejected ({response.status_code}): {response.text[:200]}")
+                self.stats['failed_batches'] += 1
+                if response.status_code in PAYLOAD_REJECTIONS:
+                    raise BatchRejected(response.status_code, response.text[:200])
+                return False
+
+            self.logger.warning(f"Batch {batch_id} upload attempt {attempt + 1} returned {response.status_code}")
+
+        self.stats['failed_batches'] += 1
+        return False
+
+    def upload_pending(self, max_batches: Optional[int] = None,
+                       health_metrics: Optional[Dict[str, Any]] = None) -> bool:
+        """Upload queued transactions in batches, acknowledging each accepted batch"""
+        start_time = time.time()
+        uploaded = 0
+        last_id = 0
+        success = True
+
+        while max_batches is None or uploaded < max_batches:
+            entries = self.queue.peek(self.batch_size, after_id=last_id, types=['transaction'])
+            if not entries:
+                break
+            last_id = entries[-1]['id']
+
+            # Health metrics ride along with the first batch only
+            if not self._upload_entries(entries, health_metrics if uploaded == 0 else None):
+                success = False
+                break
+            uploaded += 1
+
+        self.stats['seconds'] += time.time() - start_time
+        if uploaded:
+            self.logger.info(
+                f"Uploaded {uploaded} batches ({self.stats['transactions']} transactions total, "
+                f"compression ratio {self.compression_ratio})"
+            )
+        return success
+
+    def _upload_entries(self, entries: List[Dict[str, Any]],
+                        health_metrics: Optional[Dict[str, Any]] = None) -> bool:
+        """Upload entries as one batch and acknowledge them; False on a failure worth retrying
+
+        A rejected batch is bisected; a single rejected transaction is
+        dead-lettered, which also counts as done.
+        """
+        try:
+            if not self.post_batch(self.build_batch(entries, health_metrics)):
+                return False
+        except BatchRejected as e:
+            if len(entries) == 1:
+                self.stats['dead_lettered'] += self.queue.dead_letter(
+                    [entries[0]['id']], f"device-upload rejected {e}"
+                )
+                return True
+            middle = len(entries) // 2
+            return (self._upload_entries(entries[:middle], health_metrics) and
+                    self._upload_entries(entries[middle:]))
+
+        self.queue.ack(entry['id'] for entry in entries)
+        return True
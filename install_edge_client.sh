@@ -26,7 +26,7 @@ source project_scout_env/bin/activate
 # Install Python packages
 echo "📚 Installing Python packages..."
 pip install --upgrade pip
-pip install supabase psutil requests
+pip install supabase psutil requests httpx msgpack
 
 # Create project directory
 echo "📁 Setting up project directory..."
@@ -43,7 +43,8 @@ if [ -f "../.env.edge" ]; then
 fi
 
 if [ -f "../edge_client.py" ]; then
-    cp ../edge_client.py .
+    # edge_client.py imports its support modules (edge_*.py) from this directory
+    cp ../edge_*.py .
     chmod +x edge_client.py
 fi
 
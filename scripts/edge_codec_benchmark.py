@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Edge Codec Benchmark
+Compares encoded size and encode/decode time of the json, msgpack and record codecs on realistic transaction, detection and health records
+"""
+
+import os
+import sys
+import gzip
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_codecs import CODECS, get_codec, decode_payload
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+
+def synthetic_records(rng: random.Random, count: int) -> dict:
+    """count records per data type, shaped as edge_client stores them"""
+    started = datetime(2026, 10, 17, 8, 0, 0)
+    records = {'transaction': [], 'product_detection': [], 'device_health': []}
+    for index in range(count):
+        at = (started + timedelta(seconds=index * 7, microseconds=rng.randint(0, 999_999))).isoformat()
+        basket = rng.sample(PRODUCTS, rng.randint(1, 4))
+        items = [{'product_id': PRODUCTS.index(product) + 1, 'quantity': rng.randint(1, 3),
+                  'price': product['price']} for product in basket]
+        records['transaction'].append({
+            'device_id': 'Pi5_Edge_bench0001', 'store_id': 'store_001', 'created_at': at,
+            'event_id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'total_amount': round(sum(item['price'] * item['quantity'] for item in items), 2),
+            'items_count': len(items), 'customer_age': rng.randint(18, 70),
+            'customer_gender': rng.choice(GENDERS), 'payment_method': rng.choice(['Cash', 'GCash']),
+            'items': items
+        })
+        product = rng.choice(PRODUCTS)
+        records['product_detection'].append({
+            'device_id': 'Pi5_Edge_bench0001', 'store_id': 'store_001', 'detected_at': at,
+            'event_id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'brand_detected': product['brand'], 'confidence_score': round(rng.uniform(0.6, 0.99), 4),
+            'customer_age': rng.randint(18, 70), 'customer_gender': rng.choice(GENDERS)
+        })
+        records['device_health'].append({
+            'device_id': 'Pi5_Edge_bench0001', 'timestamp': at,
+            'cpu_usage': round(rng.uniform(5, 60), 1), 'memory_usage': round(rng.uniform(30, 70), 1),
+            'disk_usage': 41.3, 'temperature': round(rng.uniform(45, 65), 1),
+            'uptime_seconds': 86400 + index * 60, 'network_connected': True,
+            'metadata': {'load_avg': [0.4, 0.5, 0.6]}
+        })
+    return records
+
+
+def measure(codec, data_type: str, records: list) -> dict:
+    started = time.perf_counter()
+    payloads = [codec.encode(record, data_type) for record in records]
+    encoded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    decoded = [decode_payload(payload, data_type) for payload in payloads]
+    elapsed = time.perf_counter() - started
+    if decoded != records:
+        raise AssertionError(f"{codec.name} did not round-trip {data_type} records")
+
+    raw = [payload.encode('utf-8') if isinstance(payload, str) else payload for payload in payloads]
+    return {
+        'bytes': sum(len(payload) for payload in raw) / len(raw),
+        'gzip': len(gzip.compress(b''.join(raw))) / len(raw),
+        'encode_us': encoded / len(records) * 1e6,
+        'decode_us': elapsed / len(records) * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=5000, help='records per data type')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    records = synthetic_records(random.Random(args.seed), args.records)
+    codecs = [get_codec(name) for name in CODECS]
+    print(f"📦 {args.records:,} records per data type")
+    print(f"{'data type':<19}{'codec':<9}{'bytes':>8}{'vs json':>9}{'gzip bytes':>12}{'enc µs':>9}{'dec µs':>9}")
+    for data_type, rows in records.items():
+        baseline = None
+        for codec in codecs:
+            result = measure(codec, data_type, rows)
+            baseline = baseline or result['bytes']
+            print(f"{data_type:<19}{codec.name:<9}{result['bytes']:>8.0f}{result['bytes'] / baseline:>8.0%} "
+                  f"{result['gzip']:>11.0f}{result['encode_us']:>9.1f}{result['decode_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
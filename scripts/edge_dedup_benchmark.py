@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Edge Detection Dedup Benchmark
+Simulates a counter camera on a simulated clock and compares product_detections rows uploaded with and without windowed deduplication
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_detection_dedup import DetectionDeduplicator
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+
+def camera_stream(rng: random.Random, minutes: float, fps: float, visits_per_minute: float,
+                  dwell_seconds: float):
+    """(time, detection) for every frame a product is in view; products stay for ~dwell_seconds"""
+    events = []
+    t = 0.0
+    end = minutes * 60
+    while True:
+        t += rng.expovariate(visits_per_minute / 60.0)
+        if t >= end:
+            break
+        gender = rng.choice(GENDERS)
+        age = rng.randint(18, 70)
+        for product in rng.sample(PRODUCTS, rng.randint(1, 3)):
+            dwell = rng.expovariate(1 / dwell_seconds)
+            for frame in range(max(1, int(dwell * fps))):
+                events.append((t + frame / fps, {
+                    'brand_detected': product['brand'],
+                    'product_name': product['name'],
+                    'confidence_score': round(rng.uniform(0.6, 0.99), 4),
+                    'customer_age': age,
+                    'customer_gender': gender
+                }))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def run(events, window: float, gap: float, max_keys: int) -> dict:
+    now = [0.0]
+    emitted = []
+    dedup = DetectionDeduplicator(lambda detection, first_seen: emitted.append(detection),
+                                  window_seconds=window, gap_seconds=gap, max_keys=max_keys,
+                                  clock=lambda: now[0])
+    peak_groups = 0
+    for seen_at, detection in events:
+        now[0] = seen_at
+        dedup.add(detection, 'store_001', seen_at=seen_at)
+        peak_groups = max(peak_groups, dedup.open_groups)
+    dedup.close()
+    return {'rows': len(emitted), 'peak_groups': peak_groups, 'evicted': dedup.stats['evicted']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--minutes', type=float, default=60)
+    parser.add_argument('--fps', type=float, default=2, help='detector frames per second')
+    parser.add_argument('--visits-per-minute', type=float, default=1.5)
+    parser.add_argument('--dwell-seconds', type=float, default=20, help='mean time a product stays in view')
+    parser.add_argument('--windows', default='10,30,60', help='comma-separated window lengths in seconds')
+    parser.add_argument('--gap-seconds', type=float, default=5)
+    parser.add_argument('--max-keys', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    events = camera_stream(random.Random(args.seed), args.minutes, args.fps,
+                           args.visits_per_minute, args.dwell_seconds)
+    print(f"📷 {args.minutes:g} min of camera detections at {args.fps:g} fps: {len(events):,} raw rows")
+    print(f"{'window s':>9}{'gap s':>7}{'rows':>8}{'reduction':>11}{'peak groups':>13}{'evicted':>9}")
+    for window in (float(value) for value in args.windows.split(',')):
+        result = run(events, window, args.gap_seconds, args.max_keys)
+        print(f"{window:>9g}{args.gap_seconds:>7g}{result['rows']:>8,}"
+              f"{len(events) / max(result['rows'], 1):>10.1f}x{result['peak_groups']:>13}{result['evicted']:>9}")
+
+
+if __name__ == "__main__":
+    main()
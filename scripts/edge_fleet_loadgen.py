@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Edge Fleet Load Generator
+Simulates many edge devices against a local stub backend and reports throughput, tail latency and errors per fleet size
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_async_client import AsyncProjectScoutEdgeClient
+from edge_circuit_breaker import CircuitOpenError
+from edge_rate_limiter import RateLimitExceeded
+from edge_stub_server import StubBackend
+from generate_15000_transactions import REGIONS, PRODUCTS, AGE_GROUPS, GENDERS
+
+# Any JWT-shaped value passes client-side key validation; the stub ignores it
+os.environ.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.loadgen')
+
+REGION_CODES = list(REGIONS)
+REGION_WEIGHTS = [REGIONS[code]['weight'] for code in REGION_CODES]
+
+
+class SimulatedDevice(AsyncProjectScoutEdgeClient):
+    """Real async edge client that records the latency and outcome of every request"""
+
+    def __init__(self, config_file: str, device_id: str, data_dir: str, recorder: Dict[str, Any]):
+        super().__init__(config_file, device_id=device_id, data_dir=data_dir)
+        self.recorder = recorder
+
+    async def _request(self, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await super()._request(method, path, **kwargs)
+        except (RateLimitExceeded, CircuitOpenError):
+            self.recorder['rejected'] += 1
+            raise
+        except Exception:
+            self.recorder['attempts'] += 1
+            self.recorder['errors'] += 1
+            raise
+
+        self.recorder['attempts'] += 1
+        self.recorder['latencies'].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.recorder['errors'] += 1
+        return response
+
+
+def synthetic_visit(rng: random.Random, region: str, detections_per_tx: float):
+    """One transaction and its product detections, drawn from the demo catalog"""
+    basket = rng.sample(PRODUCTS, max(1, min(int(rng.gauss(3, 1.5)), len(PRODUCTS))))
+    low, _, high = rng.choice(AGE_GROUPS).rstrip('+').partition('-')
+    age = rng.randint(int(low), int(high or 75))
+    gender = rng.choice(GENDERS)
+
+    transaction = {
+        'region': region,
+        'customer_age': age,
+        'customer_gender': gender,
+        'payment_method': rng.choice(['Cash', 'GCash', 'PayMaya', 'Cash', 'Cash']),
+        'total_amount': sum(product['price'] * rng.choice([1, 1, 1, 2, 3]) for product in basket),
+        'items_count': len(basket)
+    }
+    detections = [
+        {
+            'brand_detected': product['brand'],
+            'confidence_score': round(rng.uniform(0.7, 0.99), 4),
+            'customer_age': age,
+            'customer_gender': gender
+        }
+        for product in basket
+        if rng.random() < detections_per_tx / len(basket)
+    ]
+    return transaction, detections
+
+
+async def drive_device(device: SimulatedDevice, region: str, rng: random.Random, until: float,
+                       tx_per_minute: float, detections_per_tx: float):
+    """Replay visits at Poisson arrival times until the step ends"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(rng.expovariate(tx_per_minute / 60.0))
+        if loop.time() >= until:
+            return
+        transaction, detections = synthetic_visit(rng, region, detections_per_tx)
+        await device.send_transaction_data(transaction)
+        for detection in detections:
+            await device.send_product_detection(detection)
+
+
+async def run_devices(config_file: str, device_ids: List[str], data_root: str, duration: float,
+                      tx_per_minute: float, detections_per_tx: float, seed: int) -> Dict[str, Any]:
+    recorder = {'latencies': [], 'attempts': 0, 'errors': 0, 'rejected': 0}
+    rng = random.Random(seed)
+
+    devices = []
+    for device_id in device_ids:
+        device = SimulatedDevice(config_file, device_id, os.path.join(data_root, device_id), recorder)
+        region = rng.choices(REGION_CODES, weights=REGION_WEIGHTS)[0]
+        device.store_id = f"{region}-{device_id[-4:]}"
+        devices.append((device, region))
+
+    started = time.perf_counter()
+    until = asyncio.get_running_loop().time() + duration
+    try:
+        await asyncio.gather(*(
+            drive_device(device, region, random.Random(f"{seed}:{device.device_id}"), until,
+                         tx_per_minute, detections_per_tx)
+            for device, region in devices
+        ))
+    finally:
+        queued = 0
+        for device, _ in devices:
+            queued += len(device.offline_queue)
+            await device.close()
+            device.offline_queue.close()
+
+    recorder['queued'] = queued
+    recorder['seconds'] = time.perf_counter() - started
+    return recorder
+
+
+def run_shard(*args) -> Dict[str, Any]:
+    """Process-pool entry point: run one shard of the fleet on its own event loop"""
+    return asyncio.run(run_devices(*args))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_step(stub: StubBackend, config_file: str, devices: int, processes: int, args) -> Dict[str, Any]:
+    """Run one fleet size for args.duration seconds and summarise what the backend saw"""
+    device_ids = [f"Pi5_Edge_sim{index:05d}" for index in range(devices)]
+    shards = [device_ids[index::processes] for index in range(processes)]
+    rows_before = sum(stub.stats['rows'].values())
+
+    with tempfile.TemporaryDirectory() as data_root:
+        shard_args = [
+            (config_file, shard, data_root, args.duration, args.tx_per_minute,
+             args.detections_per_tx, args.seed + index)
+            for index, shard in enumerate(shards) if shard
+        ]
+        if processes == 1:
+            results = [run_shard(*shard_args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(run_shard, *zip(*shard_args)))
+
+    # Only the traffic phase counts; client start-up is excluded
+    elapsed = max(result['seconds'] for result in results)
+
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+    errors = sum(result['errors'] for result in results)
+    rejected = sum(result['rejected'] for result in results)
+    attempts = sum(result['attempts'] for result in results)
+    return {
+        'devices': devices,
+        'seconds': elapsed,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'rows_per_sec': (sum(stub.stats['rows'].values()) - rows_before) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        'error_rate': errors / attempts if attempts else 0.0,
+        'rejected': rejected,
+        'queued': sum(result['queued'] for result in results)
+    }
+
+
+def write_config(stub: StubBackend, path: str, args):
+    """Copy the device config with the stub as backend and simulation-friendly limits"""
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'edge_device_config.json')
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    config['endpoints']['supabase']['base_url'] = stub.url
+    config['endpoints']['supabase']['api_url'] = f"{stub.url}/rest/v1"
+    # Failed sends are expected under injected errors; the summary table reports them
+    config.setdefault('logging', {})['level'] = 'CRITICAL'
+    # One pooled connection per simulated device keeps thousands of devices under the fd limit
+    config['device_settings']['max_concurrent_requests'] = 1
+    if args.rate_limit is not None:
+        config.setdefault('security', {})['api_rate_limit'] = args.rate_limit
+
+    with open(path, 'w') as f:
+        json.dump(config, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--devices', default='10,50,100,250',
+                        help='comma-separated fleet sizes to ramp through')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='seconds to run each fleet size')
+    parser.add_argument('--tx-per-minute', type=float, default=6,
+                        help='mean transactions per device per minute')
+    parser.add_argument('--detections-per-tx', type=float, default=2,
+                        help='mean product detections per transaction')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='worker processes to spread simulated devices over')
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='simulated server latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of writes the stub answers with 503')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='override security.api_rate_limit (requests/minute per device)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    stub = StubBackend(latency_ms=args.latency_ms, error_rate=args.error_rate).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, 'edge_device_config.json')
+        write_config(stub, config_file, args)
+
+        print(f"🚚 Ramping fleet {args.devices} for {args.duration:.0f}s each against {stub.url}")
+        print(f"{'devices':>8}{'req/s':>10}{'rows/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'max ms':>9}{'errors':>9}{'rejected':>10}{'queued':>8}")
+        for devices in (int(value) for value in args.devices.split(',')):
+            result = run_step(stub, config_file, devices, max(1, min(args.processes, devices)), args)
+            print(f"{result['devices']:>8}{result['rps']:>10,.1f}{result['rows_per_sec']:>10,.1f}"
+                  f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                  f"{result['max_ms']:>9.1f}{result['error_rate']:>9.2%}{result['rejected']:>10}"
+                  f"{result['queued']:>8}")
+
+    stub.stop()
+    print(f"📊 Stub totals: {stub.stats['requests']} requests, {dict(stub.stats['rows'])} rows, "
+          f"{stub.stats['errors_injected']} injected errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Edge Health Series Codec Benchmark
+Compares bytes uploaded for a multi-hour health trace between 5-minute single-point reports, per-minute JSON rows and columnar delta-encoded series
+"""
+
+import os
+import sys
+import json
+import zlib
+import time
+import base64
+import random
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_records import HealthSample
+from edge_health_sampler import summarize, AGGREGATED_METRICS
+from edge_health_codec import SERIES_CODEC, METRIC_COLUMNS, encode_health_series, decode_health_series, resample
+
+
+def synthetic_trace(rng: random.Random, hours: float, interval: float) -> list:
+    """Health samples as the sampler takes them: noisy CPU, drifting memory and temperature"""
+    started = datetime(2026, 10, 17, 6, 0, 0).timestamp()
+    boot = started - 86400 - rng.uniform(0, 3600)
+    cpu, memory, disk, temperature = 12.0, 38.0, 41.3, 48.0
+    samples = []
+    for index in range(int(hours * 3600 / interval)):
+        now = started + index * interval + rng.uniform(0, 0.02)
+        busy = rng.random() < 0.05
+        cpu = min(100.0, max(0.5, cpu + rng.gauss(0, 2) + (25 if busy else 0) - (cpu - 12) * 0.2))
+        memory = min(95.0, max(20.0, memory + rng.gauss(0, 0.05)))
+        if rng.random() < 0.002:
+            disk += 0.1
+        temperature += (40 + cpu * 0.3 - temperature) * 0.05 + rng.gauss(0, 0.1)
+        samples.append(HealthSample(now, round(cpu, 1), round(memory, 1), round(disk, 1),
+                                    round(temperature, 2), now - boot))
+    return samples
+
+
+def report_row(window: list, series: dict = None) -> dict:
+    """A device_health row as _collect_health_data builds it; a series rides alongside the summaries"""
+    summaries = {metric: summarize([getattr(s, metric) for s in window]) for metric in AGGREGATED_METRICS}
+    metadata = {'window_seconds': round(window[-1].timestamp - window[0].timestamp, 1),
+                'samples': len(window), **summaries}
+    if series is not None:
+        metadata['series'] = series
+    return {
+        'device_id': 'Pi5_Edge_bench0001',
+        'timestamp': datetime.utcfromtimestamp(window[-1].timestamp).isoformat(),
+        **{metric: summaries[metric]['mean'] for metric in AGGREGATED_METRICS},
+        'uptime_seconds': int(window[-1].uptime_seconds),
+        'network_connected': True,
+        'metadata': metadata
+    }
+
+
+def point_row(sample: HealthSample) -> dict:
+    """One device_health row per point, base columns only"""
+    return {
+        'device_id': 'Pi5_Edge_bench0001',
+        'timestamp': datetime.utcfromtimestamp(sample.timestamp).isoformat(),
+        **{name: (round(getattr(sample, name), 2) if getattr(sample, name) is not None else None)
+           for name, _, _ in METRIC_COLUMNS if name != 'uptime_seconds'},
+        'uptime_seconds': int(sample.uptime_seconds),
+        'network_connected': True
+    }
+
+
+def json_bytes(rows) -> int:
+    return len(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+
+
+def windows(samples: list, report_seconds: float) -> list:
+    grouped = {}
+    for sample in samples:
+        grouped.setdefault(int(sample.timestamp // report_seconds), []).append(sample)
+    return [grouped[key] for key in sorted(grouped)]
+
+
+def reports_bytes(samples: list, report_seconds: float, series_interval: float = None) -> int:
+    """Bytes of the device_health rows for the trace, optionally carrying a series"""
+    total = 0
+    for window in windows(samples, report_seconds):
+        series = None
+        if series_interval is not None:
+            points = resample(window, series_interval) if series_interval else window
+            series = {'codec': SERIES_CODEC, 'interval_seconds': series_interval, 'points': len(points),
+                      'data': base64.b64encode(encode_health_series(points)).decode('ascii')}
+        total += json_bytes(report_row(window, series))
+    return total
+
+
+def check_round_trip(samples: list):
+    """Decoded values must match the samples at each column's precision"""
+    decoded = decode_health_series(encode_health_series(samples))
+    for sample, row in zip(samples, decoded):
+        if abs(sample.timestamp - row['timestamp']) > 0.0005 + 1e-6:
+            raise AssertionError("timestamp drifted")
+        for name, scale, _ in METRIC_COLUMNS:
+            if abs(getattr(sample, name) - row[name]) > 0.5 / scale + 1e-9:
+                raise AssertionError(f"{name} drifted: {getattr(sample, name)} != {row[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', default='1,6,24', help='comma-separated trace lengths')
+    parser.add_argument('--sample-interval', type=float, default=5, help='seconds between samples')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    for hours in (float(value) for value in args.hours.split(',')):
+        samples = synthetic_trace(random.Random(args.seed), hours, args.sample_interval)
+        check_round_trip(samples)
+        per_minute = resample(samples, 60)
+
+        started = time.perf_counter()
+        whole = encode_health_series(samples)
+        encode_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        decode_health_series(whole)
+        decode_ms = (time.perf_counter() - started) * 1000
+
+        per_minute_rows = json.dumps([point_row(p) for p in per_minute], separators=(',', ':')).encode('utf-8')
+        strategies = (
+            ('5-min single point (today)', len(windows(samples, 300)), reports_bytes(samples, 300)),
+            ('1-min JSON rows', len(per_minute), len(per_minute_rows)),
+            ('1-min JSON rows, one gzip', len(per_minute), len(zlib.compress(per_minute_rows, 9))),
+            ('5-min report, 1-min series', len(per_minute), reports_bytes(samples, 300, 60)),
+            ('15-min report, 1-min series', len(per_minute), reports_bytes(samples, 900, 60)),
+            ('15-min report, 5-s series', len(samples), reports_bytes(samples, 900, 0)),
+            ('whole trace, one batch', len(samples), len(whole))
+        )
+
+        baseline = strategies[0][2]
+        print(f"🩺 {hours:g} h trace, {len(samples):,} samples every {args.sample_interval:g} s "
+              f"(one-batch encode {encode_ms:.1f} ms, decode {decode_ms:.1f} ms)")
+        print(f"{'strategy':<30}{'points':>8}{'bytes':>10}{'B/point':>9}{'KB/hour':>9}{'vs today':>10}")
+        for label, points, size in strategies:
+            print(f"{label:<30}{points:>8,}{size:>10,}{size / points:>9.1f}"
+                  f"{size / 1024 / hours:>9.1f}{size / baseline:>9.0%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Edge Journal Benchmark
+Measures offline queue events/sec, commits and bytes written to storage per event under different durability windows
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_offline_queue import OfflineQueue
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+
+def io_counters() -> dict:
+    """Bytes this process has written (write_bytes: sent to storage, wchar: passed to write())"""
+    counters = {}
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                counters[name] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def synthetic_event(rng: random.Random) -> tuple:
+    if rng.random() < 0.3:
+        basket = rng.sample(PRODUCTS, rng.randint(1, 5))
+        return 'transaction', {
+            'device_id': 'Pi5_Edge_bench', 'store_id': 'store_001',
+            'customer_age': rng.randint(18, 75), 'customer_gender': rng.choice(GENDERS),
+            'payment_method': rng.choice(['Cash', 'GCash', 'PayMaya']),
+            'total_amount': sum(product['price'] for product in basket), 'items_count': len(basket)
+        }
+    return 'product_detection', {
+        'device_id': 'Pi5_Edge_bench', 'store_id': 'store_001',
+        'brand_detected': rng.choice(PRODUCTS)['brand'],
+        'confidence_score': round(rng.uniform(0.7, 0.99), 4),
+        'customer_age': rng.randint(18, 75), 'customer_gender': rng.choice(GENDERS)
+    }
+
+
+def run_setting(directory: str, window_ms: float, group_kb: float, events: list, rate: float) -> dict:
+    """Enqueue every event (paced to rate per second when rate > 0) and drain the queue"""
+    db_path = os.path.join(directory, f"queue-{window_ms:g}ms.db")
+    queue = OfflineQueue(db_path, durability_window_ms=window_ms, group_commit_bytes=int(group_kb * 1024))
+
+    io_before = io_counters()
+    started = time.perf_counter()
+    for index, (data_type, data) in enumerate(events):
+        if rate > 0:
+            delay = started + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        queue.enqueue(data_type, data)
+    queue.flush()
+    elapsed = time.perf_counter() - started
+    io_after = io_counters()
+
+    wal_path = db_path + '-wal'
+    wal_peak = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    # Upload confirmed: acknowledging everything truncates the journal
+    while len(queue):
+        queue.ack(entry['id'] for entry in queue.peek(500))
+    wal_after = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    commits = queue.journal_stats['commits']
+    queue.close()
+
+    return {
+        'events_per_sec': len(events) / elapsed,
+        'commits': commits,
+        'events_per_commit': len(events) / commits if commits else 0,
+        'disk_bytes_per_event': (io_after.get('write_bytes', 0) - io_before.get('write_bytes', 0)) / len(events),
+        'write_bytes_per_event': (io_after.get('wchar', 0) - io_before.get('wchar', 0)) / len(events),
+        'wal_peak_kb': wal_peak / 1024,
+        'wal_after_ack_kb': wal_after / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--windows', default='0,10,50,200,1000',
+                        help='comma-separated durability windows in ms (0 = commit every event)')
+    parser.add_argument('--group-kb', type=float, default=64,
+                        help='pending payload that forces a commit before the window ends')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='events per second to pace at (0 = as fast as possible)')
+    parser.add_argument('--dir', default=None,
+                        help='directory for the queue files; use the SD card to measure real fsync cost')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    events = [synthetic_event(rng) for _ in range(args.events)]
+    payload = sum(len(str(data)) for _, data in events) / len(events)
+    directory = tempfile.mkdtemp(prefix='edge-journal-', dir=args.dir)
+
+    pace = f"{args.rate:g} events/s" if args.rate > 0 else 'unpaced'
+    print(f"💾 Offline queue journal: {args.events:,} events (~{payload:.0f} B payload), {pace}, in {directory}")
+    print(f"{'window ms':>10}{'events/s':>11}{'commits':>9}{'ev/commit':>11}"
+          f"{'disk B/ev':>11}{'write B/ev':>12}{'WAL peak KB':>13}{'WAL after ack':>15}")
+    try:
+        for window in (float(value) for value in args.windows.split(',')):
+            result = run_setting(directory, window, args.group_kb, events, args.rate)
+            print(f"{window:>10g}{result['events_per_sec']:>11,.0f}{result['commits']:>9,}"
+                  f"{result['events_per_commit']:>11.1f}{result['disk_bytes_per_event']:>11,.0f}"
+                  f"{result['write_bytes_per_event']:>12,.0f}{result['wal_peak_kb']:>13,.0f}"
+                  f"{result['wal_after_ack_kb']:>15,.0f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("\nA power cut loses at most one window of events; window 0 fsyncs every event.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Edge Log Shipper Benchmark
+Measures how long application threads spend in logging calls, and the rows and bytes sent to edge_logs, when shipping through LogShipper over a slow link versus one insert per record
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_log_shipper import LogShipper, log_level
+
+
+class SlowBackend:
+    """Stands in for the edge_logs insert: latency per request, optional failures"""
+
+    def __init__(self, latency_ms: float, error_rate: float, rng: random.Random):
+        self.latency_seconds = latency_ms / 1000
+        self.error_rate = error_rate
+        self.rng = rng
+        self.requests = self.rows = self.bytes = 0
+        self._lock = threading.Lock()
+
+    def insert(self, rows) -> bool:
+        time.sleep(self.latency_seconds)
+        with self._lock:
+            self.requests += 1
+            if self.rng.random() < self.error_rate:
+                raise ConnectionError("Injected failure")
+            self.rows += len(rows)
+            self.bytes += len(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+        return True
+
+
+class PerRecordHandler(logging.Handler):
+    """One synchronous insert per record, as a naive handler would do"""
+
+    def __init__(self, backend: SlowBackend):
+        super().__init__(logging.INFO)
+        self.backend = backend
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.backend.insert([{'device_id': 'Pi5_Edge_bench0001', 'log_level': log_level(record.levelno),
+                                  'message': record.getMessage(), 'component': record.name}])
+        except ConnectionError:
+            pass
+
+
+def workload(seconds: float, rate: float, seed: int, timings: list):
+    """An application thread: mostly routine INFO lines, some warnings and the odd exception"""
+    rng = random.Random(seed)
+    loggers = [logging.getLogger(name) for name in ('edge_client', 'edge_batch_writer', 'httpx')]
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        logger = rng.choice(loggers)
+        roll = rng.random()
+        started = time.perf_counter()
+        if roll < 0.85:
+            logger.info(f"Batch sent to transactions: {rng.choice((20, 50, 100))} rows")
+        elif roll < 0.98:
+            logger.warning(f"Request retried after {rng.choice(('timeout', '503'))}")
+        else:
+            try:
+                raise TimeoutError("read timed out")
+            except TimeoutError:
+                logger.exception("Failed to send health metrics")
+        timings.append(time.perf_counter() - started)
+        time.sleep(1 / rate)
+
+
+def run(handler: logging.Handler, threads: int, seconds: float, rate: float, seed: int) -> dict:
+    root = logging.getLogger()
+    root.addHandler(handler)
+    timings: list = []
+    workers = [threading.Thread(target=workload, args=(seconds, rate, seed + index, timings))
+               for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    root.removeHandler(handler)
+    timings.sort()
+    return {
+        'records': len(timings),
+        'p50_us': timings[len(timings) // 2] * 1e6,
+        'p99_us': timings[int(len(timings) * 0.99)] * 1e6,
+        'max_ms': timings[-1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5, help='how long the application threads log')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=200, help='log calls per second per thread')
+    parser.add_argument('--latency-ms', type=float, default=300, help='edge_logs insert round trip')
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--interval', type=float, default=1, help='LogShipper ship interval in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    print(f"🪵 {args.threads} threads logging ~{args.rate:g}/s each for {args.seconds:g} s; "
+          f"{args.latency_ms:g} ms inserts, {args.error_rate:.0%} failing")
+    print(f"{'handler':<12}{'logged':>8}{'p50 µs':>9}{'p99 µs':>9}{'max ms':>9}{'requests':>10}"
+          f"{'rows':>7}{'KB sent':>9}{'dropped':>9}")
+
+    backend = SlowBackend(args.latency_ms, args.error_rate, random.Random(args.seed))
+    result = run(PerRecordHandler(backend), args.threads, args.seconds, args.rate, args.seed)
+    print(f"{'per-record':<12}{result['records']:>8,}{result['p50_us']:>9.0f}{result['p99_us']:>9.0f}"
+          f"{result['max_ms']:>9.1f}{backend.requests:>10,}{backend.rows:>7,}{backend.bytes / 1024:>9.1f}{'-':>9}")
+
+    backend = SlowBackend(args.latency_ms, args.error_rate, random.Random(args.seed))
+    shipper = LogShipper(backend.insert, 'Pi5_Edge_bench0001', interval_seconds=args.interval).start()
+    result = run(shipper, args.threads, args.seconds, args.rate, args.seed)
+    shipper.close(timeout=10)
+    print(f"{'LogShipper':<12}{result['records']:>8,}{result['p50_us']:>9.0f}{result['p99_us']:>9.0f}"
+          f"{result['max_ms']:>9.1f}{backend.requests:>10,}{backend.rows:>7,}{backend.bytes / 1024:>9.1f}"
+          f"{shipper.dropped:>9,}")
+    print(f"   shipped {shipper.stats['shipped']:,} records as {shipper.stats['rows']:,} rows; dropped "
+          f"{shipper.stats['sampled']:,} sampled, {shipper.stats['overflow']:,} overflow, "
+          f"{shipper.stats['rejected']:,} rejected; {shipper.stats['failures']} failed batches retried")
+
+
+if __name__ == "__main__":
+    main()
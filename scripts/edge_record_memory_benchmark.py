@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Edge Record Memory Benchmark
+Compares the per-event memory footprint of dict-based cached events with the slotted records in edge_records.py
+"""
+
+import os
+import sys
+import random
+import argparse
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_records import TransactionRecord, DetectionRecord, HealthSample
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+DEVICE_ID = 'Pi5_Edge_2af59df1e9a9'
+STORE_ID = 'store_001'
+
+
+def transaction_payload(rng: random.Random) -> dict:
+    basket = rng.sample(PRODUCTS, rng.randint(1, 5))
+    return {
+        'customer_age': rng.randint(18, 75),
+        'customer_gender': rng.choice(GENDERS),
+        'payment_method': rng.choice(['Cash', 'GCash', 'PayMaya']),
+        'total_amount': sum(product['price'] for product in basket),
+        'items_count': len(basket)
+    }
+
+
+def detection_payload(rng: random.Random) -> dict:
+    return {
+        'brand_detected': rng.choice(PRODUCTS)['brand'],
+        'confidence_score': round(rng.uniform(0.7, 0.99), 4),
+        'customer_age': rng.randint(18, 75),
+        'customer_gender': rng.choice(GENDERS)
+    }
+
+
+def cached_event(data_type: str, payload: dict, timestamp_key: str) -> dict:
+    """The previous in-memory layout: a wrapper dict around a copy of the row"""
+    # IDs arrive as fresh strings (e.g. parsed back from JSON), as they did in the old cache
+    row = {**payload, 'device_id': ''.join(DEVICE_ID), 'store_id': ''.join(STORE_ID),
+           timestamp_key: datetime.utcnow().isoformat()}
+    return {'type': data_type, 'data': row, 'timestamp': datetime.utcnow().isoformat()}
+
+
+def health_dict(rng: random.Random) -> dict:
+    return {
+        'timestamp': rng.uniform(1.7e9, 1.8e9),
+        'cpu_usage': rng.uniform(0, 100),
+        'memory_usage': rng.uniform(0, 100),
+        'disk_usage': rng.uniform(0, 100),
+        'temperature': rng.uniform(40, 80),
+        'uptime_seconds': rng.uniform(0, 1e6)
+    }
+
+
+def health_record(rng: random.Random) -> HealthSample:
+    return HealthSample(rng.uniform(1.7e9, 1.8e9), rng.uniform(0, 100), rng.uniform(0, 100),
+                        rng.uniform(0, 100), rng.uniform(40, 80), rng.uniform(0, 1e6))
+
+
+def measure(build, count: int) -> float:
+    """Bytes allocated per object by build(index), averaged over count objects"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list of references is common to both layouts
+    list_bytes = sys.getsizeof(kept)
+    return (after - before - list_bytes) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    transactions = [transaction_payload(rng) for _ in range(args.records)]
+    detections = [detection_payload(rng) for _ in range(args.records)]
+
+    # Payload dicts already exist when an event is submitted; only the per-event overhead is compared
+    cases = [
+        ('transaction',
+         lambda i: cached_event('transaction', transactions[i], 'created_at'),
+         lambda i: TransactionRecord(''.join(DEVICE_ID), ''.join(STORE_ID), transactions[i])),
+        ('product_detection',
+         lambda i: cached_event('product_detection', detections[i], 'detected_at'),
+         lambda i: DetectionRecord(''.join(DEVICE_ID), ''.join(STORE_ID), detections[i])),
+        ('health_sample',
+         lambda i: health_dict(rng),
+         lambda i: health_record(rng))
+    ]
+
+    print(f"🧠 Memory per buffered event ({args.records:,} events each, payload dicts excluded)")
+    print(f"{'event':<20}{'dict (B)':>10}{'record (B)':>12}{'saved':>8}")
+    for name, old, new in cases:
+        old_bytes = measure(old, args.records)
+        new_bytes = measure(new, args.records)
+        print(f"{name:<20}{old_bytes:>10.0f}{new_bytes:>12.0f}{1 - new_bytes / old_bytes:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
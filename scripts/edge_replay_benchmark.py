@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Edge Backlog Replay Benchmark
+Drains a simulated multi-hour offline backlog against the stub backend, then kills a replay mid-way and checks it resumes without duplicates
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_client import ProjectScoutEdgeClient
+from edge_replay import CHECKPOINT_NAME
+from edge_stub_server import StubBackend
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+os.environ.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.replay')
+
+DEVICE_ID = 'Pi5_Edge_replay0001'
+
+
+def write_config(stub: StubBackend, path: str, args, **device_settings):
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'edge_device_config.json')
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    config['endpoints']['supabase']['base_url'] = stub.url
+    config['endpoints']['supabase']['api_url'] = f"{stub.url}/rest/v1"
+    config.setdefault('logging', {})['level'] = 'WARNING'
+    if args.rate_limit is not None:
+        config.setdefault('security', {})['api_rate_limit'] = args.rate_limit
+    config['device_settings'].update(device_settings)
+    with open(path, 'w') as f:
+        json.dump(config, f)
+
+
+def fill_backlog(config_file: str, data_dir: str, events: int, seed: int) -> int:
+    """Queue events as if the device had been offline; returns how many were queued"""
+    rng = random.Random(seed)
+    client = ProjectScoutEdgeClient(config_file, device_id=DEVICE_ID, data_dir=data_dir)
+    for _ in range(events):
+        if rng.random() < 0.4:
+            basket = rng.sample(PRODUCTS, rng.randint(1, 4))
+            client.cache_offline_data('transaction', {
+                'device_id': DEVICE_ID, 'store_id': 'store_001',
+                'total_amount': sum(product['price'] for product in basket),
+                'items_count': len(basket), 'payment_method': rng.choice(['Cash', 'GCash'])
+            })
+        else:
+            client.cache_offline_data('product_detection', {
+                'device_id': DEVICE_ID, 'store_id': 'store_001',
+                'brand_detected': rng.choice(PRODUCTS)['brand'],
+                'confidence_score': round(rng.uniform(0.7, 0.99), 4),
+                'customer_gender': rng.choice(GENDERS)
+            })
+    queued = len(client.offline_queue)
+    client.offline_queue.close()
+    return queued
+
+
+def replay(config_file: str, data_dir: str):
+    """One sync pass in a fresh client, as after a reboot"""
+    logging.basicConfig(level=logging.CRITICAL)
+    client = ProjectScoutEdgeClient(config_file, device_id=DEVICE_ID, data_dir=data_dir)
+    client.sync_offline_data()
+    client.offline_queue.close()
+
+
+def stored_rows(stub: StubBackend) -> int:
+    return sum(stub.stats['rows'].values())
+
+
+def drain(stub: StubBackend, tmp: str, events: int, args, label: str, **device_settings) -> dict:
+    config_file = os.path.join(tmp, f"config-{label}.json")
+    data_dir = os.path.join(tmp, f"data-{label}")
+    write_config(stub, config_file, args, **device_settings)
+    queued = fill_backlog(config_file, data_dir, events, args.seed)
+
+    rows_before = stored_rows(stub)
+    started = time.perf_counter()
+    replay(config_file, data_dir)
+    elapsed = time.perf_counter() - started
+    return {'queued': queued, 'stored': stored_rows(stub) - rows_before, 'seconds': elapsed}
+
+
+def crash_and_resume(stub: StubBackend, tmp: str, events: int, args) -> dict:
+    """Kill the replay process part-way, restart it, and count what the backend stored"""
+    config_file = os.path.join(tmp, 'config-crash.json')
+    data_dir = os.path.join(tmp, 'data-crash')
+    write_config(stub, config_file, args, replay_parallel_chunks=args.parallel)
+    queued = fill_backlog(config_file, data_dir, events, args.seed + 1)
+
+    rows_before = stored_rows(stub)
+    duplicates_before = stub.stats['duplicate_rows']
+    ctx = multiprocessing.get_context('fork')
+    crashes = 0
+    for _ in range(args.crashes):
+        process = ctx.Process(target=replay, args=(config_file, data_dir))
+        process.start()
+        process.join(args.crash_after)
+        if not process.is_alive():
+            break
+        process.kill()
+        process.join()
+        crashes += 1
+
+    # Peek at the persisted high-water mark the restarted replay will resume from
+    from edge_offline_queue import OfflineQueue
+    queue = OfflineQueue(os.path.join(data_dir, 'offline_queue.db'))
+    mark = queue.get_checkpoint(CHECKPOINT_NAME)
+    remaining = len(queue)
+    queue.close()
+
+    replay(config_file, data_dir)
+    return {
+        'queued': queued,
+        'crashes': crashes,
+        'remaining_after_crashes': remaining,
+        'mark': mark,
+        'stored': stored_rows(stub) - rows_before,
+        'duplicates_ignored': stub.stats['duplicate_rows'] - duplicates_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=float, default=24, help='length of the simulated outage')
+    parser.add_argument('--events-per-minute', type=float, default=20)
+    parser.add_argument('--latency-ms', type=float, default=80, help='simulated WAN round trip')
+    parser.add_argument('--parallel', type=int, default=4, help='replay_parallel_chunks to compare with 1')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='override security.api_rate_limit (requests/minute)')
+    parser.add_argument('--crash-after', type=float, default=1.0,
+                        help='seconds into each replay attempt to kill it')
+    parser.add_argument('--crashes', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    events = int(args.hours * 60 * args.events_per_minute)
+    stub = StubBackend(latency_ms=args.latency_ms).start()
+
+    print(f"🔁 Replaying a {args.hours:g}h backlog ({events:,} events) against {stub.url} "
+          f"with {args.latency_ms:g} ms latency")
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'replay':<28}{'queued':>9}{'stored':>9}{'seconds':>9}{'rows/s':>9}")
+        for label, settings in [
+            ('oldest_first, 1 window', {'replay_order': 'oldest_first', 'replay_parallel_chunks': 1}),
+            (f'oldest_first, {args.parallel} windows',
+             {'replay_order': 'oldest_first', 'replay_parallel_chunks': args.parallel}),
+            (f'newest_first, {args.parallel} windows',
+             {'replay_order': 'newest_first', 'replay_parallel_chunks': args.parallel})
+        ]:
+            result = drain(stub, tmp, events, args, label.replace(' ', '').replace(',', '-'), **settings)
+            print(f"{label:<28}{result['queued']:>9,}{result['stored']:>9,}{result['seconds']:>9.1f}"
+                  f"{result['stored'] / result['seconds']:>9,.0f}")
+
+        result = crash_and_resume(stub, tmp, events, args)
+        print(f"\n💥 Killed the replay {result['crashes']}x after {args.crash_after:g}s each, "
+              f"{result['remaining_after_crashes']:,} entries left, resuming at mark "
+              f"{result['mark']['mark'] if result['mark'] else '-'}")
+        print(f"   stored {result['stored']:,} of {result['queued']:,} events, "
+              f"{result['duplicates_ignored']:,} resent rows ignored by event_id, "
+              f"{result['stored'] - result['queued']:,} duplicates stored")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Edge Client Startup Benchmark
+Breaks down edge client cold start into import and init phases, each measured in a fresh interpreter
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+HEAVY_MODULES = ['supabase', 'postgrest', 'requests', 'httpx', 'psutil', 'zstandard']
+
+# Runs in a child interpreter; prints {phase: seconds since the snippet started}
+PHASES_SNIPPET = '''
+import os, sys, json, time
+marks = {}
+started = time.perf_counter()
+def mark(name):
+    marks[name] = time.perf_counter() - started
+sys.path.insert(0, REPO_ROOT)
+if EAGER:
+    # What the client used to do at module load
+    import supabase, postgrest.exceptions, requests, psutil
+    mark('import supabase/requests/psutil')
+import edge_client
+mark('import edge_client')
+client = edge_client.ProjectScoutEdgeClient(CONFIG_FILE)
+mark('client init')
+if EAGER:
+    client.supabase
+    mark('create supabase client')
+client.submit_transaction({'total_amount': 35, 'payment_method': 'Cash'})
+mark('first transaction accepted')
+if not EAGER:
+    client.supabase
+    mark('create supabase client (deferred)')
+print(json.dumps(marks))
+sys.stdout.flush()
+os._exit(0)
+'''
+
+
+def child(code: str, env: dict) -> str:
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'child failed')
+    return result.stdout.strip().splitlines()[-1]
+
+
+def import_cost(module: str, env: dict) -> float:
+    """Seconds to import module alone in a fresh interpreter"""
+    code = (f"import time; t = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - t)")
+    return float(child(code, env))
+
+
+def run_phases(eager: bool, config_file: str, data_dir: str, env: dict) -> dict:
+    code = (f"REPO_ROOT = {REPO_ROOT!r}\nCONFIG_FILE = {config_file!r}\nEAGER = {eager}\n"
+            + PHASES_SNIPPET)
+    return json.loads(child(code, dict(env, EDGE_DATA_DIR=data_dir)))
+
+
+def median_phases(runs: list) -> dict:
+    return {phase: statistics.median(run[phase] for run in runs) for phase in runs[0]}
+
+
+def print_phases(title: str, phases: dict):
+    print(f"\n{title}")
+    previous = 0.0
+    for phase, at in phases.items():
+        print(f"  {phase:<36}{(at - previous) * 1000:>9.1f} ms{at * 1000:>11.1f} ms total")
+        previous = at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='fresh-interpreter runs per measurement (median reported)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.startup')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the client at a closed local port so nothing leaves the machine
+        with open(os.path.join(REPO_ROOT, 'edge_device_config.json'), 'r') as f:
+            config = json.load(f)
+        config['endpoints']['supabase']['base_url'] = 'http://127.0.0.1:9'
+        config.setdefault('logging', {})['level'] = 'WARNING'
+        config_file = os.path.join(tmp, 'edge_device_config.json')
+        with open(config_file, 'w') as f:
+            json.dump(config, f)
+
+        print(f"⏱️  Edge client startup ({args.repeat} runs each, median)")
+        print(f"\nImport cost per module (fresh interpreter)")
+        for module in HEAVY_MODULES:
+            try:
+                cost = statistics.median(import_cost(module, env) for _ in range(args.repeat))
+                print(f"  {module:<36}{cost * 1000:>9.1f} ms")
+            except RuntimeError:
+                print(f"  {module:<36}{'not installed':>12}")
+
+        results = {}
+        for label, eager, cached in [('eager imports, uncached fingerprint', True, False),
+                                     ('lazy imports, uncached fingerprint', False, False),
+                                     ('lazy imports, cached fingerprint', False, True)]:
+            runs = []
+            for run in range(args.repeat):
+                data_dir = os.path.join(tmp, f"data-{label}-{run if not cached else 'cached'}")
+                if not cached:
+                    shutil.rmtree(data_dir, ignore_errors=True)
+                elif not os.path.exists(data_dir):
+                    run_phases(eager, config_file, data_dir, env)
+                runs.append(run_phases(eager, config_file, data_dir, env))
+            results[label] = median_phases(runs)
+            print_phases(f"Startup phases: {label}", results[label])
+
+    baseline = results['eager imports, uncached fingerprint']['first transaction accepted']
+    fast = results['lazy imports, cached fingerprint']['first transaction accepted']
+    print(f"\n📈 First transaction accepted after {fast * 1000:.0f} ms instead of {baseline * 1000:.0f} ms "
+          f"({fast / baseline:.0%} of eager start-up, interpreter start-up excluded)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local Stub Backend for Project Scout Edge Benchmarks
+Serves a minimal PostgREST table API and the /api/iot/device-upload endpoint
+"""
+
+import gzip
+import json
+import time
+import random
+import threading
+import itertools
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class StubBackend:
+    """In-process HTTP stub that counts what edge clients send it
+
+    latency_ms adds a fixed server-side delay per request and error_rate
+    answers that fraction of writes with 503, to exercise retries.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0, error_rate: float = 0.0):
+        self.latency_seconds = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.seen_batches = set()
+        self.seen_event_ids = defaultdict(set)
+        self.stats = {
+            'requests': 0,
+            'errors_injected': 0,
+            'rows': defaultdict(int),
+            'bytes_in': 0,
+            'duplicate_batches': 0,
+            'duplicate_rows': 0
+        }
+
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                backend._count(0)
+                self._reply(200, [])
+
+            def do_PATCH(self):
+                self._read_body()
+                self._reply(200, [{'updated': True}])
+
+            def do_POST(self):
+                body = self._read_body()
+                if body is None:
+                    return self._reply(415, {'error': 'Unsupported content type or encoding'})
+
+                if backend.latency_seconds:
+                    time.sleep(backend.latency_seconds)
+                if backend.error_rate and random.random() < backend.error_rate:
+                    with backend._lock:
+                        backend.stats['errors_injected'] += 1
+                    return self._reply(503, {'error': 'Injected failure'})
+
+                path = self.path.split('?')[0]
+                if path.endswith('/iot/device-upload'):
+                    return self._device_upload(body)
+                if path.endswith('/rest/v1/rpc/insert_transactions_with_items'):
+                    return self._insert_transactions_with_items(body.get('p_transactions') or [])
+                if '/rest/v1/' in path:
+                    ignore_duplicates = ('on_conflict=event_id' in self.path and
+                                         'resolution=ignore-duplicates' in self.headers.get('Prefer', ''))
+                    return self._table_insert(path.rsplit('/', 1)[-1], body, ignore_duplicates)
+                self._reply(404, {'error': 'Not found'})
+
+            def _read_body(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                backend._count(len(raw))
+                encoding = self.headers.get('Content-Encoding', 'identity')
+                if encoding == 'gzip':
+                    raw = gzip.decompress(raw)
+                elif encoding == 'zstd':
+                    if zstandard is None:
+                        return None
+                    raw = zstandard.ZstdDecompressor().decompress(raw)
+                elif encoding != 'identity':
+                    return None
+                if self.headers.get('Content-Type', '').startswith('application/msgpack'):
+                    if msgpack is None:
+                        return None
+                    return msgpack.unpackb(raw, raw=False) if raw else {}
+                return json.loads(raw) if raw else {}
+
+            def _table_insert(self, table, body, ignore_duplicates=False):
+                rows = body if isinstance(body, list) else [body]
+                with backend._lock:
+                    if ignore_duplicates:
+                        # ON CONFLICT (event_id) DO NOTHING against a unique index
+                        seen = backend.seen_event_ids[table]
+                        fresh = [row for row in rows if not row.get('event_id') or row['event_id'] not in seen]
+                        backend.stats['duplicate_rows'] += len(rows) - len(fresh)
+                        seen.update(row['event_id'] for row in fresh if row.get('event_id'))
+                        rows = fresh
+                    backend.stats['rows'][table] += len(rows)
+                    stored = [dict(row, id=next(backend._ids)) for row in rows]
+                if 'return=minimal' in self.headers.get('Prefer', ''):
+                    return self._reply(201, None)
+                self._reply(201, stored)
+
+            def _insert_transactions_with_items(self, transactions):
+                # Headers and items in one database transaction, skipping event_ids already stored
+                result = []
+                with backend._lock:
+                    seen = backend.seen_event_ids['transactions']
+                    for transaction in transactions:
+                        event_id = transaction.get('event_id')
+                        if event_id and event_id in seen:
+                            backend.stats['duplicate_rows'] += 1
+                            result.append({'id': None, 'event_id': event_id, 'items': 0})
+                            continue
+                        if event_id:
+                            seen.add(event_id)
+                        items = transaction.get('items') or []
+                        backend.stats['rows']['transactions'] += 1
+                        backend.stats['rows']['transaction_items'] += len(items)
+                        result.append({'id': next(backend._ids), 'event_id': event_id, 'items': len(items)})
+                self._reply(200, result)
+
+            def _device_upload(self, batch):
+                if not batch.get('device_id') or not batch.get('store_id') or 'transactions' not in batch:
+                    return self._reply(400, {'error': 'Invalid request body'})
+
+                batch_id = batch['batch_metadata']['batch_id']
+                with backend._lock:
+                    if batch_id in backend.seen_batches:
+                        backend.stats['duplicate_batches'] += 1
+                    else:
+                        backend.seen_batches.add(batch_id)
+                        backend.stats['rows']['sales_interactions'] += len(batch['transactions'])
+                self._reply(200, {
+                    'success': True,
+                    'processed': {
+                        'batch_id': batch_id,
+                        'transactions_count': len(batch['transactions'])
+                    }
+                })
+
+            def _reply(self, status, payload):
+                data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        # Clients killed mid-request (crash tests) are expected; don't print their broken pipes
+        self.server.handle_error = lambda request, client_address: None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, size: int):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_in'] += size
+
+    def start(self) -> 'StubBackend':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 54321
+    stub = StubBackend(port=port)
+    print(f"🧪 Stub backend listening on {stub.url}")
+    print(f"   PostgREST:     {stub.url}/rest/v1/<table>")
+    print(f"   Device upload: {stub.url}/api/iot/device-upload")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStats: {json.dumps(stub.stats, default=dict, indent=2)}")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Edge Transaction Items Benchmark
+Compares round trips and throughput per basket size for writing a transaction with its line items: one insert per item, header plus bulk items, and the single insert_transactions_with_items RPC
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_client import ProjectScoutEdgeClient
+from edge_stub_server import StubBackend
+from generate_15000_transactions import PRODUCTS, GENDERS
+
+os.environ.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.items')
+
+
+def synthetic_sale(rng: random.Random, basket_size: int) -> dict:
+    basket = rng.sample(PRODUCTS, basket_size)
+    items = [{'product_id': PRODUCTS.index(product) + 1, 'quantity': rng.randint(1, 3),
+              'price': product['price']} for product in basket]
+    return {
+        'customer_age': rng.randint(18, 70),
+        'customer_gender': rng.choice(GENDERS),
+        'payment_method': rng.choice(['Cash', 'GCash']),
+        'total_amount': sum(item['price'] * item['quantity'] for item in items),
+        'items': items
+    }
+
+
+def per_item(client: ProjectScoutEdgeClient, sale: dict):
+    """Header, then one insert per line item"""
+    items = sale.pop('items')
+    header = client._execute(client.supabase.table('transactions').insert(sale), lane='transactions')
+    for item in items:
+        client._execute(client.supabase.table('transaction_items').insert(
+            {**item, 'transaction_id': header.data[0]['id']}), lane='transactions')
+
+
+def bulk_items(client: ProjectScoutEdgeClient, sale: dict):
+    """Header, then every line item in one multi-row insert"""
+    items = sale.pop('items')
+    header = client._execute(client.supabase.table('transactions').insert(sale), lane='transactions')
+    client._execute(client.supabase.table('transaction_items').insert(
+        [{**item, 'transaction_id': header.data[0]['id']} for item in items]), lane='transactions')
+
+
+def nested_rpc(client: ProjectScoutEdgeClient, sale: dict):
+    """Header and items together through send_transaction_data"""
+    if not client.send_transaction_data(sale):
+        raise RuntimeError("Transaction was cached instead of stored")
+
+
+STRATEGIES = (('per-item inserts', per_item), ('header + bulk items', bulk_items), ('nested RPC', nested_rpc))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--basket-sizes', default='1,3,5,10')
+    parser.add_argument('--transactions', type=int, default=100, help='sales per basket size and strategy')
+    parser.add_argument('--latency-ms', type=float, default=80, help='simulated WAN round trip')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stub = StubBackend(latency_ms=args.latency_ms).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'edge_device_config.json')
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        config['endpoints']['supabase']['base_url'] = stub.url
+        config['endpoints']['supabase']['api_url'] = f"{stub.url}/rest/v1"
+        config['logging']['level'] = 'WARNING'
+        # Measure round trips, not the device's request budget
+        config['security']['api_rate_limit'] = 1_000_000
+        config['security']['api_rate_burst'] = 1_000_000
+        config_file = os.path.join(tmp, 'config.json')
+        with open(config_file, 'w') as f:
+            json.dump(config, f)
+
+        client = ProjectScoutEdgeClient(config_file, device_id='Pi5_Edge_items0001', data_dir=tmp)
+        client.warm_up().join()
+
+        print(f"🧾 {args.transactions} sales per basket size against {stub.url} "
+              f"with {args.latency_ms:g} ms latency")
+        print(f"{'basket':>7}  {'strategy':<22}{'req/sale':>9}{'ms/sale':>9}{'sales/s':>9}{'items stored':>14}")
+        for basket_size in (int(value) for value in args.basket_sizes.split(',')):
+            for label, strategy in STRATEGIES:
+                rng = random.Random(args.seed)
+                sales = [synthetic_sale(rng, basket_size) for _ in range(args.transactions)]
+                requests_before = stub.stats['requests']
+                items_before = stub.stats['rows']['transaction_items']
+
+                started = time.perf_counter()
+                for sale in sales:
+                    strategy(client, sale)
+                elapsed = time.perf_counter() - started
+
+                requests = (stub.stats['requests'] - requests_before) / len(sales)
+                print(f"{basket_size:>7}  {label:<22}{requests:>9.1f}{elapsed / len(sales) * 1000:>9.1f}"
+                      f"{len(sales) / elapsed:>9.1f}{stub.stats['rows']['transaction_items'] - items_before:>14,}")
+        client.offline_queue.close()
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Edge Batch Upload Benchmark
+Measures DeviceBatchUploader throughput and compression ratio per body codec against a local stub endpoint
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import logging
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edge_offline_queue import OfflineQueue
+from edge_uploader import DeviceBatchUploader, zstandard
+from edge_codecs import msgpack
+from edge_stub_server import StubBackend
+from generate_15000_transactions import PRODUCTS, AGE_GROUPS, GENDERS
+
+
+def synthetic_transaction(index: int) -> dict:
+    """A queued transaction shaped like what the capture app hands the client"""
+    basket = random.sample(PRODUCTS, random.randint(1, 5))
+    low, _, high = random.choice(AGE_GROUPS).rstrip('+').partition('-')
+    return {
+        'interaction_id': f"bench-{index:07d}",
+        'created_at': (datetime.utcnow() - timedelta(seconds=index)).isoformat(),
+        'customer': {
+            'facial_id': f"face_{random.randint(1, 5000):05d}",
+            'gender': random.choice(GENDERS),
+            'age': random.randint(int(low), int(high or 75)),
+            'emotion': random.choice(['neutral', 'happy', 'rushed'])
+        },
+        'transcript': f"Pabili po ng {basket[0]['name']}",
+        'items': [
+            {
+                'brand_name': product['brand'],
+                'product_name': product['name'],
+                'quantity': random.randint(1, 3),
+                'confidence': round(random.uniform(0.7, 0.99), 3)
+            }
+            for product in basket
+        ],
+        'device_id': 'Pi5_Edge_benchmark',
+        'store_id': 'store_001'
+    }
+
+
+def run(codec: str, compression: str, transactions: int, batch_size: int, latency_ms: float) -> dict:
+    """Upload a full queue of synthetic transactions with one codec and compression setting"""
+    random.seed(42)
+    stub = StubBackend(latency_ms=latency_ms).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = OfflineQueue(os.path.join(tmp, 'queue.db'))
+        for index in range(transactions):
+            queue.enqueue('transaction', synthetic_transaction(index))
+
+        uploader = DeviceBatchUploader(
+            queue, 'Pi5_Edge_benchmark', '1', f"{stub.url}/api/iot/device-upload", 'bench-key',
+            firmware_version='2.1.0', compression=compression, codec=codec, batch_size=batch_size
+        )
+
+        start = time.perf_counter()
+        uploader.upload_pending()
+        elapsed = time.perf_counter() - start
+        queue.close()
+
+    stub.stop()
+    stats = uploader.stats
+    if stats['transactions'] < transactions:
+        raise RuntimeError(f"Only {stats['transactions']} of {transactions} transactions were accepted")
+    return {
+        'codec': uploader.codec.name,
+        'compression': uploader.compression,
+        'transactions': stats['transactions'],
+        'batches': stats['batches'],
+        'seconds': elapsed,
+        'tx_per_sec': stats['transactions'] / elapsed,
+        'wire_kb': stats['wire_bytes'] / 1024,
+        'bytes_per_tx': stats['wire_bytes'] / max(stats['transactions'], 1),
+        'ratio': uploader.compression_ratio
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transactions', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='simulated server latency per request')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    codecs = ['json'] + (['msgpack'] if msgpack else [])
+    compressions = ['identity', 'gzip'] + (['zstd'] if zstandard else [])
+
+    print(f"📦 Uploading {args.transactions} transactions in batches of {args.batch_size}")
+    print(f"{'codec':<9}{'compression':<12}{'batches':>9}{'tx/s':>12}{'wire KB':>11}{'B/tx':>8}{'ratio':>8}")
+    for codec in codecs:
+        for compression in compressions:
+            result = run(codec, compression, args.transactions, args.batch_size, args.latency_ms)
+            print(f"{result['codec']:<9}{result['compression']:<12}{result['batches']:>9}{result['tx_per_sec']:>12,.0f}"
+                  f"{result['wire_kb']:>11,.1f}{result['bytes_per_tx']:>8.0f}{result['ratio']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+/**
+ * Minimal MessagePack decoder for edge device uploads
+ *
+ * Edge devices can send DeviceBatchData as MessagePack (upload_codec
+ * "msgpack") instead of JSON. Only decoding is needed server-side, and
+ * extension types are not used by the devices, so they are rejected.
+ */
+
+export function decodeMsgpack(buffer: Buffer): unknown {
+  let offset = 0;
+
+  const read = (): unknown => {
+    const byte = buffer.readUInt8(offset++);
+
+    if (byte <= 0x7f) return byte;
+    if (byte >= 0xe0) return byte - 0x100;
+    if ((byte & 0xf0) === 0x80) return readMap(byte & 0x0f);
+    if ((byte & 0xf0) === 0x90) return readArray(byte & 0x0f);
+    if ((byte & 0xe0) === 0xa0) return readString(byte & 0x1f);
+
+    switch (byte) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return readBytes(readUInt(1));
+      case 0xc5: return readBytes(readUInt(2));
+      case 0xc6: return readBytes(readUInt(4));
+      case 0xca: return advance(4, buffer.readFloatBE(offset));
+      case 0xcb: return advance(8, buffer.readDoubleBE(offset));
+      case 0xcc: return readUInt(1);
+      case 0xcd: return readUInt(2);
+      case 0xce: return readUInt(4);
+      case 0xcf: return advance(8, Number(buffer.readBigUInt64BE(offset)));
+      case 0xd0: return advance(1, buffer.readInt8(offset));
+      case 0xd1: return advance(2, buffer.readInt16BE(offset));
+      case 0xd2: return advance(4, buffer.readInt32BE(offset));
+      case 0xd3: return advance(8, Number(buffer.readBigInt64BE(offset)));
+      case 0xd9: return readString(readUInt(1));
+      case 0xda: return readString(readUInt(2));
+      case 0xdb: return readString(readUInt(4));
+      case 0xdc: return readArray(readUInt(2));
+      case 0xdd: return readArray(readUInt(4));
+      case 0xde: return readMap(readUInt(2));
+      case 0xdf: return readMap(readUInt(4));
+      default:
+        throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`);
+    }
+  };
+
+  const advance = <T>(size: number, value: T): T => {
+    offset += size;
+    return value;
+  };
+
+  const readUInt = (size: number): number => advance(size, buffer.readUIntBE(offset, size));
+
+  const readBytes = (length: number): Buffer => {
+    if (offset + length > buffer.length) throw new RangeError('MessagePack data truncated');
+    return advance(length, buffer.subarray(offset, offset + length));
+  };
+
+  const readString = (length: number): string => readBytes(length).toString('utf8');
+
+  const readArray = (length: number): unknown[] => {
+    const items = new Array(length);
+    for (let i = 0; i < length; i++) items[i] = read();
+    return items;
+  };
+
+  const readMap = (length: number): Record<string, unknown> => {
+    const map: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = String(read());
+      map[key] = read();
+    }
+    return map;
+  };
+
+  const value = read();
+  if (offset !== buffer.length) {
+    throw new Error('Trailing bytes after MessagePack value');
+  }
+  return value;
+}
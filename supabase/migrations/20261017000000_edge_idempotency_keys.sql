@@ -0,0 +1,16 @@
+-- ===================================================================
+-- Idempotency keys for edge device uploads
+-- ===================================================================
+-- Edge devices stamp every transaction and product detection with an
+-- event_id before its first send and keep it across retries. Offline
+-- backlog replays upsert with ON CONFLICT (event_id) DO NOTHING, so rows
+-- resent after a crash or a lost response are stored only once.
+-- Rows without an event_id (older firmware) are unaffected: NULLs never
+-- conflict in a unique index.
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS event_id TEXT;
+ALTER TABLE product_detections ADD COLUMN IF NOT EXISTS event_id TEXT;
+
+-- ON CONFLICT (event_id) needs a plain (non-partial) unique index
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_event_id ON transactions(event_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_product_detections_event_id ON product_detections(event_id);
@@ -0,0 +1,93 @@
+-- ===================================================================
+-- Hourly rollups pre-aggregated on edge devices
+-- ===================================================================
+-- With features.edge_rollups enabled, each device counts transactions
+-- and product detections per hour by brand, category and demographic
+-- (age bracket|gender), plus an 'all' total, and upserts its running
+-- totals every few minutes. A row is one device's complete total for
+-- that hour, so re-sending it replaces the previous value.
+-- Dashboard queries sum across devices instead of re-aggregating raw
+-- rows; confidence_sum / detections gives the mean detection confidence.
+
+CREATE TABLE IF NOT EXISTS edge_hourly_rollups (
+  device_id TEXT NOT NULL,
+  store_id TEXT,
+  hour_start TIMESTAMP NOT NULL,
+  dimension TEXT NOT NULL CHECK (dimension IN ('total', 'brand', 'category', 'demographic')),
+  dimension_key TEXT NOT NULL,
+  transactions INTEGER NOT NULL DEFAULT 0,
+  revenue NUMERIC(12,2) NOT NULL DEFAULT 0,
+  items INTEGER NOT NULL DEFAULT 0,
+  detections INTEGER NOT NULL DEFAULT 0,
+  confidence_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (device_id, hour_start, dimension, dimension_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_edge_hourly_rollups_hour ON edge_hourly_rollups(hour_start, dimension);
+CREATE INDEX IF NOT EXISTS idx_edge_hourly_rollups_store ON edge_hourly_rollups(store_id, hour_start);
+
+CREATE OR REPLACE FUNCTION touch_edge_hourly_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at := NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_edge_hourly_rollups_updated_at ON edge_hourly_rollups;
+CREATE TRIGGER trg_edge_hourly_rollups_updated_at
+  BEFORE UPDATE ON edge_hourly_rollups
+  FOR EACH ROW EXECUTE FUNCTION touch_edge_hourly_rollups();
+
+ALTER TABLE edge_hourly_rollups ENABLE ROW LEVEL SECURITY;
+
+-- Devices upsert (INSERT ... ON CONFLICT DO UPDATE), which needs both policies
+DROP POLICY IF EXISTS "Enable read access for all users" ON edge_hourly_rollups;
+CREATE POLICY "Enable read access for all users" ON edge_hourly_rollups FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Enable insert for service role" ON edge_hourly_rollups;
+CREATE POLICY "Enable insert for service role" ON edge_hourly_rollups FOR INSERT WITH CHECK (true);
+DROP POLICY IF EXISTS "Enable update for service role" ON edge_hourly_rollups;
+CREATE POLICY "Enable update for service role" ON edge_hourly_rollups FOR UPDATE USING (true) WITH CHECK (true);
+
+-- Fleet-wide rollups for a dimension, one row per hour and key
+CREATE OR REPLACE FUNCTION get_edge_hourly_rollups(
+  p_dimension TEXT DEFAULT 'brand',
+  p_start TIMESTAMP DEFAULT NOW() - INTERVAL '24 hours',
+  p_end TIMESTAMP DEFAULT NOW(),
+  p_store_id TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  hour_start TIMESTAMP,
+  dimension_key TEXT,
+  transactions BIGINT,
+  revenue NUMERIC,
+  items BIGINT,
+  avg_basket_size NUMERIC,
+  detections BIGINT,
+  avg_confidence NUMERIC,
+  devices BIGINT
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    r.hour_start,
+    r.dimension_key,
+    SUM(r.transactions)::BIGINT AS transactions,
+    SUM(r.revenue)::NUMERIC AS revenue,
+    SUM(r.items)::BIGINT AS items,
+    ROUND(SUM(r.items)::NUMERIC / NULLIF(SUM(r.transactions), 0), 2) AS avg_basket_size,
+    SUM(r.detections)::BIGINT AS detections,
+    ROUND((SUM(r.confidence_sum) / NULLIF(SUM(r.detections), 0))::NUMERIC, 4) AS avg_confidence,
+    COUNT(DISTINCT r.device_id)::BIGINT AS devices
+  FROM edge_hourly_rollups r
+  WHERE r.dimension = p_dimension
+    AND r.hour_start >= p_start
+    AND r.hour_start < p_end
+    AND (p_store_id IS NULL OR r.store_id = p_store_id)
+  GROUP BY r.hour_start, r.dimension_key
+  ORDER BY r.hour_start, 4 DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION get_edge_hourly_rollups(TEXT, TIMESTAMP, TIMESTAMP, TEXT) TO anon, authenticated;
@@ -0,0 +1,26 @@
+-- ===================================================================
+-- Collapsed product detections from edge devices
+-- ===================================================================
+-- With features.detection_dedup enabled, a device folds repeated
+-- sightings of the same (brand, product, store) into one row per
+-- window: detected_at is the first sighting, last_seen the latest,
+-- detection_count how many frames were folded in and confidence_score
+-- the highest confidence among them. Rows from older firmware keep the
+-- defaults and count as a single sighting.
+
+ALTER TABLE product_detections ADD COLUMN IF NOT EXISTS last_seen TIMESTAMPTZ;
+ALTER TABLE product_detections ADD COLUMN IF NOT EXISTS detection_count INTEGER NOT NULL DEFAULT 1
+  CHECK (detection_count >= 1);
+
+-- Seconds a product stayed in view, for dwell-time analysis
+CREATE OR REPLACE VIEW v_product_detection_dwell AS
+SELECT
+  pd.id,
+  pd.device_id,
+  pd.store_id,
+  pd.brand_detected,
+  pd.detected_at,
+  COALESCE(pd.last_seen, pd.detected_at) AS last_seen,
+  pd.detection_count,
+  EXTRACT(EPOCH FROM COALESCE(pd.last_seen, pd.detected_at) - pd.detected_at) AS dwell_seconds
+FROM product_detections pd;
@@ -0,0 +1,81 @@
+-- ===================================================================
+-- Transactions with nested line items in one round trip
+-- ===================================================================
+-- Edge devices send each transaction with its basket as an "items"
+-- array. insert_transactions_with_items writes the headers and all of
+-- their transaction_items rows in a single call; the function runs in
+-- one database transaction, so a header is never stored without its
+-- items or the other way round.
+--
+-- p_transactions is a JSON array of transaction objects (one element
+-- for a single sale, a whole batch for offline sync). Keys that are not
+-- columns of transactions / transaction_items are ignored; omitted
+-- columns take their defaults. A transaction whose event_id is already
+-- stored is skipped together with its items and returned with id NULL.
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS event_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_event_id ON transactions(event_id);
+
+CREATE OR REPLACE FUNCTION insert_transactions_with_items(p_transactions JSONB)
+RETURNS TABLE (
+  id BIGINT,
+  event_id TEXT,
+  items INT
+) AS $$
+#variable_conflict use_column
+DECLARE
+  v_transaction JSONB;
+  v_header JSONB;
+  v_item JSONB;
+  v_columns TEXT;
+  v_id BIGINT;
+  v_items INT;
+BEGIN
+  IF jsonb_typeof(p_transactions) <> 'array' THEN
+    p_transactions := jsonb_build_array(p_transactions);
+  END IF;
+
+  FOR v_transaction IN SELECT value FROM jsonb_array_elements(p_transactions)
+  LOOP
+    v_header := v_transaction - 'items';
+
+    SELECT string_agg(quote_ident(c.column_name), ', ') INTO v_columns
+    FROM information_schema.columns c
+    WHERE c.table_schema = 'public' AND c.table_name = 'transactions'
+      AND c.column_name <> 'id' AND v_header ? c.column_name;
+
+    v_id := NULL;
+    EXECUTE format(
+      'INSERT INTO transactions (%1$s) SELECT %1$s FROM jsonb_populate_record(NULL::transactions, $1)
+       ON CONFLICT (event_id) DO NOTHING RETURNING id',
+      v_columns
+    ) USING v_header INTO v_id;
+
+    v_items := 0;
+    IF v_id IS NOT NULL THEN
+      FOR v_item IN SELECT value FROM jsonb_array_elements(COALESCE(v_transaction->'items', '[]'::jsonb))
+      LOOP
+        v_item := v_item || jsonb_build_object('transaction_id', v_id);
+
+        SELECT string_agg(quote_ident(c.column_name), ', ') INTO v_columns
+        FROM information_schema.columns c
+        WHERE c.table_schema = 'public' AND c.table_name = 'transaction_items'
+          AND c.column_name <> 'id' AND v_item ? c.column_name;
+
+        EXECUTE format(
+          'INSERT INTO transaction_items (%1$s) SELECT %1$s FROM jsonb_populate_record(NULL::transaction_items, $1)',
+          v_columns
+        ) USING v_item;
+        v_items := v_items + 1;
+      END LOOP;
+    END IF;
+
+    id := v_id;
+    event_id := v_header->>'event_id';
+    items := v_items;
+    RETURN NEXT;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION insert_transactions_with_items(JSONB) TO anon, authenticated;
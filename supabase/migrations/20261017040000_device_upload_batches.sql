@@ -0,0 +1,32 @@
+-- ===================================================================
+-- Idempotent batch uploads from edge devices
+-- ===================================================================
+-- The edge uploader retries a failed DeviceBatchData upload under the
+-- same batch_id (also sent as the Idempotency-Key header).
+-- /api/iot/device-upload claims each batch_id here before processing
+-- it, so a batch whose response was lost is acknowledged again instead
+-- of being stored twice. A claim without processed_at belongs to an
+-- attempt still running, or to one that crashed; the endpoint takes
+-- over claims older than a few minutes.
+
+CREATE TABLE IF NOT EXISTS device_upload_batches (
+  batch_id TEXT PRIMARY KEY,
+  device_id TEXT NOT NULL,
+  transaction_count INT NOT NULL DEFAULT 0,
+  claimed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_device_upload_batches_device_id ON device_upload_batches(device_id);
+
+-- Only the API route (service role) reads and writes claims
+ALTER TABLE device_upload_batches ENABLE ROW LEVEL SECURITY;
+
+-- Keep 30 days of batch ids, well beyond any device's offline retention
+CREATE OR REPLACE FUNCTION cleanup_old_device_upload_batches()
+RETURNS void AS $$
+BEGIN
+  DELETE FROM device_upload_batches
+  WHERE claimed_at < NOW() - INTERVAL '30 days';
+END;
+$$ LANGUAGE plpgsql;
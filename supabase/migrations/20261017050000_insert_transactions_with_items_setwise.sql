@@ -0,0 +1,105 @@
+-- ===================================================================
+-- Set-wise insert_transactions_with_items
+-- ===================================================================
+-- Replaces the row-by-row version from 20261017030000, which looked up
+-- the column lists in information_schema and planned a dynamic INSERT
+-- for every transaction and again for every line item. This version
+-- reads the column lists once per call and inserts with
+-- jsonb_populate_recordset, one INSERT ... SELECT per distinct set of
+-- keys (normally one for the headers and one for the items of a batch).
+--
+-- Behaviour is unchanged: keys that are not columns are ignored,
+-- omitted columns take their defaults, and a transaction whose
+-- event_id is already stored is skipped together with its items and
+-- returned with id NULL. Header ids are drawn from the transactions
+-- sequence up front so items can reference them without a lookup; the
+-- ids of skipped duplicates are left unused.
+
+CREATE OR REPLACE FUNCTION insert_transactions_with_items(p_transactions JSONB)
+RETURNS TABLE (
+  id BIGINT,
+  event_id TEXT,
+  items INT
+) AS $$
+#variable_conflict use_column
+DECLARE
+  v_header_columns TEXT[];
+  v_item_columns TEXT[];
+  v_rows JSONB;
+  v_group RECORD;
+  v_ids BIGINT[];
+  v_inserted BIGINT[] := '{}';
+BEGIN
+  IF jsonb_typeof(p_transactions) <> 'array' THEN
+    p_transactions := jsonb_build_array(p_transactions);
+  END IF;
+
+  SELECT array_agg(c.column_name::TEXT) INTO v_header_columns
+  FROM information_schema.columns c
+  WHERE c.table_schema = 'public' AND c.table_name = 'transactions' AND c.column_name <> 'id';
+
+  SELECT array_agg(c.column_name::TEXT) INTO v_item_columns
+  FROM information_schema.columns c
+  WHERE c.table_schema = 'public' AND c.table_name = 'transaction_items'
+    AND c.column_name NOT IN ('id', 'transaction_id');
+
+  -- One entry per transaction: its new id, header, items and the header columns it sets
+  SELECT jsonb_agg(jsonb_build_object(
+           'ord', t.ord,
+           'id', nextval(pg_get_serial_sequence('public.transactions', 'id')),
+           'header', t.value - 'items',
+           'items', COALESCE(t.value->'items', '[]'::jsonb),
+           'columns', (SELECT string_agg(quote_ident(k), ', ' ORDER BY k)
+                       FROM jsonb_object_keys(t.value - 'items') AS k
+                       WHERE k = ANY(v_header_columns))
+         ) ORDER BY t.ord)
+  INTO v_rows
+  FROM jsonb_array_elements(p_transactions) WITH ORDINALITY AS t(value, ord);
+
+  FOR v_group IN
+    SELECT r->>'columns' AS columns,
+           jsonb_agg((r->'header') || jsonb_build_object('id', r->'id')) AS headers
+    FROM jsonb_array_elements(COALESCE(v_rows, '[]'::jsonb)) AS e(r)
+    GROUP BY r->>'columns'
+  LOOP
+    EXECUTE format(
+      'WITH inserted AS (
+         INSERT INTO transactions (id%1$s) SELECT id%1$s FROM jsonb_populate_recordset(NULL::transactions, $1)
+         ON CONFLICT (event_id) DO NOTHING RETURNING id
+       )
+       SELECT array_agg(id) FROM inserted',
+      COALESCE(', ' || v_group.columns, '')
+    ) USING v_group.headers INTO v_ids;
+    v_inserted := v_inserted || COALESCE(v_ids, '{}');
+  END LOOP;
+
+  FOR v_group IN
+    SELECT s.columns, jsonb_agg(s.item) AS item_rows
+    FROM (
+      SELECT i.value || jsonb_build_object('transaction_id', r->'id') AS item,
+             (SELECT string_agg(quote_ident(k), ', ' ORDER BY k)
+              FROM jsonb_object_keys(i.value) AS k
+              WHERE k = ANY(v_item_columns)) AS columns
+      FROM jsonb_array_elements(COALESCE(v_rows, '[]'::jsonb)) AS e(r),
+           jsonb_array_elements(r->'items') AS i
+      WHERE (r->>'id')::BIGINT = ANY(v_inserted)
+    ) s
+    GROUP BY s.columns
+  LOOP
+    EXECUTE format(
+      'INSERT INTO transaction_items (transaction_id%1$s)
+       SELECT transaction_id%1$s FROM jsonb_populate_recordset(NULL::transaction_items, $1)',
+      COALESCE(', ' || v_group.columns, '')
+    ) USING v_group.item_rows;
+  END LOOP;
+
+  RETURN QUERY
+  SELECT CASE WHEN (r->>'id')::BIGINT = ANY(v_inserted) THEN (r->>'id')::BIGINT END,
+         r->'header'->>'event_id',
+         CASE WHEN (r->>'id')::BIGINT = ANY(v_inserted) THEN jsonb_array_length(r->'items') ELSE 0 END
+  FROM jsonb_array_elements(COALESCE(v_rows, '[]'::jsonb)) AS e(r)
+  ORDER BY (r->>'ord')::INT;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION insert_transactions_with_items(JSONB) TO anon, authenticated;
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The edge modules live at the repository root, next to the device scripts
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
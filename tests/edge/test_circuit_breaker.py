@@ -0,0 +1,89 @@
+from edge_circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(**kwargs):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, base_backoff_seconds=10, max_backoff_seconds=40,
+                             jitter=0, probe_timeout_seconds=30, clock=clock, **kwargs)
+    return breaker, clock
+
+
+def test_opens_after_consecutive_failures():
+    breaker, _ = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()['retry_in_seconds'] == 10
+
+
+def test_half_open_probe_closes_on_success():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_with_longer_backoff():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    backoffs = []
+    for _ in range(4):
+        clock.now += breaker.snapshot()['retry_in_seconds']
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        backoffs.append(breaker.snapshot()['retry_in_seconds'])
+    assert backoffs == [20, 40, 40, 40]
+    assert breaker.stats['opened'] == 5
+
+
+def test_release_frees_the_probe_slot():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_probe_that_never_reports_is_replaced_after_timeout():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.allow_request()
+    clock.now += 29
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    assert breaker.stats['probes'] == 2
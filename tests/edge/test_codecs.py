@@ -0,0 +1,86 @@
+import pytest
+
+from edge_codecs import JsonCodec, decode_payload, get_codec, msgpack
+from edge_health_codec import decode_health_series, encode_health_series
+from edge_records import HealthSample
+
+needs_msgpack = pytest.mark.skipif(msgpack is None, reason='msgpack not installed')
+
+TRANSACTION = {
+    'device_id': 'Pi5_Edge_test',
+    'store_id': 'store_001',
+    'created_at': '2026-10-17T01:02:03.456789',
+    'event_id': '6f1c2b1e-3c4d-4e5f-8a9b-0c1d2e3f4a5b',
+    'total_amount': 123.45,
+    'items_count': 2,
+    'customer_age': 34,
+    'customer_gender': 'Female',
+    'payment_method': 'GCash',
+    'items': [{'product_id': 7, 'quantity': 2, 'unit_price': 61.725}]
+}
+DETECTION = {
+    'device_id': 'Pi5_Edge_test',
+    'store_id': 'store_001',
+    'detected_at': '2026-10-17T01:02:03',
+    'brand_detected': 'Marlboro',
+    'confidence_score': 0.8765,
+    'customer_gender': 'Unlisted',
+    'metadata': {'camera': 2}
+}
+UNCONVERTIBLE = {
+    'created_at': 'yesterday',
+    'event_id': 'not-a-uuid',
+    'total_amount': 0.125,
+    'customer_gender': None
+}
+
+
+@pytest.mark.parametrize('name', ['json', pytest.param('msgpack', marks=needs_msgpack),
+                                  pytest.param('record', marks=needs_msgpack)])
+@pytest.mark.parametrize('data_type,data', [
+    ('transaction', TRANSACTION),
+    ('product_detection', DETECTION),
+    ('transaction', UNCONVERTIBLE),
+    ('unknown_type', {'a': [1, 2.5, None, 'x']})
+])
+def test_codec_round_trip(name, data_type, data):
+    codec = get_codec(name)
+    payload = codec.encode(data, data_type)
+    assert codec.decode(payload, data_type) == data
+    assert decode_payload(payload, data_type) == data
+
+
+@needs_msgpack
+def test_record_codec_is_smaller_than_json():
+    json_size = len(JsonCodec().encode(TRANSACTION))
+    assert len(get_codec('record').encode(TRANSACTION, 'transaction')) < json_size
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec('yaml')
+
+
+def test_health_series_round_trip():
+    samples = [
+        HealthSample(timestamp=1_760_000_000.0 + 30 * i, cpu_usage=12.3 + i, memory_usage=45.6,
+                     disk_usage=78.9, temperature=None if i % 3 == 0 else 51.25, uptime_seconds=3600 + 30 * i)
+        for i in range(50)
+    ]
+    for compress in (True, False):
+        rows = decode_health_series(encode_health_series(samples, compress=compress))
+        assert len(rows) == len(samples)
+        for row, sample in zip(rows, samples):
+            assert row['timestamp'] == pytest.approx(sample.timestamp)
+            assert row['cpu_usage'] == pytest.approx(sample.cpu_usage)
+            assert row['memory_usage'] == pytest.approx(sample.memory_usage)
+            assert row['uptime_seconds'] == sample.uptime_seconds
+            if sample.temperature is None:
+                assert row['temperature'] is None
+            else:
+                assert row['temperature'] == pytest.approx(sample.temperature)
+
+
+def test_health_series_rejects_foreign_payload():
+    with pytest.raises(ValueError):
+        decode_health_series(b'{"not": "a series"}')
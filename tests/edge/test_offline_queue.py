@@ -0,0 +1,156 @@
+import pytest
+
+from edge_offline_queue import OfflineQueue
+
+KB = 1 / 1024
+
+
+def detection(index, brand='Marlboro'):
+    return {'device_id': 'Pi5_Edge_test', 'store_id': 'store_001', 'brand_detected': brand,
+            'confidence_score': 0.5 + index / 1000, 'detected_at': f'2026-10-17T01:00:{index % 60:02d}'}
+
+
+def transaction(index):
+    return {'device_id': 'Pi5_Edge_test', 'store_id': 'store_001', 'total_amount': index,
+            'items': [{'product_id': index, 'quantity': 1}]}
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**kwargs):
+        queue = OfflineQueue(str(tmp_path / 'offline_queue.db'), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def ids(queue):
+    return [entry['id'] for entry in queue.peek(limit=10_000)]
+
+
+def test_ack_removes_entries_and_saves_checkpoint(make_queue):
+    queue = make_queue()
+    first = queue.enqueue('transaction', transaction(1))
+    second = queue.enqueue('transaction', transaction(2))
+    assert len(queue) == 2
+
+    assert queue.ack([first], checkpoint=('replay', {'mark': first})) == 1
+    assert ids(queue) == [second]
+    assert queue.get_checkpoint('replay') == {'mark': first}
+    assert queue.ack([first]) == 0
+
+    queue.ack([second])
+    assert len(queue) == 0
+    assert queue.size_bytes == 0
+
+
+def test_entries_survive_reopen(make_queue):
+    queue = make_queue(durability_window_ms=50)
+    entry_id = queue.enqueue('transaction', transaction(1))
+    queue.close()
+
+    reopened = make_queue()
+    assert [entry['id'] for entry in reopened.peek()] == [entry_id]
+    assert reopened.peek()[0]['data'] == transaction(1)
+
+
+def test_eviction_drops_lowest_priority_first(make_queue):
+    queue = make_queue(max_size_mb=2 * KB)
+    kept = [queue.enqueue('transaction', transaction(i)) for i in range(5)]
+    for i in range(40):
+        queue.enqueue('device_health', {'device_id': 'Pi5_Edge_test', 'cpu_usage': i})
+
+    assert queue.size_bytes <= queue.max_size_bytes
+    assert set(kept) <= set(ids(queue))
+    stats = queue.stats()
+    assert stats['evicted']['device_health'] > 0
+    assert 'transaction' not in stats['evicted']
+
+
+def test_detections_are_compacted_before_they_are_dropped(make_queue):
+    queue = make_queue(max_size_mb=2 * KB)
+    for i in range(40):
+        queue.enqueue('product_detection', detection(i))
+
+    stats = queue.stats()
+    assert stats['compactions'] > 0
+    assert not stats['evicted']
+    summaries = [entry['data'] for entry in queue.peek(limit=10_000)
+                 if (entry['data'].get('metadata') or {}).get('detection_count')]
+    assert summaries
+    assert sum(s['metadata']['detection_count'] for s in summaries) + len(queue) - len(summaries) == 40
+
+
+def test_compaction_skips_checked_out_entries(make_queue):
+    queue = make_queue(max_size_mb=2 * KB)
+    out = [queue.enqueue('product_detection', detection(i)) for i in range(5)]
+    checked_out = queue.peek(limit=5, checkout=True)
+    for i in range(5, 40):
+        queue.enqueue('product_detection', detection(i))
+
+    assert queue.stats()['compactions'] > 0
+    remaining = {entry['id']: entry['data'] for entry in queue.peek(limit=10_000)}
+    for entry in checked_out:
+        assert remaining[entry['id']] == entry['data']
+
+    # Acking the delivered window removes only what it delivered
+    before = len(queue)
+    assert queue.ack(out) == 5
+    assert len(queue) == before - 5
+
+
+def test_eviction_keeps_checked_out_entries(make_queue):
+    queue = make_queue(max_size_mb=2 * KB)
+    out = [queue.enqueue('product_detection', detection(i, brand=f'Brand {i}')) for i in range(10)]
+    queue.peek(limit=10, checkout=True)
+    for i in range(40):
+        queue.enqueue('transaction', transaction(i))
+
+    # Every compactable entry is out for delivery, so transactions are evicted instead
+    assert set(out) <= set(ids(queue))
+    assert queue.stats()['evicted'].get('product_detection', 0) == 0
+    assert queue.stats()['evicted']['transaction'] > 0
+
+
+def test_new_entries_are_evicted_before_checked_out_ones(make_queue):
+    queue = make_queue(max_size_mb=1 * KB)
+    out = [queue.enqueue('transaction', transaction(i)) for i in range(9)]
+    queue.peek(limit=9, checkout=True)
+    newest = queue.enqueue('transaction', transaction(9))
+
+    assert ids(queue) == out
+    assert newest not in ids(queue)
+
+
+def test_reject_dead_letters_at_the_cap_and_requeue_restores(make_queue):
+    queue = make_queue()
+    bad = queue.enqueue('transaction', transaction(1))
+    good = queue.enqueue('transaction', transaction(2))
+
+    assert queue.reject([bad], max_rejections=2) == 0
+    assert ids(queue) == [bad, good]
+    assert queue.reject([bad], max_rejections=2) == 1
+    assert ids(queue) == [good]
+    assert len(queue) == 1
+    assert queue.stats()['dead_letters'] == 1
+
+    assert queue.requeue_dead_letters() == 1
+    assert queue.stats()['dead_letters'] == 0
+    requeued = queue.peek(limit=10)
+    assert [entry['data'] for entry in requeued] == [transaction(2), transaction(1)]
+    assert requeued[-1]['id'] > good
+
+
+def test_dead_letter_releases_checkout(make_queue):
+    queue = make_queue()
+    entry_id = queue.enqueue('transaction', transaction(1))
+    queue.peek(checkout=True)
+
+    assert queue.dead_letter([entry_id], 'schema mismatch') == 1
+    assert len(queue) == 0
+    assert not queue._checked_out
@@ -0,0 +1,118 @@
+import pytest
+
+from edge_offline_queue import OfflineQueue
+from edge_replay import CHECKPOINT_NAME, BacklogReplay
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'offline_queue.db')
+
+
+def fill(queue, count):
+    return [queue.enqueue('transaction', {'total_amount': index}) for index in range(count)]
+
+
+def deliver(replay, window):
+    replay.complete(window, [entry['id'] for entry in window.entries])
+
+
+def test_resumes_at_high_water_mark_after_restart(db_path):
+    queue = OfflineQueue(db_path)
+    entry_ids = fill(queue, 10)
+    replay = BacklogReplay(queue, window_size=3)
+    deliver(replay, replay.next_window())
+    replay.next_window()  # in flight when the device restarts
+    queue.close()
+
+    queue = OfflineQueue(db_path)
+    resumed = BacklogReplay(queue, window_size=3)
+    assert resumed.resumed
+    assert resumed.state['mark'] == entry_ids[2]
+    assert resumed.state['rows'] == 3
+
+    delivered = []
+    while (window := resumed.next_window()) is not None:
+        delivered.extend(entry['id'] for entry in window.entries)
+        deliver(resumed, window)
+    assert delivered == entry_ids[3:]
+    assert resumed.close()
+    assert queue.get_checkpoint(CHECKPOINT_NAME) is None
+    assert len(queue) == 0
+    queue.close()
+
+
+def test_mark_waits_for_earlier_windows(db_path):
+    queue = OfflineQueue(db_path)
+    entry_ids = fill(queue, 6)
+    replay = BacklogReplay(queue, window_size=2)
+    first, second = replay.next_window(), replay.next_window()
+
+    deliver(replay, second)
+    assert queue.get_checkpoint(CHECKPOINT_NAME)['mark'] == 0
+    deliver(replay, first)
+    assert queue.get_checkpoint(CHECKPOINT_NAME)['mark'] == entry_ids[3]
+
+    # A window that did not finish keeps the mark before it
+    third = replay.next_window()
+    replay.complete(third, [third.entries[0]['id']], finished=False)
+    assert queue.get_checkpoint(CHECKPOINT_NAME)['mark'] == entry_ids[3]
+    assert not replay.done
+    assert not replay.close()
+    queue.close()
+
+
+def test_cycle_covers_only_entries_queued_at_start(db_path):
+    queue = OfflineQueue(db_path)
+    entry_ids = fill(queue, 4)
+    replay = BacklogReplay(queue, window_size=10)
+    later = queue.enqueue('transaction', {'total_amount': 99})
+
+    window = replay.next_window()
+    assert [entry['id'] for entry in window.entries] == entry_ids
+    deliver(replay, window)
+    assert replay.next_window() is None
+    assert replay.close()
+    assert [entry['id'] for entry in queue.peek()] == [later]
+    queue.close()
+
+
+def test_newest_first_resume(db_path):
+    queue = OfflineQueue(db_path)
+    entry_ids = fill(queue, 5)
+    replay = BacklogReplay(queue, window_size=2, order='newest_first')
+    window = replay.next_window()
+    assert [entry['id'] for entry in window.entries] == entry_ids[:-3:-1]
+    deliver(replay, window)
+
+    resumed = BacklogReplay(queue, window_size=2, order='newest_first')
+    assert resumed.resumed
+    assert [entry['id'] for entry in resumed.next_window().entries] == entry_ids[2:0:-1]
+
+    # A different order starts a fresh cycle
+    assert not BacklogReplay(queue, window_size=2).resumed
+    queue.close()
+
+
+def test_rejected_entries_are_retried_then_dead_lettered(db_path):
+    queue = OfflineQueue(db_path)
+    bad, good = fill(queue, 2)
+
+    for attempt in range(2):
+        replay = BacklogReplay(queue, window_size=10, max_rejections=2)
+        window = replay.next_window()
+        assert bad in [entry['id'] for entry in window.entries]
+        replay.complete(window, [good] if attempt == 0 else [], rejected_ids=[bad])
+        assert replay.next_window() is None
+        assert replay.close()
+
+    assert len(queue) == 0
+    assert queue.stats()['dead_letters'] == 1
+    queue.close()
+
+
+def test_unknown_order_is_rejected(db_path):
+    queue = OfflineQueue(db_path)
+    with pytest.raises(ValueError):
+        BacklogReplay(queue, window_size=10, order='random')
+    queue.close()